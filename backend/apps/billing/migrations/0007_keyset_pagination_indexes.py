@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0006_subscriptionplan_subscription"),
+        ("core", "0021_reportjob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["studio", "-created_at", "id"], name="invoices_studio__0bcf8c_idx"
+            ),
+        ),
+    ]
@@ -82,6 +82,7 @@ class Invoice(models.Model):
             models.Index(fields=["invoice_number"]),
             models.Index(fields=["band", "status"]),
             models.Index(fields=["due_date"]),
+            models.Index(fields=["studio", "-created_at", "id"]),
         ]
 
     def __str__(self):
@@ -21,7 +21,9 @@ class InvoiceSerializer(serializers.ModelSerializer):
     stripe_transaction_id = serializers.SerializerMethodField()
 
     def get_stripe_transaction_id(self, obj):
-        payment = obj.payments.filter(status='completed').order_by('-processed_at').first()
+        # Read the prefetched payments rather than querying per invoice
+        completed = [p for p in obj.payments.all() if p.status == "completed"]
+        payment = max(completed, key=lambda p: p.processed_at, default=None)
         if payment and payment.transaction_id:
             return payment.transaction_id
         return obj.stripe_session_id or None
@@ -59,6 +61,11 @@ class InvoiceSerializer(serializers.ModelSerializer):
             "student_name",
             "stripe_transaction_id",
         ]
+        eager_load = {
+            "stripe_transaction_id": ["payments"],
+            "student_name": ["student__user"],
+            "band_name": ["band"],
+        }
         read_only_fields = [
             "invoice_number",
             "subtotal",
@@ -4,17 +4,21 @@ from rest_framework import permissions, status, viewsets
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
+from apps.core.eager_loading import EagerLoadingMixin
+
 from .models import Invoice, SubscriptionPlan, Subscription
 from .serializers import InvoiceSerializer, SubscriptionPlanSerializer, SubscriptionSerializer
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing invoices
     """
 
     serializer_class = InvoiceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Keyset order for ?pagination=cursor (see config/pagination.py)
+    cursor_ordering = ("-created_at", "id")
 
     def get_queryset(self):
         user = self.request.user
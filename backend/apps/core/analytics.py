@@ -0,0 +1,209 @@
+"""
+Dashboard analytics series.
+
+Builds the revenue and student-growth chart series for DashboardAnalyticsView
+over an arbitrary date range at day, week or month granularity. Buckets follow
+the calendar (weeks start on Monday, months on the 1st), so no period is
+skipped or repeated, and empty periods are reported as zero.
+
+Finished series are cached per studio. Each studio has a version counter that
+is bumped after Invoice, Student and Lesson writes commit (see
+apps/core/signals.py); the version is part of every cache key, so a bump
+retires all of the studio's cached series at once.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from apps.billing.models import Invoice
+
+from .models import Student
+
+logger = logging.getLogger(__name__)
+
+TRUNC_FUNCTIONS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+# Number of buckets shown when no start date is given
+DEFAULT_BUCKETS = {"day": 30, "week": 12, "month": 6}
+
+# Upper bound on buckets per request (~2.7 years of days)
+MAX_BUCKETS = 1000
+
+SERIES_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def bucket_start(day, granularity):
+    """Return the first day of the bucket containing ``day``."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, granularity):
+    """Return the first day of the bucket after the one starting at ``day``."""
+    if granularity == "week":
+        return day + timedelta(days=7)
+    if granularity == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def bucket_periods(start, end, granularity):
+    """List the bucket start dates covering ``start`` through ``end`` inclusive."""
+    periods = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        periods.append(current)
+        current = next_bucket(current, granularity)
+    return periods
+
+
+def bucket_count(start, end, granularity):
+    """Count the buckets bucket_periods() would list, without building them."""
+    if granularity == "month":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    days = (bucket_start(end, granularity) - bucket_start(start, granularity)).days
+    if granularity == "week":
+        return days // 7 + 1
+    return days + 1
+
+
+def default_start(end, granularity):
+    """Return the start date showing DEFAULT_BUCKETS buckets up to ``end``."""
+    start = bucket_start(end, granularity)
+    for _ in range(DEFAULT_BUCKETS[granularity] - 1):
+        start = bucket_start(start - timedelta(days=1), granularity)
+    return start
+
+
+def _period_label(period, granularity):
+    if granularity == "month":
+        return period.strftime("%b")
+    return period.strftime("%b %d")
+
+
+def _bucket_totals(queryset, field, granularity, periods, aggregate):
+    """
+    Group ``queryset`` into calendar buckets on ``field`` and return a
+    {bucket start date: value} map. Buckets with no rows are absent.
+    """
+    tz = timezone.get_current_timezone()
+    range_start = timezone.make_aware(datetime.combine(periods[0], datetime.min.time()), tz)
+    range_end = timezone.make_aware(
+        datetime.combine(next_bucket(periods[-1], granularity), datetime.min.time()), tz
+    )
+
+    rows = (
+        queryset.filter(**{f"{field}__gte": range_start, f"{field}__lt": range_end})
+        .annotate(period=TRUNC_FUNCTIONS[granularity](field))
+        .values("period")
+        .annotate(value=aggregate)
+        .order_by("period")
+    )
+    return {timezone.localtime(row["period"], tz).date(): row["value"] for row in rows}
+
+
+def build_series(studio, granularity, start, end):
+    """Compute the revenue and student-growth series for a studio."""
+    periods = bucket_periods(start, end, granularity)
+
+    revenue_map = _bucket_totals(
+        Invoice.objects.filter(studio=studio, status="paid"),
+        "created_at",
+        granularity,
+        periods,
+        Sum("total_amount"),
+    )
+    enrollment_map = _bucket_totals(
+        Student.objects.filter(studio=studio, is_active=True),
+        "created_at",
+        granularity,
+        periods,
+        Count("id"),
+    )
+
+    revenue_trend = []
+    student_growth = []
+    for period in periods:
+        label = _period_label(period, granularity)
+        revenue_trend.append(
+            {
+                "month": label,
+                "period": period.isoformat(),
+                "revenue": float(revenue_map.get(period) or 0),
+            }
+        )
+        student_growth.append(
+            {
+                "month": label,
+                "period": period.isoformat(),
+                "students": enrollment_map.get(period, 0),
+            }
+        )
+
+    return {"revenue_trend": revenue_trend, "student_growth": student_growth}
+
+
+def _version_key(studio_id):
+    return f"analytics:version:{studio_id}"
+
+
+def analytics_version(studio_id):
+    """Return the studio's current analytics cache version."""
+    key = _version_key(studio_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a version lost to eviction never reuses an
+        # old number whose cached series might still be around
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_analytics_version(studio_id):
+    """Retire every cached analytics series for a studio."""
+    key = _version_key(studio_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def schedule_analytics_invalidation(studio_id):
+    """Bump the studio's analytics version once the current transaction commits."""
+    if not studio_id:
+        return
+
+    def _bump():
+        try:
+            bump_analytics_version(studio_id)
+        except Exception as e:
+            logger.error(f"Failed to invalidate analytics cache for studio {studio_id}: {e}")
+
+    transaction.on_commit(_bump)
+
+
+def get_series(studio, granularity, start, end):
+    """Return the cached series for a studio, computing it on a miss."""
+    key = (
+        f"analytics:series:{studio.id}:{analytics_version(studio.id)}:"
+        f"{granularity}:{start.isoformat()}:{end.isoformat()}"
+    )
+    series = cache.get(key)
+    if series is None:
+        series = build_series(studio, granularity, start, end)
+        cache.set(key, series, SERIES_CACHE_TIMEOUT)
+    return series
@@ -7,3 +7,29 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import apps.core.signals  # noqa: F401
+
+        self._register_schedule()
+
+    def _register_schedule(self):
+        try:
+            from django_q.models import Schedule
+
+            Schedule.objects.get_or_create(
+                func="apps.core.tasks.refresh_daily_facts",
+                defaults={
+                    "name": "Refresh analytics daily facts",
+                    "schedule_type": Schedule.DAILY,
+                    "repeats": -1,  # run forever
+                },
+            )
+            Schedule.objects.get_or_create(
+                func="apps.core.tasks.purge_expired_report_jobs",
+                defaults={
+                    "name": "Purge expired report jobs",
+                    "schedule_type": Schedule.DAILY,
+                    "repeats": -1,
+                },
+            )
+        except Exception:
+            # Tables may not exist yet during initial migrations — safe to skip.
+            pass
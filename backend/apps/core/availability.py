@@ -0,0 +1,158 @@
+"""
+Helpers for Teacher.availability, the teacher's weekly schedule.
+
+The JSON is keyed by weekday (name or 0-6, Monday first), each holding a list
+of local-time ranges, either as objects or pairs:
+
+    {
+        "monday": [{"start": "09:00", "end": "12:00"}, {"start": "13:00", "end": "17:00"}],
+        "2": [["15:00", "19:30"]]
+    }
+
+Times are in the studio's timezone. Anything malformed is ignored rather
+than raising, since the blob is edited freely from the profile form.
+"""
+
+import zoneinfo
+from datetime import datetime, timedelta
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_weekday(key):
+    key = str(key).strip().lower()
+    if key.isdigit() and int(key) < 7:
+        return int(key)
+    for index, name in enumerate(WEEKDAYS):
+        if key in (name, name[:3]):
+            return index
+    return None
+
+
+def parse_minute(value):
+    """'HH:MM' -> minutes after midnight; '24:00' is allowed as end of day."""
+    try:
+        hours, minutes = str(value).split(":")[:2]
+        total = int(hours) * 60 + int(minutes)
+    except (TypeError, ValueError):
+        return None
+    return total if 0 <= total <= MINUTES_PER_DAY else None
+
+
+def merge_ranges(ranges):
+    """Sort and coalesce overlapping or touching (start, end) ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def parse_weekly_availability(availability):
+    """
+    Normalise Teacher.availability to {weekday: [(start_minute, end_minute), ...]},
+    with each day's ranges sorted and merged.
+    """
+    weekly = {}
+    if not isinstance(availability, dict):
+        return weekly
+
+    for key, ranges in availability.items():
+        weekday = parse_weekday(key)
+        if weekday is None or not isinstance(ranges, list):
+            continue
+        for item in ranges:
+            if isinstance(item, dict):
+                start, end = parse_minute(item.get("start")), parse_minute(item.get("end"))
+            elif isinstance(item, (list, tuple)) and len(item) == 2:
+                start, end = parse_minute(item[0]), parse_minute(item[1])
+            else:
+                continue
+            if start is not None and end is not None and start < end:
+                weekly.setdefault(weekday, []).append((start, end))
+
+    return {weekday: merge_ranges(ranges) for weekday, ranges in weekly.items()}
+
+
+def sync_teacher_availability(teacher):
+    """
+    Rewrite the teacher's TeacherAvailability rows from Teacher.availability.
+    Does nothing when the rows already match, so ordinary profile saves
+    don't churn the table.
+    """
+    from .models import TeacherAvailability
+
+    wanted = {
+        (weekday, start, end)
+        for weekday, ranges in parse_weekly_availability(teacher.availability).items()
+        for start, end in ranges
+    }
+    existing = TeacherAvailability.objects.filter(teacher=teacher)
+    current = set(existing.values_list("weekday", "start_minute", "end_minute"))
+    if current == wanted and not existing.exclude(studio_id=teacher.studio_id).exists():
+        return
+
+    existing.delete()
+    TeacherAvailability.objects.bulk_create(
+        TeacherAvailability(
+            teacher=teacher,
+            studio_id=teacher.studio_id,
+            weekday=weekday,
+            start_minute=start,
+            end_minute=end,
+        )
+        for weekday, start, end in sorted(wanted)
+    )
+
+
+def available_teachers(studio, weekday, start_minute, end_minute, on_date=None, **filters):
+    """
+    Active teachers in `studio` whose weekly availability covers
+    [start_minute, end_minute) on `weekday` and, when `on_date` is given, who
+    have no lesson overlapping that window on the date.
+
+    `instrument` / `specialty` filters match an entry of Teacher.instruments /
+    Teacher.specialties case-insensitively. Everything runs as one query.
+    """
+    from apps.lessons.models import Lesson
+
+    from .models import Teacher, TeacherAvailability
+
+    covering = TeacherAvailability.objects.filter(
+        studio=studio,
+        weekday=weekday,
+        start_minute__lte=start_minute,
+        end_minute__gte=end_minute,
+    ).values("teacher_id")
+    teachers = Teacher.objects.filter(studio=studio, is_active=True, pk__in=covering)
+
+    # JSON lists are matched on their quoted element text, which works on
+    # every backend (JSONField __contains isn't available on SQLite)
+    for field in ("instrument", "specialty"):
+        value = filters.get(field)
+        if value:
+            column = "instruments" if field == "instrument" else "specialties"
+            teachers = teachers.filter(**{f"{column}__icontains": f'"{value}"'})
+
+    if on_date is not None:
+        try:
+            tz = zoneinfo.ZoneInfo(studio.timezone)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            tz = timezone.get_current_timezone()
+        midnight = datetime.combine(on_date, datetime.min.time(), tzinfo=tz)
+        busy = Lesson.objects.filter(
+            teacher=OuterRef("pk"),
+            scheduled_start__lt=midnight + timedelta(minutes=end_minute),
+            scheduled_end__gt=midnight + timedelta(minutes=start_minute),
+        ).exclude(status="cancelled")
+        teachers = teachers.exclude(Exists(busy))
+
+    return teachers.select_related("user")
@@ -0,0 +1,187 @@
+"""
+Double-booking prevention for teachers and rooms.
+
+On PostgreSQL the lessons and inventory migrations add exclusion constraints
+(btree_gist over a half-open tstzrange), so overlapping rows for the same
+teacher or room are rejected by the database itself:
+
+    lessons_no_teacher_overlap      lessons (teacher_id, [start, end))
+    lessons_no_room_overlap         lessons (room_id, [start, end))
+    reservations_no_room_overlap    inventory_roomreservation (room_id, [start, end))
+
+Where those constraints aren't installed (SQLite, or a Postgres without
+btree_gist) save_booking() falls back to locking the teacher/room row and
+checking for overlaps inside the same transaction as the write.
+
+Either way a clash surfaces as BookingConflict, a 409 with a structured body:
+
+    {"detail": "...", "code": "booking_conflict", "resource": "teacher",
+     "conflicts": [{"id": "...", "start": "...", "end": "..."}]}
+"""
+
+import functools
+
+from django.apps import apps
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Q
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class OverlapRule:
+    """One "no two active rows for the same key may overlap" rule."""
+
+    def __init__(self, constraint, model, key, start, end, active, resource):
+        self.constraint = constraint
+        self.model_label = model
+        self.key = key
+        self.start = start
+        self.end = end
+        self.active = active
+        self.resource = resource
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+
+LESSON_TEACHER_RULE = OverlapRule(
+    "lessons_no_teacher_overlap",
+    "lessons.Lesson",
+    key="teacher",
+    start="scheduled_start",
+    end="scheduled_end",
+    active=~Q(status="cancelled"),
+    resource="teacher",
+)
+LESSON_ROOM_RULE = OverlapRule(
+    "lessons_no_room_overlap",
+    "lessons.Lesson",
+    key="room",
+    start="scheduled_start",
+    end="scheduled_end",
+    active=~Q(status="cancelled"),
+    resource="room",
+)
+RESERVATION_ROOM_RULE = OverlapRule(
+    "reservations_no_room_overlap",
+    "inventory.RoomReservation",
+    key="room",
+    start="start_time",
+    end="end_time",
+    active=Q(status__in=["pending", "confirmed"]),
+    resource="room",
+)
+
+LESSON_RULES = (LESSON_TEACHER_RULE, LESSON_ROOM_RULE)
+RESERVATION_RULES = (RESERVATION_ROOM_RULE,)
+
+
+class BookingConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This time overlaps an existing booking."
+    default_code = "booking_conflict"
+
+    def __init__(self, rule, conflicts=()):
+        super().__init__(
+            {
+                "detail": f"The {rule.resource} is already booked at this time.",
+                "code": self.default_code,
+                "resource": rule.resource,
+                "conflicts": [
+                    {"id": str(pk), "start": start.isoformat(), "end": end.isoformat()}
+                    for pk, start, end in conflicts
+                ],
+            }
+        )
+
+
+@functools.cache
+def enforced_constraints(alias="default"):
+    """Names of the exclusion constraints installed on this database."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return frozenset()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT conname FROM pg_constraint WHERE contype = 'x'")
+        return frozenset(row[0] for row in cursor.fetchall())
+
+
+def find_overlaps(rule, key, start, end, exclude_pk=None):
+    """(id, start, end) of active rows for `key` overlapping [start, end)."""
+    if key is None or start is None or end is None:
+        return []
+    queryset = rule.model.objects.filter(
+        rule.active,
+        **{rule.key: key, f"{rule.start}__lt": end, f"{rule.end}__gt": start},
+    )
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return list(queryset.values_list("pk", rule.start, rule.end)[:10])
+
+
+def _values(rule, instance):
+    return (
+        getattr(instance, f"{rule.key}_id"),
+        getattr(instance, rule.start),
+        getattr(instance, rule.end),
+    )
+
+
+def check_overlaps(instance, rules):
+    """
+    Raise BookingConflict if `instance` (already saved in the current
+    transaction) overlaps another active row under any of `rules`.
+
+    The key's row (teacher, room) is locked first, so concurrent bookings for
+    the same resource are checked one at a time and can't both pass.
+    """
+    for rule in rules:
+        if rule.constraint in enforced_constraints(instance._state.db):
+            continue
+        if not rule.model.objects.filter(rule.active, pk=instance.pk).exists():
+            continue
+        key, start, end = _values(rule, instance)
+        if key is None:
+            continue
+        key_model = rule.model._meta.get_field(rule.key).related_model
+        list(key_model.objects.select_for_update().filter(pk=key).values_list("pk"))
+        conflicts = find_overlaps(rule, key, start, end, exclude_pk=instance.pk)
+        if conflicts:
+            raise BookingConflict(rule, conflicts)
+
+
+def save_booking(serializer, rules, **kwargs):
+    """
+    serializer.save(**kwargs), rejecting overlaps with a BookingConflict.
+
+    Uses the database's exclusion constraints when present and the locked
+    in-transaction check otherwise.
+    """
+    try:
+        with transaction.atomic():
+            instance = serializer.save(**kwargs)
+            check_overlaps(instance, rules)
+    except IntegrityError as exc:
+        rule = next((r for r in rules if r.constraint in str(exc)), None)
+        if rule is None:
+            raise
+        data = {**serializer.validated_data, **kwargs}
+        current = serializer.instance
+
+        def value(name):
+            if name in data:
+                return data[name]
+            return getattr(current, name, None)
+
+        key = value(rule.key)
+        conflicts = find_overlaps(
+            rule,
+            getattr(key, "pk", key),
+            value(rule.start),
+            value(rule.end),
+            exclude_pk=getattr(current, "pk", None),
+        )
+        raise BookingConflict(rule, conflicts) from exc
+    return instance
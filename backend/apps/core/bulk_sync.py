@@ -0,0 +1,114 @@
+"""
+Diff-based bulk upsert for rows mirrored from an external source.
+
+Imported calendar feeds (lessons.ExternalCalendarEvent, gigs.BandExternalEvent)
+are re-fetched whole on every refresh, and almost nothing in them changes
+between polls. sync_rows() loads the existing {key: (pk, content_hash)} map
+for the owning feed in one query, works out inserts, updates and deletes in
+memory, and applies them as:
+
+    bulk_create(update_conflicts=True)   new keys (safe against a concurrent refresh)
+    bulk_update                          keys whose content hash changed
+    one DELETE                           keys that have left the source
+
+so a refresh costs a handful of queries however many events the feed holds.
+Models opt in with a `content_hash` CharField(max_length=64).
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+BATCH_SIZE = 500
+
+
+@dataclass
+class SyncResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    @property
+    def total(self):
+        """Rows present in the source after the sync."""
+        return self.created + self.updated + self.unchanged
+
+
+def _canonical(value):
+    if isinstance(value, datetime):
+        # Same instant, same hash, whatever zone the source wrote it in
+        return value.astimezone(UTC).isoformat()
+    return str(value)
+
+
+def content_hash(fields):
+    """Stable sha256 of a row's field values."""
+    payload = json.dumps(fields, sort_keys=True, default=_canonical)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def sync_rows(model, scope, rows, key="uid", prune=None):
+    """
+    Make the rows of `model` matching `scope` mirror `rows`.
+
+    `scope` is the filter owning the rows, e.g. {"feed": feed}; its values are
+    also set on created rows. `rows` maps each key to a dict of field values;
+    pass a dict so a key repeated in the source keeps its last occurrence.
+    Keys missing from `rows` are deleted, narrowed by the optional `prune` Q
+    (e.g. only future events).
+    """
+    result = SyncResult()
+    existing = {
+        row_key: (pk, digest)
+        for row_key, pk, digest in model.objects.filter(**scope).values_list(
+            key, "pk", "content_hash"
+        )
+    }
+
+    now = timezone.now()
+    auto_now = [f.name for f in model._meta.concrete_fields if getattr(f, "auto_now", False)]
+    field_names = sorted({name for fields in rows.values() for name in fields})
+    to_create, to_update = [], []
+
+    for row_key, fields in rows.items():
+        digest = content_hash(fields)
+        current = existing.get(row_key)
+        if current is None:
+            to_create.append(model(**scope, **fields, **{key: row_key, "content_hash": digest}))
+        elif current[1] != digest:
+            obj = model(pk=current[0], **fields, content_hash=digest)
+            for name in auto_now:
+                setattr(obj, name, now)
+            to_update.append(obj)
+        else:
+            result.unchanged += 1
+
+    stale = [row_key for row_key in existing if row_key not in rows]
+
+    with transaction.atomic():
+        if to_create:
+            model.objects.bulk_create(
+                to_create,
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=[*scope, key],
+                update_fields=[*field_names, "content_hash", *auto_now],
+            )
+        if to_update:
+            model.objects.bulk_update(
+                to_update, [*field_names, "content_hash", *auto_now], batch_size=BATCH_SIZE
+            )
+        if stale:
+            doomed = model.objects.filter(**scope, **{f"{key}__in": stale})
+            if prune is not None:
+                doomed = doomed.filter(prune)
+            result.deleted = doomed.delete()[1].get(model._meta.label, 0)
+
+    result.created = len(to_create)
+    result.updated = len(to_update)
+    return result
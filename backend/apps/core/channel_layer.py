@@ -0,0 +1,340 @@
+"""
+Channel layer on the PostgreSQL database we already run.
+
+InMemoryChannelLayer only delivers within one process, so group_send from a
+Django-Q worker, or from a second daphne worker, never reaches a socket.
+PostgresChannelLayer shares delivery between processes without Redis:
+
+- Every process LISTENs on one Postgres channel per prefix of the channels it
+  hands out (`specific.<process token>!`), and a message for one of its
+  channels is a NOTIFY there carrying {"c": channel, "m": message}.
+- Messages too large for a NOTIFY payload (8000 bytes) are written to
+  ChannelPayload and the NOTIFY carries {"c": channel, "r": <row id>}.
+- Group membership lives in ChannelGroupMembership. group_send is a single
+  statement: one pg_notify() per member, computed in SQL.
+- Memberships lapse after `group_expiry` and stored payloads after `expiry`;
+  expired rows are deleted at most once per `expiry` seconds by whichever
+  process next joins a group.
+
+Delivery is at most once, like the other channel layers: a NOTIFY sent while
+a process is reconnecting its listener is lost, and messages not received
+within `expiry` seconds are dropped. Only process-specific channels (the ones
+consumers get from new_channel()) can be received on; worker channels are
+not supported.
+
+Enable it with CHANNEL_LAYER=postgres (see config/settings.py). The listening
+connection is polled from the event loop; everything else runs on a separate
+connection in a worker thread, so sync callers (async_to_sync(group_send)
+from views and tasks) work from any thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import secrets
+import threading
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+import psycopg2
+from asgiref.sync import sync_to_async
+from channels.layers import BaseChannelLayer
+
+from .models import ChannelGroupMembership, ChannelPayload
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must be shorter than 8000 bytes
+NOTIFY_PAYLOAD_LIMIT = 7900
+RECONNECT_DELAY = 1
+
+GROUPS = ChannelGroupMembership._meta.db_table
+PAYLOADS = ChannelPayload._meta.db_table
+
+# Postgres channel a process-specific channel is delivered on; must match _pg_channel()
+PG_CHANNEL_SQL = "'chan_' || left(md5(split_part(channel, '!', 1) || '!'), 24)"
+
+
+def _pg_channel(channel):
+    """The Postgres channel (a short identifier) for the process part of `channel`."""
+    process = channel.split("!", 1)[0] + "!"
+    return "chan_" + hashlib.md5(process.encode()).hexdigest()[:24]
+
+
+def _dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, separators=(",", ":"))
+
+
+class _Listener:
+    """The LISTEN connection of one event loop, feeding notifications to the layer."""
+
+    def __init__(self, layer, loop):
+        self.layer = layer
+        self.loop = loop
+        self.connection = None
+        self.closed = False
+        self.pg_channels = set()
+        self.notifications = asyncio.Queue()
+        self.task = loop.create_task(self._dispatch())
+
+    def listen(self, pg_channel):
+        if pg_channel in self.pg_channels:
+            return
+        self.pg_channels.add(pg_channel)
+        if self.connection is None:
+            self._connect()
+        else:
+            self._execute(f'LISTEN "{pg_channel}"')
+
+    def _execute(self, query):
+        # Only at startup and for new prefixes; a single short round trip
+        with self.connection.cursor() as cursor:
+            cursor.execute(query)
+        self._drain()
+
+    def _drain(self):
+        while self.connection.notifies:
+            self.notifications.put_nowait(self.connection.notifies.pop(0).payload)
+
+    def _connect(self):
+        if self.closed:
+            return
+        try:
+            self.connection = self.layer._connect()
+            for pg_channel in self.pg_channels:
+                self._execute(f'LISTEN "{pg_channel}"')
+        except psycopg2.Error as e:
+            logger.warning(f"Channel layer could not listen, retrying: {e}")
+            self._disconnect()
+            self.loop.call_later(RECONNECT_DELAY, self._connect)
+            return
+        self.loop.add_reader(self.connection.fileno(), self._readable)
+
+    def _disconnect(self):
+        if self.connection is None:
+            return
+        try:
+            self.loop.remove_reader(self.connection.fileno())
+        except (ValueError, RuntimeError, psycopg2.Error):
+            pass  # closed connection or loop
+        self.connection.close()
+        self.connection = None
+
+    def _readable(self):
+        try:
+            self.connection.poll()
+        except psycopg2.Error as e:
+            logger.warning(f"Channel layer lost its listening connection: {e}")
+            self._disconnect()
+            self.loop.call_later(RECONNECT_DELAY, self._connect)
+            return
+        self._drain()
+
+    async def _dispatch(self):
+        # One at a time, so fetching a stored payload can't reorder messages
+        while True:
+            notification = await self.notifications.get()
+            try:
+                data = json.loads(notification)
+                if "r" in data:
+                    message = await self.layer._fetch_payload(data["r"])
+                    if message is None:
+                        continue  # expired
+                else:
+                    message = data["m"]
+            except Exception as e:
+                logger.error(f"Dropping unreadable channel layer notification: {e}")
+                continue
+            self.layer._deliver(data["c"], message)
+
+    def close(self):
+        self.closed = True
+        try:
+            self.task.cancel()
+        except RuntimeError:
+            pass  # its loop is already closed
+        self._disconnect()
+
+
+class PostgresChannelLayer(BaseChannelLayer):
+    """Channel layer delivering through PostgreSQL LISTEN/NOTIFY."""
+
+    extensions = ["groups", "flush"]
+
+    def __init__(
+        self,
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        alias="default",
+        **kwargs,
+    ):
+        super().__init__(
+            expiry=expiry, capacity=capacity, channel_capacity=channel_capacity, **kwargs
+        )
+        self.group_expiry = group_expiry
+        self.alias = alias
+        self.client_prefix = secrets.token_hex(6)
+        # channel -> asyncio.Queue of (deadline, message)
+        self.buffers = {}
+        self._listener = None
+        self._connection = None
+        self._connection_lock = threading.Lock()
+        self._next_cleanup = 0
+
+    # Connections
+
+    def _connect(self):
+        connection = psycopg2.connect(**connections[self.alias].get_connection_params())
+        connection.autocommit = True
+        return connection
+
+    def _execute(self, query, params=(), fetch=False):
+        """Run one statement on the command connection (blocking)."""
+        with self._connection_lock:
+            if self._connection is None or self._connection.closed:
+                self._connection = self._connect()
+            try:
+                with self._connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    return cursor.fetchall() if fetch else None
+            except psycopg2.OperationalError:
+                # Reconnect on the next call
+                self._connection.close()
+                raise
+
+    async def _run(self, query, params=(), fetch=False):
+        return await sync_to_async(self._execute, thread_sensitive=False)(query, params, fetch)
+
+    def _listen(self, channel):
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.loop is not loop:
+            if self._listener is not None:
+                self._listener.close()
+            self._listener = _Listener(self, loop)
+        self._listener.listen(_pg_channel(channel))
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        notification = _dumps({"c": channel, "m": message})
+        if len(notification.encode()) <= NOTIFY_PAYLOAD_LIMIT:
+            await self._run("SELECT pg_notify(%s, %s)", [_pg_channel(channel), notification])
+        else:
+            await self._run(
+                f"WITH stored AS ("
+                f"  INSERT INTO {PAYLOADS} (payload, expires_at)"
+                f"  VALUES (%s, now() + %s * interval '1 second') RETURNING id"
+                f") SELECT pg_notify(%s, json_build_object('c', %s, 'r', id)::text) FROM stored",
+                [_dumps(message), self.expiry, _pg_channel(channel), channel],
+            )
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+        if "!" not in channel:
+            raise NotImplementedError("PostgresChannelLayer only receives on specific channels")
+        self._listen(channel)
+        buffer = self.buffers.setdefault(channel, asyncio.Queue())
+        try:
+            while True:
+                deadline, message = await buffer.get()
+                if deadline >= time.time():
+                    return message
+        except asyncio.CancelledError:
+            # The consumer stopped receiving; forget the channel unless more is waiting
+            if buffer.empty():
+                self.buffers.pop(channel, None)
+            raise
+
+    async def new_channel(self, prefix="specific."):
+        channel = f"{prefix}{self.client_prefix}!{secrets.token_hex(6)}"
+        self._listen(channel)
+        self.buffers.setdefault(channel, asyncio.Queue())
+        return channel
+
+    def _deliver(self, channel, message):
+        buffer = self.buffers.get(channel)
+        if buffer is None:
+            return  # nobody receives on it any more
+        if buffer.qsize() >= self.get_capacity(channel):
+            logger.warning(f"Channel {channel} is full; dropping a message")
+            return
+        buffer.put_nowait((time.time() + self.expiry, message))
+
+    async def _fetch_payload(self, payload_id):
+        rows = await self._run(
+            f"SELECT payload FROM {PAYLOADS} WHERE id = %s AND expires_at > now()",
+            [payload_id],
+            fetch=True,
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    # Groups extension
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        await self._run(
+            f"INSERT INTO {GROUPS} (group_name, channel, expires_at) "
+            f"VALUES (%s, %s, now() + %s * interval '1 second') "
+            f"ON CONFLICT (group_name, channel) DO UPDATE SET expires_at = EXCLUDED.expires_at",
+            [group, channel, self.group_expiry],
+        )
+        if time.monotonic() >= self._next_cleanup:
+            self._next_cleanup = time.monotonic() + self.expiry
+            await self._run(
+                f"WITH lapsed AS (DELETE FROM {GROUPS} WHERE expires_at <= now()) "
+                f"DELETE FROM {PAYLOADS} WHERE expires_at <= now()"
+            )
+
+    async def group_discard(self, group, channel):
+        assert self.valid_channel_name(channel), "Invalid channel name"
+        assert self.valid_group_name(group), "Invalid group name"
+        await self._run(
+            f"DELETE FROM {GROUPS} WHERE group_name = %s AND channel = %s", [group, channel]
+        )
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        assert self.valid_group_name(group), "Invalid group name"
+        body = _dumps(message)
+        # Room for {"c": "<channel>", "m": ...} around the message
+        if len(body.encode()) + self.MAX_NAME_LENGTH + 16 <= NOTIFY_PAYLOAD_LIMIT:
+            await self._run(
+                f"SELECT pg_notify({PG_CHANNEL_SQL}, "
+                f"json_build_object('c', channel, 'm', %s::json)::text) "
+                f"FROM {GROUPS} WHERE group_name = %s AND expires_at > now()",
+                [body, group],
+            )
+        else:
+            await self._run(
+                f"WITH stored AS ("
+                f"  INSERT INTO {PAYLOADS} (payload, expires_at)"
+                f"  VALUES (%s, now() + %s * interval '1 second') RETURNING id"
+                f") SELECT pg_notify({PG_CHANNEL_SQL}, "
+                f"json_build_object('c', channel, 'r', stored.id)::text) "
+                f"FROM {GROUPS}, stored WHERE group_name = %s AND expires_at > now()",
+                [body, self.expiry, group],
+            )
+
+    # Flush extension
+
+    async def flush(self):
+        self.buffers = {}
+        await self._run(f"DELETE FROM {GROUPS}")
+        await self._run(f"DELETE FROM {PAYLOADS}")
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        with self._connection_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
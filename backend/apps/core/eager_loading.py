@@ -0,0 +1,359 @@
+"""
+Eager loading planned from the serializer instead of by hand.
+
+List endpoints go N+1 whenever a serializer reaches across a relation the
+viewset forgot to select_related / prefetch_related, and the two drift apart
+every time a field is added. EagerLoadingMixin derives the loading from the
+serializer that will render the response:
+
+- every field's `source` is walked against the model: forward FKs and
+  one-to-ones go into select_related, and anything at or past a to-many
+  relation (reverse FKs, M2Ms, `many=True` fields) into prefetch_related;
+- nested serializers are walked recursively under their own source;
+- a PrimaryKeyRelatedField on a FK needs nothing (it reads `<fk>_id`);
+- SerializerMethodFields can't be inspected, so serializers declare what
+  they touch in Meta:
+
+      class Meta:
+          eager_load = {"member_details": ["members__user"]}
+
+Counters are declared with AnnotatedCountField instead of a
+SerializerMethodField running .count() per row:
+
+    members_count = AnnotatedCountField("members")
+    unread_count = AnnotatedCountField(
+        "messages", filter=lambda request: ~Q(sender=request.user)
+    )
+
+The plan turns each into an annotation on the viewset queryset: a
+Count(relation, filter=...) when it is the only to-many join in the query,
+or a correlated COUNT subquery when a join would fan out (several counters,
+a filter crossing another to-many relation, or a queryset already joined
+through one). Instances that didn't come from an annotated queryset (the
+object returned by create/update) fall back to the same count, queried for
+that one row.
+
+Plans are cached per serializer class. On list responses the mixin also
+watches for queries issued while serializing, which means a relation was
+read without being loaded; they are logged, and raise LazyLoadError when
+settings.EAGER_LOADING_STRICT is set (the test suite's N+1 tripwire).
+"""
+
+import functools
+import logging
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+class LazyLoadError(RuntimeError):
+    """A list response queried the database while serializing rows."""
+
+
+def _condition(count_filter, request):
+    """The Q a counter filters by; None if it needs a request and has none."""
+    if callable(count_filter):
+        return None if request is None else count_filter(request)
+    return count_filter or Q()
+
+
+class AnnotatedCountField(serializers.ReadOnlyField):
+    """
+    Count of a to-many relation, annotated by EagerLoadingMixin. `filter` is
+    a Q over the related model, or a callable taking the request and
+    returning one; without a request such a counter is 0.
+    """
+
+    def __init__(self, relation, filter=None, **kwargs):
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+        self.relation = relation
+        self.count_filter = filter
+
+    @property
+    def annotation(self):
+        return f"{self.field_name}_annotated"
+
+    def to_representation(self, obj):
+        if hasattr(obj, self.annotation):
+            return getattr(obj, self.annotation)
+        condition = _condition(self.count_filter, self.context.get("request"))
+        if condition is None:
+            return 0
+        # Annotate the row itself, so filters that refer back to it still resolve
+        model = type(obj)
+        count = _count_subquery(*_relation(model, self.relation), condition)
+        return model._default_manager.filter(pk=obj.pk).values_list(count, flat=True).get()
+
+
+@dataclass
+class EagerLoadPlan:
+    select_related: set = field(default_factory=set)
+    prefetch_related: set = field(default_factory=set)
+    # (annotation, relation, filter) per AnnotatedCountField
+    counters: list = field(default_factory=list)
+
+    def add_path(self, model, attrs, load_leaf=True):
+        """Classify one attribute path (e.g. ["student", "user", "get_full_name"])."""
+        relations = []
+        first_many = None
+        for attr in attrs:
+            related = _relation(model, attr)
+            if related is None:
+                break
+            relation, model = related
+            relations.append(attr)
+            if first_many is None and (relation.many_to_many or relation.one_to_many):
+                first_many = len(relations)
+        if relations and not load_leaf and first_many is None and len(relations) == len(attrs):
+            # e.g. PrimaryKeyRelatedField: only the FK column is read
+            relations.pop()
+        if not relations:
+            return
+        if first_many is None:
+            self.select_related.add("__".join(relations))
+        else:
+            if first_many > 1:
+                self.select_related.add("__".join(relations[: first_many - 1]))
+            self.prefetch_related.add("__".join(relations))
+
+    def apply(self, queryset, request=None):
+        if queryset.query.combinator or queryset.query.values_select:
+            return queryset
+        if self.counters:
+            queryset = queryset.annotate(**self._counts(queryset, request))
+        if self.select_related:
+            queryset = queryset.select_related(*_deepest(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*_deepest(self.prefetch_related))
+        return queryset
+
+    def _counts(self, queryset, request):
+        model = queryset.model
+        joinable = len(self.counters) == 1 and not (
+            queryset.query.distinct or _joins_to_many(queryset.query)
+        )
+        counts = {}
+        for annotation, relation_name, count_filter in self.counters:
+            condition = _condition(count_filter, request)
+            if condition is None:
+                continue
+            relation, related_model = _relation(model, relation_name)
+            prefixed = _prefixed(condition, relation_name)
+            if joinable and prefixed is not None and not _fans_out(related_model, condition):
+                counts[annotation] = Count(relation_name, filter=prefixed or None)
+            else:
+                counts[annotation] = _count_subquery(relation, related_model, condition)
+        return counts
+
+
+def _joins_to_many(query):
+    return any(
+        getattr(join, "join_field", None) is not None
+        and (join.join_field.one_to_many or join.join_field.many_to_many)
+        for join in query.alias_map.values()
+    )
+
+
+def _lookups(condition):
+    for child in condition.children:
+        if isinstance(child, Q):
+            yield from _lookups(child)
+        elif isinstance(child, tuple):
+            yield child[0]
+
+
+def _fans_out(model, condition):
+    """Whether filtering `model` by `condition` joins through a to-many relation."""
+    for lookup in _lookups(condition):
+        current = model
+        for attr in lookup.split("__"):
+            related = _relation(current, attr)
+            if related is None:
+                break
+            relation, current = related
+            if relation.many_to_many or relation.one_to_many:
+                return True
+    return False
+
+
+def _prefixed(condition, prefix):
+    """`condition` rewritten from the related model's side, or None if it can't be."""
+    clone = Q()
+    clone.connector, clone.negated = condition.connector, condition.negated
+    for child in condition.children:
+        if isinstance(child, Q):
+            child = _prefixed(child, prefix)
+            if child is None:
+                return None
+        elif isinstance(child, tuple) and not hasattr(child[1], "resolve_expression"):
+            child = (f"{prefix}__{child[0]}", child[1])
+        else:
+            # Expressions (Exists, F, OuterRef, ...) can't be re-rooted
+            return None
+        clone.children.append(child)
+    return clone
+
+
+def _count_subquery(relation, related_model, condition):
+    if relation.auto_created and not relation.concrete:
+        back = relation.field.name  # reverse FK / reverse M2M
+    else:
+        back = relation.related_query_name()  # forward M2M
+    rows = related_model._default_manager.filter(**{back: OuterRef("pk")}).filter(condition)
+    counted = rows.order_by().values(back).annotate(n=Count("pk")).values("n")
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def _deepest(paths):
+    # "student" is implied by "student__user"
+    return sorted(p for p in paths if not any(o.startswith(p + "__") for o in paths))
+
+
+def _relation(model, attr):
+    """(relation field, related model) for attribute `attr` of `model`, or None."""
+    try:
+        relation = model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        # Reverse relations without a related_name are reached as "<model>_set"
+        relation = next(
+            (
+                f
+                for f in model._meta.get_fields()
+                if f.auto_created and not f.concrete and f.get_accessor_name() == attr
+            ),
+            None,
+        )
+    if relation is None or not relation.is_relation or relation.related_model is None:
+        return None
+    return relation, relation.related_model
+
+
+def _walk(plan, serializer, root, model, prefix):
+    """Add `serializer`'s fields to `plan`; `model` is reached from `root` by `prefix`."""
+    hints = getattr(getattr(serializer, "Meta", None), "eager_load", {})
+    for name, serializer_field in serializer.fields.items():
+        if serializer_field.write_only:
+            continue
+        for path in hints.get(name, ()):
+            plan.add_path(root, prefix + path.split("__"))
+
+        if isinstance(serializer_field, AnnotatedCountField):
+            _walk_counter(plan, serializer_field, prefix)
+        elif isinstance(serializer_field, serializers.ListSerializer):
+            _walk_many(plan, serializer_field, root, model, prefix)
+        elif isinstance(serializer_field, serializers.Serializer):
+            _walk_nested(plan, serializer_field, root, model, prefix)
+        elif serializer_field.source_attrs:
+            _walk_leaf(plan, serializer_field, root, prefix)
+
+
+def _walk_counter(plan, serializer_field, prefix):
+    if not prefix:
+        plan.counters.append(
+            (serializer_field.annotation, serializer_field.relation, serializer_field.count_filter)
+        )
+
+
+def _walk_many(plan, serializer_field, root, model, prefix):
+    attrs = serializer_field.source_attrs
+    plan.add_path(root, prefix + attrs)
+    related = _follow(model, attrs)
+    if related is not None and isinstance(serializer_field.child, serializers.Serializer):
+        _walk(plan, serializer_field.child, root, related, prefix + attrs)
+
+
+def _walk_nested(plan, serializer_field, root, model, prefix):
+    attrs = serializer_field.source_attrs
+    if attrs:
+        plan.add_path(root, prefix + attrs)
+        related = _follow(model, attrs)
+    else:
+        related = model  # source="*"
+    if related is not None:
+        _walk(plan, serializer_field, root, related, prefix + attrs)
+
+
+def _walk_leaf(plan, serializer_field, root, prefix):
+    load_leaf = not (
+        isinstance(serializer_field, serializers.RelatedField)
+        and serializer_field.use_pk_only_optimization()
+    )
+    plan.add_path(root, prefix + serializer_field.source_attrs, load_leaf=load_leaf)
+
+
+def _follow(model, attrs):
+    for attr in attrs:
+        related = _relation(model, attr)
+        if related is None:
+            return None
+        model = related[1]
+    return model
+
+
+@functools.cache
+def plan_for(serializer_class):
+    """The EagerLoadPlan for a ModelSerializer class."""
+    plan = EagerLoadPlan()
+    model = getattr(getattr(serializer_class, "Meta", None), "model", None)
+    if model is not None:
+        _walk(plan, serializer_class(), model, model, [])
+    return plan
+
+
+class EagerLoadingMixin:
+    """
+    GenericAPIView mixin that eager-loads whatever the serializer reads.
+
+    Applied in filter_queryset(), so it covers list and retrieve whatever
+    get_queryset() each viewset defines. Loading for other actions is left
+    alone (writes don't need it, and counters fall back to a query).
+    """
+
+    eager_load_actions = ("list", "retrieve")
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, "action", None) in self.eager_load_actions:
+            queryset = plan_for(self.get_serializer_class()).apply(queryset, self.request)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        rows = list(page if page is not None else queryset)
+        data = self._serialize_rows(rows)
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def _serialize_rows(self, rows):
+        lazy = []
+
+        def record(execute, sql, params, many, context):
+            lazy.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            data = self.get_serializer(rows, many=True).data
+
+        if lazy:
+            message = (
+                f"{type(self).__name__} issued {len(lazy)} queries while serializing "
+                f"{len(rows)} rows; a relation was read without being loaded: {lazy[0]}"
+            )
+            if getattr(settings, "EAGER_LOADING_STRICT", False):
+                raise LazyLoadError(message)
+            logger.warning(message)
+        return data
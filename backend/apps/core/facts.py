@@ -0,0 +1,168 @@
+"""
+Daily fact tables for studio time-series analytics.
+
+StudioDailyFact stores lessons, revenue and enrolments per studio and day,
+broken down by teacher, instrument and status. Facts are rebuilt one
+(studio, kind, day) partition at a time: the partition's rows are deleted and
+re-aggregated from the source table, so every load is idempotent.
+
+The nightly Django-Q job (apps.core.tasks.refresh_daily_facts) only rebuilds
+partitions whose source rows changed since the last load, tracked by a
+FactWatermark per source:
+
+    lesson     Lesson.updated_at, bucketed by scheduled_start
+    revenue    Invoice.updated_at, bucketed by paid_date (issue_date if unset)
+    enrolment  Student.updated_at, bucketed by created_at
+
+Hard deletes and lessons moved off a day are not visible to the watermark;
+`manage.py backfill_daily_facts` re-derives any range from scratch.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, DurationField, ExpressionWrapper, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from apps.billing.models import Invoice
+from apps.lessons.models import Lesson
+
+from .models import FactWatermark, Student, StudioDailyFact
+
+logger = logging.getLogger(__name__)
+
+# Re-read rows changed shortly before the previous watermark, so writes that
+# were still in flight when it was taken are not missed
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+FACT_KINDS = ["lesson", "revenue", "enrolment"]
+
+
+def _source_queryset(kind):
+    """Source rows for a fact kind, annotated with the day they count towards."""
+    if kind == "lesson":
+        return Lesson.objects.annotate(fact_day=TruncDate("scheduled_start"))
+    if kind == "revenue":
+        return Invoice.objects.annotate(fact_day=Coalesce("paid_date", "issue_date"))
+    return Student.objects.annotate(fact_day=TruncDate("created_at"))
+
+
+def _aggregate_rows(kind, queryset):
+    """Group source rows into fact dimensions and measures."""
+    if kind == "lesson":
+        return (
+            queryset.annotate(
+                fact_teacher=F("teacher_id"),
+                fact_instrument=Coalesce("student__instrument", Value("")),
+                fact_status=F("status"),
+            )
+            .values("fact_day", "fact_teacher", "fact_instrument", "fact_status")
+            .annotate(
+                fact_count=Count("id"),
+                fact_duration=Sum(
+                    ExpressionWrapper(
+                        F("scheduled_end") - F("scheduled_start"), output_field=DurationField()
+                    )
+                ),
+            )
+            .order_by()
+        )
+    if kind == "revenue":
+        return (
+            queryset.filter(amount_paid__gt=0)
+            .annotate(
+                fact_teacher=F("teacher_id"),
+                fact_instrument=Coalesce("student__instrument", Value("")),
+                fact_status=F("status"),
+            )
+            .values("fact_day", "fact_teacher", "fact_instrument", "fact_status")
+            .annotate(fact_count=Count("id"), fact_amount=Sum("amount_paid"))
+            .order_by()
+        )
+    return (
+        queryset.annotate(
+            fact_teacher=F("primary_teacher_id"),
+            fact_instrument=F("instrument"),
+            fact_status=Case(When(is_active=True, then=Value("active")), default=Value("inactive")),
+        )
+        .values("fact_day", "fact_teacher", "fact_instrument", "fact_status")
+        .annotate(fact_count=Count("id"))
+        .order_by()
+    )
+
+
+def _day_filter(field, days=None, start=None, end=None):
+    q = Q()
+    if days is not None:
+        q &= Q(**{f"{field}__in": days})
+    if start:
+        q &= Q(**{f"{field}__gte": start})
+    if end:
+        q &= Q(**{f"{field}__lte": end})
+    return q
+
+
+def rebuild_partitions(kind, studio_id, days=None, start=None, end=None):
+    """
+    Replace the facts of one kind for a studio, either for the given days or
+    for the start/end date range (open-ended when omitted). Returns the
+    number of fact rows written.
+    """
+    source = _source_queryset(kind).filter(studio_id=studio_id)
+    source = source.filter(_day_filter("fact_day", days, start, end))
+
+    facts = []
+    for row in _aggregate_rows(kind, source):
+        duration = row.get("fact_duration")
+        facts.append(
+            StudioDailyFact(
+                studio_id=studio_id,
+                day=row["fact_day"],
+                kind=kind,
+                teacher_id=row["fact_teacher"],
+                instrument=row["fact_instrument"] or "",
+                status=row["fact_status"],
+                count=row["fact_count"],
+                minutes=int(duration.total_seconds() // 60) if duration else 0,
+                amount=row.get("fact_amount") or 0,
+            )
+        )
+
+    with transaction.atomic():
+        StudioDailyFact.objects.filter(studio_id=studio_id, kind=kind).filter(
+            _day_filter("day", days, start, end)
+        ).delete()
+        StudioDailyFact.objects.bulk_create(facts)
+    return len(facts)
+
+
+def load_incremental(now=None):
+    """
+    Rebuild the partitions touched since each source's watermark and advance
+    the watermarks. Returns {kind: partitions rebuilt}.
+    """
+    now = now or timezone.now()
+    summary = {}
+
+    for kind in FACT_KINDS:
+        watermark = FactWatermark.objects.filter(source=kind).first()
+        changed = _source_queryset(kind)
+        if watermark:
+            changed = changed.filter(updated_at__gte=watermark.high_water)
+
+        days_by_studio = defaultdict(set)
+        for studio_id, day in changed.values_list("studio_id", "fact_day").distinct().order_by():
+            days_by_studio[studio_id].add(day)
+
+        for studio_id, days in days_by_studio.items():
+            rebuild_partitions(kind, studio_id, days=sorted(days))
+
+        FactWatermark.objects.update_or_create(
+            source=kind, defaults={"high_water": now - WATERMARK_OVERLAP}
+        )
+        summary[kind] = sum(len(days) for days in days_by_studio.values())
+
+    return summary
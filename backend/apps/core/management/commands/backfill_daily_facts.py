@@ -0,0 +1,59 @@
+"""
+Management command to rebuild the daily fact table from the source tables.
+
+Use after first deploying the fact table, or to repair a range the nightly
+incremental load cannot see (hard deletes, lessons moved to another day).
+
+Usage:
+    python manage.py backfill_daily_facts
+    python manage.py backfill_daily_facts --studio <uuid> --start 2025-01-01 --end 2025-12-31
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.facts import FACT_KINDS, WATERMARK_OVERLAP, rebuild_partitions
+from apps.core.models import FactWatermark, Studio
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily analytics facts for a date range"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--studio", help="Only rebuild facts for this studio id")
+        parser.add_argument("--start", help="First day to rebuild (YYYY-MM-DD)")
+        parser.add_argument("--end", help="Last day to rebuild (YYYY-MM-DD)")
+        parser.add_argument("--kind", choices=FACT_KINDS, help="Only rebuild one kind of fact")
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options["start"]) if options["start"] else None
+            end = date.fromisoformat(options["end"]) if options["end"] else None
+        except ValueError:
+            raise CommandError("--start and --end must be dates in YYYY-MM-DD format") from None
+
+        studios = Studio.objects.all()
+        if options["studio"]:
+            studios = studios.filter(id=options["studio"])
+        kinds = [options["kind"]] if options["kind"] else FACT_KINDS
+
+        started = timezone.now()
+        total = 0
+        for studio in studios:
+            for kind in kinds:
+                written = rebuild_partitions(kind, studio.id, start=start, end=end)
+                total += written
+                self.stdout.write(f"{studio.name}: {written} {kind} fact row(s)")
+
+        # A full rebuild covers everything the incremental load has not seen yet
+        if not (options["studio"] or start or end):
+            for kind in kinds:
+                FactWatermark.objects.update_or_create(
+                    source=kind, defaults={"high_water": started - WATERMARK_OVERLAP}
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {total} fact row(s) for {len(studios)} studio(s)")
+        )
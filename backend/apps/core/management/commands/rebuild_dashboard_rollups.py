@@ -0,0 +1,66 @@
+"""
+Management command to recompute dashboard rollups from scratch.
+
+Compares the stored StudioDashboardRollup rows with freshly aggregated values,
+reports any drift (e.g. from queryset.update() calls that bypass signals) and
+writes the corrected rows.
+
+Usage:
+    python manage.py rebuild_dashboard_rollups
+    python manage.py rebuild_dashboard_rollups --studio <uuid> --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.core.models import Studio, StudioDashboardRollup
+from apps.core.rollups import ROLLUP_COUNTER_FIELDS, compute_rollup_values
+
+
+class Command(BaseCommand):
+    help = "Recompute per-studio dashboard rollups and report drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--studio", help="Only rebuild the rollup for this studio id")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing corrected rollups",
+        )
+
+    def handle(self, *args, **options):
+        studios = Studio.objects.all()
+        if options["studio"]:
+            studios = studios.filter(id=options["studio"])
+
+        existing = {
+            rollup.studio_id: rollup
+            for rollup in StudioDashboardRollup.objects.filter(studio__in=studios)
+        }
+
+        drifted = 0
+        for studio in studios:
+            values = compute_rollup_values(studio.id)
+            rollup = existing.get(studio.id)
+
+            if rollup is None:
+                drifted += 1
+                self.stdout.write(self.style.WARNING(f"{studio.name}: rollup missing"))
+            else:
+                changes = [
+                    f"{field} {getattr(rollup, field)} -> {values[field]}"
+                    for field in ROLLUP_COUNTER_FIELDS
+                    if getattr(rollup, field) != values[field]
+                ]
+                if changes:
+                    drifted += 1
+                    self.stdout.write(
+                        self.style.WARNING(f"{studio.name}: drift in {', '.join(changes)}")
+                    )
+
+            if not options["dry_run"]:
+                StudioDashboardRollup.objects.update_or_create(studio=studio, defaults=values)
+
+        summary = f"Checked {len(studios)} studio(s), {drifted} with drift"
+        if options["dry_run"]:
+            summary += " (dry run, nothing written)"
+        self.stdout.write(self.style.SUCCESS(summary))
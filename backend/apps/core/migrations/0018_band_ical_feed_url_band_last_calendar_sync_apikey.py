@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:29
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0017_user_is_approved"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="band",
+            name="ical_feed_url",
+            field=models.URLField(
+                blank=True,
+                help_text="Public or secret iCal (.ics) feed URL for auto-syncing external events",
+            ),
+        ),
+        migrations.AddField(
+            model_name="band",
+            name="last_calendar_sync",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="APIKey",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("prefix", models.CharField(max_length=16, unique=True)),
+                ("key_hash", models.CharField(max_length=64)),
+                ("is_active", models.BooleanField(default=True)),
+                ("last_used_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("revoked_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="api_keys",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "studio",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="api_keys",
+                        to="core.studio",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "api_keys",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
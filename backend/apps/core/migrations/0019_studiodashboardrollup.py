@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0018_band_ical_feed_url_band_last_calendar_sync_apikey"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StudioDashboardRollup",
+            fields=[
+                (
+                    "studio",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="dashboard_rollup",
+                        serialize=False,
+                        to="core.studio",
+                    ),
+                ),
+                ("week_start", models.DateField()),
+                ("month_start", models.DateField()),
+                ("active_students", models.IntegerField(default=0)),
+                ("new_students_month", models.IntegerField(default=0)),
+                ("active_teachers", models.IntegerField(default=0)),
+                ("lessons_this_week", models.IntegerField(default=0)),
+                ("lessons_completed", models.IntegerField(default=0)),
+                ("lessons_cancelled", models.IntegerField(default=0)),
+                ("lessons_no_show", models.IntegerField(default=0)),
+                ("revenue_month", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("unpaid_balance", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("refreshed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "studio_dashboard_rollups",
+            },
+        ),
+    ]
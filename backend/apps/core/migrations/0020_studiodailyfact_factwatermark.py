@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0019_studiodashboardrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FactWatermark",
+            fields=[
+                ("source", models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ("high_water", models.DateTimeField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "fact_watermarks",
+            },
+        ),
+        migrations.CreateModel(
+            name="StudioDailyFact",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("lesson", "Lesson"),
+                            ("revenue", "Revenue"),
+                            ("enrolment", "Enrolment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("instrument", models.CharField(blank=True, max_length=100)),
+                ("status", models.CharField(blank=True, max_length=20)),
+                ("count", models.IntegerField(default=0)),
+                ("minutes", models.IntegerField(default=0, help_text="Scheduled lesson minutes")),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Amount paid", max_digits=12
+                    ),
+                ),
+                (
+                    "studio",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_facts",
+                        to="core.studio",
+                    ),
+                ),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="daily_facts",
+                        to="core.teacher",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "studio_daily_facts",
+                "indexes": [
+                    models.Index(
+                        fields=["studio", "kind", "day"], name="studio_dail_studio__c1b082_idx"
+                    )
+                ],
+            },
+        ),
+    ]
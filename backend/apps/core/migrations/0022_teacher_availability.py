@@ -0,0 +1,133 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of apps.core.availability.parse_weekly_availability as of this
+# migration, so later changes to the live parser can't change what it backfills.
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_weekday(key):
+    key = str(key).strip().lower()
+    if key.isdigit() and int(key) < 7:
+        return int(key)
+    for index, name in enumerate(WEEKDAYS):
+        if key in (name, name[:3]):
+            return index
+    return None
+
+
+def parse_minute(value):
+    try:
+        hours, minutes = str(value).split(":")[:2]
+        total = int(hours) * 60 + int(minutes)
+    except (TypeError, ValueError):
+        return None
+    return total if 0 <= total <= MINUTES_PER_DAY else None
+
+
+def merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def parse_weekly_availability(availability):
+    weekly = {}
+    if not isinstance(availability, dict):
+        return weekly
+
+    for key, ranges in availability.items():
+        weekday = parse_weekday(key)
+        if weekday is None or not isinstance(ranges, list):
+            continue
+        for item in ranges:
+            if isinstance(item, dict):
+                start, end = parse_minute(item.get("start")), parse_minute(item.get("end"))
+            elif isinstance(item, (list, tuple)) and len(item) == 2:
+                start, end = parse_minute(item[0]), parse_minute(item[1])
+            else:
+                continue
+            if start is not None and end is not None and start < end:
+                weekly.setdefault(weekday, []).append((start, end))
+
+    return {weekday: merge_ranges(ranges) for weekday, ranges in weekly.items()}
+
+
+def backfill_availability(apps, schema_editor):
+    Teacher = apps.get_model("core", "Teacher")
+    TeacherAvailability = apps.get_model("core", "TeacherAvailability")
+
+    rows = []
+    for teacher in Teacher.objects.exclude(availability={}).iterator():
+        for weekday, ranges in parse_weekly_availability(teacher.availability).items():
+            rows.extend(
+                TeacherAvailability(
+                    teacher_id=teacher.pk,
+                    studio_id=teacher.studio_id,
+                    weekday=weekday,
+                    start_minute=start,
+                    end_minute=end,
+                )
+                for start, end in ranges
+            )
+    TeacherAvailability.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0021_reportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeacherAvailability",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("weekday", models.PositiveSmallIntegerField()),
+                ("start_minute", models.PositiveSmallIntegerField()),
+                ("end_minute", models.PositiveSmallIntegerField()),
+                (
+                    "studio",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="teacher_availability",
+                        to="core.studio",
+                    ),
+                ),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="availability_windows",
+                        to="core.teacher",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "teacher_availability",
+                "ordering": ["weekday", "start_minute"],
+                "indexes": [
+                    models.Index(
+                        fields=["studio", "weekday", "start_minute", "end_minute"],
+                        name="teacher_ava_studio__9ab329_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_availability, migrations.RunPython.noop),
+    ]
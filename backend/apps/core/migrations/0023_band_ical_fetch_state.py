@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0022_teacher_availability"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="band",
+            name="ical_content_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="band",
+            name="ical_etag",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="band",
+            name="ical_failure_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="band",
+            name="ical_last_attempted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="band",
+            name="ical_last_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="band",
+            name="ical_last_modified",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0023_band_ical_fetch_state"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChannelPayload",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("payload", models.TextField()),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "db_table": "channel_layer_payloads",
+            },
+        ),
+        migrations.CreateModel(
+            name="ChannelGroupMembership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("group_name", models.CharField(max_length=100)),
+                ("channel", models.CharField(max_length=100)),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "db_table": "channel_layer_groups",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("group_name", "channel"), name="channel_layer_group_unique"
+                    )
+                ],
+            },
+        ),
+    ]
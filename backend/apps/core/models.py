@@ -239,6 +239,36 @@ class Teacher(models.Model):
         return f"{self.user.get_full_name()} - {self.studio.name}"
 
 
+class TeacherAvailability(models.Model):
+    """
+    One weekly window from Teacher.availability, normalised so cross-teacher
+    "who is free on <weekday> from <start> to <end>" questions are an index
+    range scan. Rebuilt from the JSON whenever the teacher is saved
+    (apps.core.availability.sync_teacher_availability).
+    """
+
+    teacher = models.ForeignKey(
+        Teacher, on_delete=models.CASCADE, related_name="availability_windows"
+    )
+    studio = models.ForeignKey(
+        Studio, on_delete=models.CASCADE, related_name="teacher_availability"
+    )
+    weekday = models.PositiveSmallIntegerField()  # 0 = Monday
+    # Minutes after local midnight, in the studio's timezone
+    start_minute = models.PositiveSmallIntegerField()
+    end_minute = models.PositiveSmallIntegerField()
+
+    class Meta:
+        db_table = "teacher_availability"
+        ordering = ["weekday", "start_minute"]
+        indexes = [
+            models.Index(fields=["studio", "weekday", "start_minute", "end_minute"]),
+        ]
+
+    def __str__(self):
+        return f"{self.teacher} - {self.weekday} {self.start_minute}-{self.end_minute}"
+
+
 class Family(models.Model):
     """
     Represents a family unit (parents + children)
@@ -325,6 +355,13 @@ class Band(models.Model):
         help_text="Public or secret iCal (.ics) feed URL for auto-syncing external events"
     )
     last_calendar_sync = models.DateTimeField(null=True, blank=True)
+    # Conditional-fetch and retry state for the scheduled refresh (lessons/feed_refresh.py)
+    ical_etag = models.CharField(max_length=255, blank=True)
+    ical_last_modified = models.CharField(max_length=64, blank=True)
+    ical_content_hash = models.CharField(max_length=64, blank=True)
+    ical_last_error = models.TextField(blank=True)
+    ical_failure_count = models.PositiveIntegerField(default=0)
+    ical_last_attempted_at = models.DateTimeField(null=True, blank=True)
 
     # Address
     address_line1 = models.CharField(max_length=200, blank=True)
@@ -523,3 +560,191 @@ class APIKey(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.prefix}...)"
+
+
+class StudioDashboardRollup(models.Model):
+    """
+    Precomputed admin dashboard overview for a studio.
+
+    Kept current by apps.core.rollups (driven from Lesson, Invoice, Student and
+    Teacher signals) so the dashboard is a single-row read. Recompute from
+    scratch with `manage.py rebuild_dashboard_rollups`.
+    """
+
+    studio = models.OneToOneField(
+        Studio, on_delete=models.CASCADE, primary_key=True, related_name="dashboard_rollup"
+    )
+
+    # Calendar period the week/month counters were computed for
+    week_start = models.DateField()
+    month_start = models.DateField()
+
+    # Roster
+    active_students = models.IntegerField(default=0)
+    new_students_month = models.IntegerField(default=0)
+    active_teachers = models.IntegerField(default=0)
+
+    # Lessons
+    lessons_this_week = models.IntegerField(default=0)
+    lessons_completed = models.IntegerField(default=0)
+    lessons_cancelled = models.IntegerField(default=0)
+    lessons_no_show = models.IntegerField(default=0)
+
+    # Billing
+    revenue_month = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    unpaid_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "studio_dashboard_rollups"
+
+    def __str__(self):
+        return f"Dashboard rollup - {self.studio_id}"
+
+    @property
+    def attendance_rate(self):
+        """Percentage of past lessons that were attended (100 when there are none)"""
+        total_past = self.lessons_completed + self.lessons_cancelled + self.lessons_no_show
+        if total_past == 0:
+            return 100
+        return int(self.lessons_completed / total_past * 100)
+
+
+class StudioDailyFact(models.Model):
+    """
+    Daily rollup of lessons, revenue and enrolments for time-series analytics.
+
+    One row per (studio, day, kind, teacher, instrument, status). Filled
+    incrementally by apps.core.facts from per-source watermarks, or rebuilt
+    with `manage.py backfill_daily_facts`. Analytics endpoints that read this
+    table never touch the lessons or invoices tables.
+    """
+
+    KIND_CHOICES = [
+        ("lesson", "Lesson"),
+        ("revenue", "Revenue"),
+        ("enrolment", "Enrolment"),
+    ]
+
+    studio = models.ForeignKey(Studio, on_delete=models.CASCADE, related_name="daily_facts")
+    day = models.DateField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+
+    # Dimensions
+    teacher = models.ForeignKey(
+        Teacher, on_delete=models.SET_NULL, null=True, blank=True, related_name="daily_facts"
+    )
+    instrument = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, blank=True)
+
+    # Measures
+    count = models.IntegerField(default=0)
+    minutes = models.IntegerField(default=0, help_text="Scheduled lesson minutes")
+    amount = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, help_text="Amount paid"
+    )
+
+    class Meta:
+        db_table = "studio_daily_facts"
+        indexes = [
+            models.Index(fields=["studio", "kind", "day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} fact - {self.studio_id} {self.day}"
+
+
+class FactWatermark(models.Model):
+    """High-water mark of the last incremental daily-fact load, per source table."""
+
+    source = models.CharField(max_length=20, primary_key=True)
+    high_water = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "fact_watermarks"
+
+    def __str__(self):
+        return f"{self.source} @ {self.high_water}"
+
+
+class ReportJob(models.Model):
+    """
+    A report export generated in the background.
+
+    Created by the report jobs API and filled in by the
+    apps.core.tasks.generate_report_job Django-Q task, which writes the
+    export to default storage. Identical requests within REPORT_JOB_TTL
+    reuse the same job and artifact.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="report_jobs")
+    report_type = models.CharField(max_length=50)
+    export_format = models.CharField(max_length=10, default="csv")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+
+    # Result
+    file = models.FileField(upload_to="reports/", blank=True)
+    row_count = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "report_jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["requested_by", "report_type", "export_format", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type} report ({self.status}) - {self.requested_by}"
+
+
+class ChannelGroupMembership(models.Model):
+    """
+    Channel-layer group membership for PostgresChannelLayer
+    (apps/core/channel_layer.py); rows lapse after the layer's group_expiry.
+    """
+
+    group_name = models.CharField(max_length=100)
+    channel = models.CharField(max_length=100)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "channel_layer_groups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["group_name", "channel"], name="channel_layer_group_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.channel} in {self.group_name}"
+
+
+class ChannelPayload(models.Model):
+    """
+    A channel-layer message too large for a NOTIFY payload; the notification
+    carries this row's id instead. Rows lapse after the layer's expiry.
+    """
+
+    payload = models.TextField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "channel_layer_payloads"
+
+    def __str__(self):
+        return f"Channel payload {self.pk}"
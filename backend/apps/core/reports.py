@@ -0,0 +1,349 @@
+"""
+Report rows and streaming writers for ReportsExportView.
+
+Each report is a header list plus a generator of rows. Rows are read with
+values_list() projections through .iterator(chunk_size=...), so an export
+holds one chunk of rows in memory at a time, however large the studio.
+The writers turn rows into CSV, NDJSON or JSON text chunks, optionally
+gzip-compressed, for a StreamingHttpResponse.
+"""
+
+import csv
+import json
+import re
+import tempfile
+from datetime import timedelta
+
+from django.core import signing
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q
+from django.utils.text import compress_sequence
+
+from apps.billing.models import Invoice
+from apps.lessons.models import StudentGoal
+
+from .models import ReportJob, Student, Studio, Teacher, User
+
+# Rows fetched from the database per round trip
+CHUNK_SIZE = 2000
+
+# Text buffered before a chunk is handed to the response
+STREAM_BUFFER_SIZE = 64 * 1024
+
+# Identical job requests within this window reuse the same artifact
+REPORT_JOB_TTL = timedelta(minutes=15)
+
+# Lifetime of a signed report download link, in seconds
+DOWNLOAD_URL_MAX_AGE = 60 * 60
+
+DOWNLOAD_SALT = "apps.core.reports.download"
+
+ACCEPTS_GZIP_RE = re.compile(r"\bgzip\b")
+
+REPORT_HEADERS = {
+    "financial": ["date", "description", "category", "amount", "status"],
+    "students": ["name", "email", "instrument", "status", "phone", "enrollment_date"],
+    "teachers": ["name", "email", "specialties", "hourly_rate", "status"],
+    "users": ["name", "email", "role", "date_joined", "last_login"],
+    "attendance": ["student", "total", "attended", "cancelled", "percentage"],
+    "student-progress": ["student", "goal", "status", "progress", "target_date"],
+}
+
+
+def _full_name(first_name, last_name):
+    """Same as User.get_full_name(), from projected columns."""
+    return f"{first_name} {last_name}".strip()
+
+
+def get_report_studio(user):
+    """Studio a user's reports are scoped to, or None."""
+    studio = Studio.objects.filter(owner=user).first()
+    if not studio and user.role == "admin":
+        # If admin but not technically owner in DB record, fallback to first studio
+        studio = Studio.objects.first()
+    return studio
+
+
+def _financial_rows(studio, user):
+    invoices = Invoice.objects.filter(studio=studio).values_list(
+        "created_at",
+        "invoice_number",
+        "student_id",
+        "student__user__first_name",
+        "student__user__last_name",
+        "band__name",
+        "total_amount",
+        "status",
+    )
+    rows = invoices.iterator(chunk_size=CHUNK_SIZE)
+    for created_at, number, student_id, first, last, band_name, total, status in rows:
+        bill_to = _full_name(first, last) if student_id else (band_name or "Unknown")
+        yield [
+            str(created_at.date()),
+            f"Invoice {number} - {bill_to}",
+            "Tuition" if student_id else "Band/Group",
+            str(total),
+            status.title(),
+        ]
+
+
+def _student_rows(studio, user):
+    students = Student.objects.filter(studio=studio).values_list(
+        "user__first_name",
+        "user__last_name",
+        "user__email",
+        "instrument",
+        "is_active",
+        "user__phone",
+        "enrollment_date",
+    )
+    for first, last, email, instrument, is_active, phone, enrolled in students.iterator(
+        chunk_size=CHUNK_SIZE
+    ):
+        yield [
+            _full_name(first, last),
+            email,
+            instrument or "",
+            "Active" if is_active else "Inactive",
+            phone or "",
+            str(enrolled) if enrolled else "",
+        ]
+
+
+def _teacher_rows(studio, user):
+    teachers = Teacher.objects.filter(studio=studio).values_list(
+        "user__first_name",
+        "user__last_name",
+        "user__email",
+        "specialties",
+        "hourly_rate",
+        "is_active",
+    )
+    for first, last, email, specialties, hourly_rate, is_active in teachers.iterator(
+        chunk_size=CHUNK_SIZE
+    ):
+        yield [
+            _full_name(first, last),
+            email,
+            ", ".join(specialties) if specialties else "",
+            str(hourly_rate) if hourly_rate else "",
+            "Active" if is_active else "Inactive",
+        ]
+
+
+def _user_rows(studio, user):
+    users = (
+        User.objects.filter(
+            Q(student_profile__studio=studio) | Q(teacher_profile__studio=studio) | Q(id=user.id)
+        )
+        .distinct()
+        .values_list("id", "first_name", "last_name", "email", "role", "created_at", "last_login")
+    )
+    for _, first, last, email, role, created_at, last_login in users.iterator(
+        chunk_size=CHUNK_SIZE
+    ):
+        yield [
+            _full_name(first, last),
+            email,
+            role.title(),
+            str(created_at.date()),
+            str(last_login.date()) if last_login else "Never",
+        ]
+
+
+def _attendance_rows(studio, user):
+    # Group by student and count lesson statuses
+    student_stats = (
+        Student.objects.filter(studio=studio)
+        .annotate(
+            total_count=Count("lessons"),
+            attended_count=Count("lessons", filter=Q(lessons__status="completed")),
+            cancelled_count=Count("lessons", filter=Q(lessons__status="cancelled")),
+        )
+        .values_list(
+            "user__first_name",
+            "user__last_name",
+            "total_count",
+            "attended_count",
+            "cancelled_count",
+        )
+    )
+    for first, last, total, attended, cancelled in student_stats.iterator(chunk_size=CHUNK_SIZE):
+        percentage = f"{(attended / total * 100):.1f}%" if total > 0 else "0.0%"
+        yield [_full_name(first, last), total, attended, cancelled, percentage]
+
+
+def _student_progress_rows(studio, user):
+    if studio:
+        goals = StudentGoal.objects.filter(student__studio=studio)
+    elif hasattr(user, "teacher_profile"):
+        goals = StudentGoal.objects.filter(teacher=user.teacher_profile)
+    else:
+        return
+
+    goals = goals.values_list(
+        "student_id",
+        "student__user__first_name",
+        "student__user__last_name",
+        "title",
+        "status",
+        "progress_percentage",
+        "target_date",
+    )
+    for student_id, first, last, title, status, progress, target_date in goals.iterator(
+        chunk_size=CHUNK_SIZE
+    ):
+        yield [
+            _full_name(first, last) if student_id else "Unknown",
+            title,
+            status.title(),
+            f"{progress}%",
+            str(target_date) if target_date else "",
+        ]
+
+
+ROW_GENERATORS = {
+    "financial": _financial_rows,
+    "students": _student_rows,
+    "teachers": _teacher_rows,
+    "users": _user_rows,
+    "attendance": _attendance_rows,
+    "student-progress": _student_progress_rows,
+}
+
+# Reports that only need a studio when run by studio staff
+STUDIO_OPTIONAL_REPORTS = {"student-progress"}
+
+
+def get_report(report_type, user):
+    """
+    Return (headers, rows) for a report type, where rows is a lazy generator.
+    Unknown report types return ([], an empty iterator).
+    """
+    if report_type not in ROW_GENERATORS:
+        return [], iter(())
+
+    studio = get_report_studio(user)
+    if not studio and report_type not in STUDIO_OPTIONAL_REPORTS:
+        return REPORT_HEADERS[report_type], iter(())
+    return REPORT_HEADERS[report_type], ROW_GENERATORS[report_type](studio, user)
+
+
+def _buffered(pieces):
+    """Join small text pieces into chunks of about STREAM_BUFFER_SIZE."""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_BUFFER_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(headers, rows):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        if headers:
+            # Write a human-friendly header row (Title Case)
+            yield writer.writerow([h.replace("_", " ").title() for h in headers])
+        else:
+            yield writer.writerow(["Error", "Invalid report type"])
+        for row in rows:
+            yield writer.writerow(row)
+
+    return _buffered(lines())
+
+
+def stream_ndjson(headers, rows):
+    return _buffered(
+        json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + "\n" for row in rows
+    )
+
+
+def stream_json(headers, rows):
+    def pieces():
+        yield "["
+        for i, row in enumerate(rows):
+            yield ("," if i else "") + json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder)
+        yield "]"
+
+    return _buffered(pieces())
+
+
+def accepts_gzip(request):
+    """Whether the client accepts a gzip-encoded response body."""
+    return bool(ACCEPTS_GZIP_RE.search(request.META.get("HTTP_ACCEPT_ENCODING", "")))
+
+
+def gzip_stream(chunks):
+    """Gzip-compress a stream of text chunks."""
+    return compress_sequence(chunk.encode("utf-8") for chunk in chunks)
+
+
+# format -> (writer, content type, file extension)
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv", "csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson", "ndjson"),
+    "json": (stream_json, "application/json", "json"),
+}
+
+
+def find_reusable_job(user, report_type, export_format, now):
+    """Return a pending, running or completed job for the same request within the TTL."""
+    return (
+        ReportJob.objects.filter(
+            requested_by=user,
+            report_type=report_type,
+            export_format=export_format,
+            status__in=["pending", "running", "completed"],
+            created_at__gte=now - REPORT_JOB_TTL,
+        )
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def sign_download_token(job):
+    return signing.dumps(str(job.id), salt=DOWNLOAD_SALT)
+
+
+def unsign_download_token(token):
+    """Return the job id in a download token; raises signing.BadSignature if invalid or expired."""
+    return signing.loads(token, salt=DOWNLOAD_SALT, max_age=DOWNLOAD_URL_MAX_AGE)
+
+
+def write_report_file(job):
+    """
+    Generate a job's report into default storage. Rows are spooled through a
+    temporary file, so memory stays flat however large the report.
+    """
+    writer, _, extension = EXPORT_FORMATS[job.export_format]
+    headers, rows = get_report(job.report_type, job.requested_by)
+
+    row_count = 0
+
+    def counted(rows):
+        nonlocal row_count
+        for row in rows:
+            row_count += 1
+            yield row
+
+    with tempfile.TemporaryFile() as tmp:
+        for chunk in writer(headers, counted(rows)):
+            tmp.write(chunk.encode("utf-8"))
+        tmp.seek(0)
+        job.file.save(f"{job.report_type}_report_{job.id}.{extension}", File(tmp), save=False)
+
+    job.row_count = row_count
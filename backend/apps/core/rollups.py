@@ -0,0 +1,166 @@
+"""
+Per-studio dashboard rollups.
+
+StudioDashboardRollup holds the numbers behind the admin dashboard overview so
+DashboardStatsView can serve it from a single row instead of running a COUNT or
+SUM per card. Rows are rebuilt lazily when the week or month they were
+computed for has rolled over, and refreshed after Lesson, Invoice, Student and
+Teacher writes commit (see apps/core/signals.py).
+
+The refresh aggregates the studio's whole history, so it runs on the task
+queue rather than in the request that wrote. A commit only sets a per-studio
+pending marker in the cache and, if the marker was not already set, enqueues
+tasks.refresh_dashboard_rollup. The task clears the marker before it
+recomputes, so a burst of writes costs one refresh and a write committing
+after the recompute has started queues the next one.
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from django_q.tasks import async_task
+
+from apps.billing.models import Invoice
+from apps.lessons.models import Lesson
+
+from .models import Student, Studio, StudioDashboardRollup, Teacher
+
+logger = logging.getLogger(__name__)
+
+# A pending marker outlives a refresh that never ran (cluster down) by at most this long
+REFRESH_PENDING_TIMEOUT = 5 * 60
+
+# Invoice statuses that still carry an outstanding balance
+UNPAID_INVOICE_STATUSES = ["sent", "overdue", "partial"]
+
+# Counter fields compared by the rebuild command when reporting drift
+ROLLUP_COUNTER_FIELDS = [
+    "active_students",
+    "new_students_month",
+    "active_teachers",
+    "lessons_this_week",
+    "lessons_completed",
+    "lessons_cancelled",
+    "lessons_no_show",
+    "revenue_month",
+    "unpaid_balance",
+]
+
+
+def current_periods(now=None):
+    """Return (week_start, month_start) as midnight-aligned aware datetimes."""
+    now = now or timezone.now()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today_start - timedelta(days=today_start.weekday())
+    month_start = today_start.replace(day=1)
+    return week_start, month_start
+
+
+def compute_rollup_values(studio_id, now=None):
+    """
+    Recompute every rollup field for a studio from the transactional tables.
+    Issues one aggregate query per source model.
+    """
+    week_start, month_start = current_periods(now)
+    week_end = week_start + timedelta(days=7)
+
+    students = Student.objects.filter(studio_id=studio_id, is_active=True).aggregate(
+        active_students=Count("id"),
+        new_students_month=Count("id", filter=Q(created_at__gte=month_start)),
+    )
+    active_teachers = Teacher.objects.filter(studio_id=studio_id, is_active=True).count()
+    lessons = Lesson.objects.filter(studio_id=studio_id).aggregate(
+        lessons_this_week=Count(
+            "id",
+            filter=Q(
+                status="scheduled",
+                scheduled_start__gte=week_start,
+                scheduled_start__lt=week_end,
+            ),
+        ),
+        lessons_completed=Count("id", filter=Q(status="completed")),
+        lessons_cancelled=Count("id", filter=Q(status="cancelled")),
+        lessons_no_show=Count("id", filter=Q(status="no_show")),
+    )
+    invoices = Invoice.objects.filter(studio_id=studio_id).aggregate(
+        revenue_month=Sum(
+            "total_amount", filter=Q(status="paid", issue_date__gte=month_start.date())
+        ),
+        unpaid_balance=Sum(
+            F("total_amount") - F("amount_paid"),
+            filter=Q(status__in=UNPAID_INVOICE_STATUSES),
+        ),
+    )
+
+    return {
+        "week_start": week_start.date(),
+        "month_start": month_start.date(),
+        "active_students": students["active_students"],
+        "new_students_month": students["new_students_month"],
+        "active_teachers": active_teachers,
+        **lessons,
+        "revenue_month": invoices["revenue_month"] or Decimal("0.00"),
+        "unpaid_balance": invoices["unpaid_balance"] or Decimal("0.00"),
+    }
+
+
+def refresh_studio_rollup(studio_id, now=None):
+    """Recompute and store the rollup row for a studio. Returns the row, or None."""
+    if not Studio.objects.filter(pk=studio_id).exists():
+        # Studio was deleted in the same transaction; its rollup cascaded away
+        return None
+
+    values = compute_rollup_values(studio_id, now=now)
+    rollup, _ = StudioDashboardRollup.objects.update_or_create(studio_id=studio_id, defaults=values)
+    return rollup
+
+
+def _pending_key(studio_id):
+    return f"dashboard:rollup:pending:{studio_id}"
+
+
+def queue_rollup_refresh(studio_id):
+    """Enqueue a refresh of a studio's rollup unless one is already pending."""
+    try:
+        if cache.add(_pending_key(studio_id), True, REFRESH_PENDING_TIMEOUT):
+            async_task("apps.core.tasks.refresh_dashboard_rollup", studio_id)
+    except Exception as e:
+        # Never break the write that triggered us; the next write or the
+        # rebuild command will repair the row.
+        logger.error(f"Failed to queue dashboard rollup refresh for studio {studio_id}: {e}")
+
+
+def run_queued_refresh(studio_id):
+    """Carry out a queued refresh. Returns the rollup row, or None."""
+    # Clear the marker first: writes committing from here on queue another refresh
+    cache.delete(_pending_key(studio_id))
+    return refresh_studio_rollup(studio_id)
+
+
+def schedule_rollup_refresh(studio_id):
+    """Queue a refresh of a studio's rollup once the current transaction commits."""
+    if studio_id:
+        transaction.on_commit(partial(queue_rollup_refresh, studio_id))
+
+
+def get_dashboard_rollup(studio, now=None):
+    """
+    Return the rollup for a studio, rebuilding it if it is missing or was
+    computed for an earlier week or month.
+    """
+    week_start, month_start = current_periods(now)
+    rollup = StudioDashboardRollup.objects.filter(studio=studio).first()
+    if (
+        rollup is None
+        or rollup.week_start != week_start.date()
+        or rollup.month_start != month_start.date()
+    ):
+        rollup = refresh_studio_rollup(studio.id, now=now)
+    return rollup
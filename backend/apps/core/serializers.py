@@ -1,12 +1,27 @@
+from django.urls import reverse
+
 from rest_framework import serializers
 
-from .models import APIKey, Band, Family, SetupStatus, SignedDocument, Student, Studio, Teacher, User
+from .eager_loading import AnnotatedCountField
+from .models import (
+    APIKey,
+    Band,
+    Family,
+    ReportJob,
+    SetupStatus,
+    SignedDocument,
+    Student,
+    Studio,
+    Teacher,
+    User,
+)
+from .reports import EXPORT_FORMATS, REPORT_HEADERS, sign_download_token
 
 
 class BandSerializer(serializers.ModelSerializer):
     """Serializer for Band/Group management"""
 
-    members_count = serializers.SerializerMethodField()
+    members_count = AnnotatedCountField("members")
     member_details = serializers.SerializerMethodField()
     member_ids = serializers.PrimaryKeyRelatedField(
         many=True, queryset=Student.objects.all(), source="members", required=False
@@ -34,6 +49,7 @@ class BandSerializer(serializers.ModelSerializer):
             "member_ids",
             "member_details",
         ]
+        eager_load = {"member_details": ["members__user"]}
 
     def get_photo(self, obj):
         """Return relative URL for band photo to work with frontend proxy"""
@@ -41,9 +57,6 @@ class BandSerializer(serializers.ModelSerializer):
             return obj.photo.url
         return None
 
-    def get_members_count(self, obj):
-        return obj.members.count()
-
     def get_member_details(self, obj):
         return [
             {
@@ -58,7 +71,7 @@ class BandSerializer(serializers.ModelSerializer):
 class FamilySerializer(serializers.ModelSerializer):
     """Serializer for Family relationships"""
 
-    students_count = serializers.SerializerMethodField()
+    students_count = AnnotatedCountField("students")
 
     class Meta:
         model = Family
@@ -73,9 +86,6 @@ class FamilySerializer(serializers.ModelSerializer):
             "students_count",
         ]
 
-    def get_students_count(self, obj):
-        return obj.students.count()
-
 
 class SimpleStudioSerializer(serializers.ModelSerializer):
     cover_image = serializers.ImageField(required=False, allow_null=True)
@@ -679,3 +689,37 @@ class APIKeySerializer(serializers.ModelSerializer):
 
 class APIKeyCreateSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=100)
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            "id",
+            "report_type",
+            "export_format",
+            "status",
+            "row_count",
+            "error",
+            "created_at",
+            "started_at",
+            "completed_at",
+            "download_url",
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        """Signed, time-limited link to the finished file."""
+        if obj.status != "completed" or not obj.file:
+            return None
+
+        url = f"{reverse('report-job-download', args=[obj.id])}?token={sign_download_token(obj)}"
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class ReportJobCreateSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=list(REPORT_HEADERS))
+    format = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default="csv")
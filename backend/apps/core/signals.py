@@ -3,15 +3,19 @@ import hmac
 import json
 import logging
 
-import requests
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from stream_chat import StreamChat
 
-logger = logging.getLogger(__name__)
+import requests
+from stream_chat import StreamChat
 
+from .analytics import schedule_analytics_invalidation
+from .availability import sync_teacher_availability
 from .models import Band, Family, Student, Studio, Teacher, User
+from .rollups import schedule_rollup_refresh
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=User)
@@ -106,3 +110,33 @@ def sync_band_to_317booking(sender, instance, created, **kwargs):
                 Band.objects.filter(pk=instance.pk).update(ical_feed_url=ical_url)
     except Exception as e:
         logger.error(f"Error syncing band {instance.id} to 317booking: {e}")
+
+
+@receiver(post_save, sender="lessons.Lesson")
+@receiver(post_delete, sender="lessons.Lesson")
+@receiver(post_save, sender="billing.Invoice")
+@receiver(post_delete, sender="billing.Invoice")
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+def refresh_dashboard_rollup(sender, instance, **kwargs):
+    """Keep the studio's dashboard rollup in step with writes that feed it."""
+    schedule_rollup_refresh(instance.studio_id)
+
+
+@receiver(post_save, sender="lessons.Lesson")
+@receiver(post_delete, sender="lessons.Lesson")
+@receiver(post_save, sender="billing.Invoice")
+@receiver(post_delete, sender="billing.Invoice")
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_dashboard_analytics(sender, instance, **kwargs):
+    """Retire the studio's cached analytics series after writes that feed them."""
+    schedule_analytics_invalidation(instance.studio_id)
+
+
+@receiver(post_save, sender=Teacher)
+def sync_availability_index(sender, instance, **kwargs):
+    """Mirror Teacher.availability into the TeacherAvailability table."""
+    sync_teacher_availability(instance)
@@ -172,52 +172,77 @@ def trigger_update() -> dict:
     }
 
 
+def _email_connection(email_settings):
+    """SMTP connection from the DB email settings, or None for Django's default."""
+    smtp_config = email_settings.get("smtp_config")
+    if smtp_config and smtp_config.get("host"):
+        return get_connection(
+            backend="django.core.mail.backends.smtp.EmailBackend",
+            host=smtp_config["host"],
+            port=int(smtp_config["port"]),
+            username=smtp_config["username"],
+            password=smtp_config["password"],
+            use_tls=smtp_config.get("use_tls", True),
+            use_ssl=smtp_config.get("use_ssl", False),
+            timeout=10,
+        )
+    return None
+
+
+def _render_email(
+    subject,
+    to_email,
+    template_name,
+    context,
+    email_settings,
+    connection,
+    from_email=None,
+    from_name=None,
+):
+    real_from_email = from_email or email_settings["from_email"]
+    real_from_name = from_name or email_settings["from_name"]
+
+    # Add common context variables
+    context["site_name"] = real_from_name
+
+    # Render HTML body
+    html_content = render_to_string(template_name, context)
+    text_content = strip_tags(html_content)
+
+    # Construct From header
+    if real_from_name and real_from_name != real_from_email:
+        final_from = f"{real_from_name} <{real_from_email}>"
+    else:
+        final_from = real_from_email
+
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=final_from,
+        to=[to_email],
+        connection=connection,
+    )
+    email.attach_alternative(html_content, "text/html")
+    return email
+
+
 def send_email_async(subject, to_email, template_name, context, from_email=None, from_name=None):
     """
     Background task to send emails asynchronously using HTML templates.
     """
     try:
         email_settings = get_email_settings()
-
-        real_from_email = from_email or email_settings["from_email"]
-        real_from_name = from_name or email_settings["from_name"]
-
-        # Add common context variables
-        context["site_name"] = real_from_name
-
-        # Render HTML body
-        html_content = render_to_string(template_name, context)
-        text_content = strip_tags(html_content)
-
-        # Configure connection if settings found in DB
-        connection = None
-        smtp_config = email_settings.get("smtp_config")
-        if smtp_config and smtp_config.get("host"):
-            connection = get_connection(
-                backend="django.core.mail.backends.smtp.EmailBackend",
-                host=smtp_config["host"],
-                port=int(smtp_config["port"]),
-                username=smtp_config["username"],
-                password=smtp_config["password"],
-                use_tls=smtp_config.get("use_tls", True),
-                use_ssl=smtp_config.get("use_ssl", False),
-                timeout=10,
-            )
-
-        # Construct From header
-        if real_from_name and real_from_name != real_from_email:
-            final_from = f"{real_from_name} <{real_from_email}>"
-        else:
-            final_from = real_from_email
-
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=final_from,
-            to=[to_email],
-            connection=connection,
+        connection = _email_connection(email_settings)
+        email = _render_email(
+            subject,
+            to_email,
+            template_name,
+            context,
+            email_settings,
+            connection,
+            from_email,
+            from_name,
         )
-        email.attach_alternative(html_content, "text/html")
         email.send()
 
         logger.info(f"✅ Email sent to {to_email} (Template: {template_name})")
@@ -227,76 +252,200 @@ def send_email_async(subject, to_email, template_name, context, from_email=None,
         return False
 
 
+def send_email_batch(messages):
+    """
+    Background task to send many templated emails over one connection.
+    `messages` is a list of (subject, to_email, template_name, context).
+    """
+    try:
+        email_settings = get_email_settings()
+        connection = _email_connection(email_settings) or get_connection()
+    except Exception as e:
+        logger.error(f"❌ Failed to prepare email batch of {len(messages)}: {e}")
+        return 0
+
+    emails = []
+    for subject, to_email, template_name, context in messages:
+        try:
+            emails.append(
+                _render_email(subject, to_email, template_name, context, email_settings, connection)
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to render email to {to_email}: {e}")
+
+    try:
+        sent = connection.send_messages(emails) or 0
+    except Exception as e:
+        logger.error(f"❌ Failed to send email batch of {len(emails)}: {e}")
+        return 0
+
+    logger.info(f"✅ Sent {sent} of {len(messages)} batched emails")
+    return sent
+
+
+# Reminder emails are enqueued this many to a task
+EMAIL_BATCH_SIZE = 50
+
+
 def check_upcoming_lessons():
     """
     Periodic task to check for upcoming lessons and send reminders.
     Runs hourly. Checks for lessons starting between 23 and 25 hours from now.
+
+    Set-based, so a run costs the same few queries however many lessons are
+    due: one to select lessons whose student has no "day_before" entry in the
+    ReminderLedger, one to claim them in the ledger, one to read back which
+    claims this run won (a concurrent run may have taken some), one to insert
+    the in-app notifications, and one Django-Q enqueue per EMAIL_BATCH_SIZE
+    emails.
     """
     from datetime import timedelta
 
+    from django.db import transaction
+    from django.db.models import Exists, OuterRef
     from django.utils import timezone
 
     from apps.lessons.models import Lesson
-    from apps.notifications.models import Notification
+    from apps.notifications.models import Notification, ReminderLedger
+    from apps.notifications.signals import broadcast_notifications
 
     now = timezone.now()
     start_window = now + timedelta(hours=23)
     end_window = now + timedelta(hours=25)
 
-    # Find active lessons in the window
-    upcoming_lessons = Lesson.objects.filter(
-        scheduled_start__range=(start_window, end_window), status="scheduled"
+    # Find active lessons in the window whose student hasn't been reminded
+    upcoming_lessons = list(
+        Lesson.objects.filter(
+            scheduled_start__range=(start_window, end_window),
+            status="scheduled",
+            student__isnull=False,
+        )
+        .annotate(
+            reminded=Exists(
+                ReminderLedger.objects.filter(
+                    lesson=OuterRef("pk"), user=OuterRef("student__user"), kind="day_before"
+                )
+            )
+        )
+        .filter(reminded=False)
+        .select_related("student__user", "teacher__user")
     )
 
-    logger.info(
-        f"Checking for lesson reminders. Found {upcoming_lessons.count()} lessons in window."
-    )
+    logger.info(f"Checking for lesson reminders. Found {len(upcoming_lessons)} lessons in window.")
+    if not upcoming_lessons:
+        return "Sent 0 reminders"
+
+    with transaction.atomic():
+        ReminderLedger.objects.bulk_create(
+            [
+                ReminderLedger(
+                    lesson=lesson, user=lesson.student.user, kind="day_before", sent_at=now
+                )
+                for lesson in upcoming_lessons
+            ],
+            ignore_conflicts=True,
+        )
+        claimed = set(
+            ReminderLedger.objects.filter(
+                kind="day_before",
+                sent_at=now,
+                lesson__in=[lesson.id for lesson in upcoming_lessons],
+            ).values_list("lesson_id", flat=True)
+        )
+        lessons = [lesson for lesson in upcoming_lessons if lesson.id in claimed]
+
+        # Create in-app notifications (respecting prefs)
+        notifications = Notification.notify_lesson_reminders(lessons)
+
+    broadcast_notifications(notifications)
+
+    # Send Email (respecting prefs)
+    messages = []
+    for lesson in lessons:
+        user = lesson.student.user
+        if not user.wants_notification("lesson_reminder", "email"):
+            continue
+        context = {
+            "instructor_name": lesson.teacher.user.get_full_name(),
+            "lesson_start_time": lesson.scheduled_start.strftime("%A, %B %d at %I:%M %p"),
+            "location": lesson.location,
+            "student_name": user.get_full_name(),
+            "instrument": lesson.student.instrument,
+            "duration_minutes": lesson.duration_minutes,
+            "lesson_url": f"{settings.FRONTEND_BASE_URL}/dashboard/lessons/{lesson.id}",
+        }
+        messages.append(("Lesson Reminder 🎵", user.email, "emails/lesson_reminder.html", context))
+
+    for offset in range(0, len(messages), EMAIL_BATCH_SIZE):
+        try:
+            async_task(send_email_batch, messages[offset : offset + EMAIL_BATCH_SIZE])
+        except Exception as e:
+            logger.error(f"Failed to enqueue lesson reminder emails: {e}")
+
+    return f"Sent {len(messages)} reminders"
+
+
+def refresh_daily_facts():
+    """
+    Nightly task: load changed lessons, invoices and students into the daily
+    fact table. Only partitions touched since the last run are rebuilt.
+    """
+    from .facts import load_incremental
+
+    summary = load_incremental()
+    logger.info(f"Daily facts refreshed: {summary}")
+    return summary
+
+
+def refresh_dashboard_rollup(studio_id):
+    """
+    Background task: recompute a studio's dashboard rollup. Queued after
+    Lesson, Invoice, Student and Teacher writes commit.
+    """
+    from .rollups import run_queued_refresh
+
+    run_queued_refresh(studio_id)
+
+
+def generate_report_job(job_id):
+    """Background task: build a ReportJob's export file in default storage."""
+    from django.utils import timezone
+
+    from .models import ReportJob
+    from .reports import write_report_file
+
+    job = ReportJob.objects.select_related("requested_by").get(id=job_id)
+    job.status = "running"
+    job.started_at = timezone.now()
+    job.save(update_fields=["status", "started_at"])
+
+    try:
+        write_report_file(job)
+        job.status = "completed"
+    except Exception as e:
+        logger.error(f"Report job {job_id} failed: {e}")
+        job.status = "failed"
+        job.error = str(e)
+
+    job.completed_at = timezone.now()
+    job.save(update_fields=["status", "file", "row_count", "error", "completed_at"])
+    return job.status
+
+
+def purge_expired_report_jobs():
+    """Daily task: delete report jobs and their files after a day."""
+    from datetime import timedelta
+
+    from django.utils import timezone
 
-    reminders_sent = 0
-
-    for lesson in upcoming_lessons:
-        # Check if reminder already sent to student
-        student_reminder_exists = Notification.objects.filter(
-            related_lesson_id=lesson.id,
-            notification_type="lesson_reminder",
-            user=lesson.student.user,
-        ).exists()
-
-        if not student_reminder_exists:
-            try:
-                user = lesson.student.user
-                
-                # Create in-app notification (respecting prefs)
-                if user.wants_notification("lesson_reminder", "push"):
-                    Notification.create_notification(
-                        user=user,
-                        notification_type="lesson_reminder",
-                        title="Upcoming Lesson Reminder",
-                        message=f'Your {lesson.student.instrument} lesson is tomorrow at {lesson.scheduled_start.strftime("%I:%M %p")}',
-                        link=f"/dashboard/lessons/{lesson.id}",
-                    )
-
-                # Send Email (respecting prefs)
-                if user.wants_notification("lesson_reminder", "email"):
-                    context = {
-                        "instructor_name": lesson.teacher.user.get_full_name(),
-                        "lesson_start_time": lesson.scheduled_start.strftime("%A, %B %d at %I:%M %p"),
-                        "location": lesson.location,
-                        "student_name": lesson.student.user.get_full_name(),
-                        "instrument": lesson.student.instrument,
-                        "duration_minutes": lesson.duration_minutes,
-                        "lesson_url": f"{settings.FRONTEND_BASE_URL}/dashboard/lessons/{lesson.id}",
-                    }
-
-                    async_task(
-                        send_email_async,
-                        "Lesson Reminder 🎵",
-                        user.email,
-                        "emails/lesson_reminder.html",
-                        context,
-                    )
-                    reminders_sent += 1
-            except Exception as e:
-                logger.error(f"Failed to send reminder for lesson {lesson.id}: {e}")
-
-    return f"Sent {reminders_sent} reminders"
+    from .models import ReportJob
+
+    expired = ReportJob.objects.filter(created_at__lt=timezone.now() - timedelta(days=1))
+    purged = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        purged += 1
+    logger.info(f"Purged {purged} expired report jobs")
+    return purged
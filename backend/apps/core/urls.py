@@ -7,7 +7,11 @@ from apps.core.views import (
     BandViewSet,
     DashboardAnalyticsView,
     DashboardStatsView,
+    LessonsByInstrumentView,
+    ReportJobViewSet,
     ReportsExportView,
+    RetentionCohortsView,
+    RevenueByTeacherView,
     StudentViewSet,
     StudioViewSet,
     TeacherViewSet,
@@ -26,6 +30,7 @@ router.register(r"teachers", TeacherViewSet, basename="teacher")
 router.register(r"students", StudentViewSet, basename="student")
 router.register(r"bands", BandViewSet, basename="band")
 router.register(r"api-keys", APIKeyViewSet, basename="api-key")
+router.register(r"report-jobs", ReportJobViewSet, basename="report-job")
 # Explicitly handle users/me with optional slash to prevent 404s
 me_list = UserViewSet.as_view({"get": "me", "put": "me", "patch": "me"})
 
@@ -37,6 +42,21 @@ urlpatterns = (
     [
         path("stats/", DashboardStatsView.as_view(), name="dashboard-stats"),
         path("analytics/", DashboardAnalyticsView.as_view(), name="dashboard-analytics"),
+        path(
+            "analytics/revenue-by-teacher/",
+            RevenueByTeacherView.as_view(),
+            name="analytics-revenue-by-teacher",
+        ),
+        path(
+            "analytics/lessons-by-instrument/",
+            LessonsByInstrumentView.as_view(),
+            name="analytics-lessons-by-instrument",
+        ),
+        path(
+            "analytics/retention-cohorts/",
+            RetentionCohortsView.as_view(),
+            name="analytics-retention-cohorts",
+        ),
         path("reports/export/", ReportsExportView.as_view(), name="reports-export"),
         # Setup Wizard Endpoints (trailing slash optional — Next.js proxy strips trailing slashes)
         re_path(r"^setup/status/?$", setup.check_setup_status, name="setup-status"),
@@ -1,5 +1,5 @@
 # Expose modules for direct access
-from . import api_keys, backup, core, gdpr, setup, stats, update  # noqa: F401
+from . import api_keys, backup, core, gdpr, report_jobs, setup, stats, update  # noqa: F401
 from .api_keys import APIKeyViewSet  # noqa: F401
 from .backup import export_system, import_system  # noqa: F401
 from .core import (  # noqa: F401
@@ -18,6 +18,13 @@ from .gdpr import (  # noqa: F401
     update_privacy_settings,
 )
 from .health import health_check, readiness_check  # noqa: F401
+from .report_jobs import ReportJobViewSet  # noqa: F401
 from .setup import check_setup_status, complete_setup_wizard  # noqa: F401
-from .stats import DashboardAnalyticsView, DashboardStatsView  # noqa: F401
+from .stats import (  # noqa: F401
+    DashboardAnalyticsView,
+    DashboardStatsView,
+    LessonsByInstrumentView,
+    RetentionCohortsView,
+    RevenueByTeacherView,
+)
 from .update import current_version, perform_update, update_status  # noqa: F401
@@ -1,8 +1,8 @@
-import csv
-
 from django.db import models
-from django.http import HttpResponse, JsonResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_date
 
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
@@ -10,7 +10,10 @@ from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.availability import available_teachers, parse_minute, parse_weekday
+from apps.core.eager_loading import EagerLoadingMixin
 from apps.core.models import Band, Family, Student, Studio, Teacher, User
+from apps.core.reports import EXPORT_FORMATS, accepts_gzip, get_report, gzip_stream
 from apps.core.serializers import (
     BandSerializer,
     PublicTeacherSerializer,
@@ -21,7 +24,7 @@ from apps.core.serializers import (
 )
 
 
-class BandViewSet(viewsets.ModelViewSet):
+class BandViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """API endpoint for managing bands/groups"""
 
     serializer_class = BandSerializer
@@ -584,6 +587,68 @@ class TeacherViewSet(viewsets.ModelViewSet):
             return Teacher.objects.filter(studio=self.request.user.student_profile.studio)
         return Teacher.objects.none()
 
+    @action(detail=False, methods=["get"])
+    def available(self, request):
+        """
+        Teachers free for a weekly window, e.g. piano teachers on Tuesdays 16:00-18:00:
+
+            ?weekday=tuesday&start=16:00&end=18:00&instrument=Piano
+
+        Pass ?date=YYYY-MM-DD instead of (or as well as) weekday to also drop
+        teachers who already have a lesson in that window on that date.
+        Optional ?specialty= works like ?instrument=.
+        """
+        user = request.user
+        if user.role == "admin":
+            studio = Studio.objects.filter(owner=user).first()
+        elif hasattr(user, "teacher_profile"):
+            studio = user.teacher_profile.studio
+        elif hasattr(user, "student_profile"):
+            studio = user.student_profile.studio
+        else:
+            studio = None
+        if studio is None:
+            return Response({"detail": "No studio found"}, status=status.HTTP_404_NOT_FOUND)
+
+        params = request.query_params
+        on_date = weekday = None
+        if params.get("date"):
+            try:
+                on_date = parse_date(params["date"])
+            except ValueError:
+                pass
+            weekday = on_date.weekday() if on_date else None
+        elif params.get("weekday"):
+            weekday = parse_weekday(params["weekday"])
+        start = parse_minute(params.get("start"))
+        end = parse_minute(params.get("end"))
+        if weekday is None or start is None or end is None or start >= end:
+            return Response(
+                {"detail": "Provide date or weekday, and start < end as HH:MM"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        teachers = available_teachers(
+            studio,
+            weekday,
+            start,
+            end,
+            on_date=on_date,
+            instrument=params.get("instrument"),
+            specialty=params.get("specialty"),
+        )
+        return Response(
+            [
+                {
+                    "id": str(teacher.id),
+                    "name": teacher.user.get_full_name(),
+                    "instruments": teacher.instruments,
+                    "specialties": teacher.specialties,
+                }
+                for teacher in teachers
+            ]
+        )
+
 
 class StudentViewSet(viewsets.ModelViewSet):
     """
@@ -626,205 +691,50 @@ class StudentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def stats(self, request):
         """Get roster metrics for the current user's scope"""
-        queryset = self.get_queryset()
-
-        total_students = queryset.count()
-        active_students = queryset.filter(is_active=True).count()
-        unassigned_students = queryset.filter(primary_teacher__isnull=True).count()
-
-        return Response(
-            {
-                "total_students": total_students,
-                "active_students": active_students,
-                "unassigned_students": unassigned_students,
-            }
+        totals = self.get_queryset().aggregate(
+            total_students=models.Count("id"),
+            active_students=models.Count("id", filter=models.Q(is_active=True)),
+            unassigned_students=models.Count("id", filter=models.Q(primary_teacher__isnull=True)),
         )
+        return Response(totals)
 
 
 class ReportsExportView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
-    def _get_report_data(self, report_type, user):  # noqa: C901
-        """Return (headers, rows, records) for any report type.
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= picks the export format (e.g. ndjson), not a DRF renderer,
+        # so never 404 on formats DRF has no renderer for
+        return super().perform_content_negotiation(request, force=True)
 
-        headers  – list of column names (for CSV)
-        rows     – list of lists (for CSV)
-        records  – list of dicts (for JSON / Excel)
+    def get(self, request):
         """
-        headers, rows, records = [], [], []
-
-        # Robust Studio Lookup
-        from apps.core.models import Studio
+        Stream a report as it is read from the database.
 
-        studio = Studio.objects.filter(owner=user).first()
-        if not studio and user.role == "admin":
-            # If admin but not technically owner in DB record, fallback to first studio
-            studio = Studio.objects.first()
+        ?type=     financial | students | teachers | users | attendance | student-progress
+        ?format=   csv (default) | ndjson | json
 
-        if report_type == "financial":
-            headers = ["date", "description", "category", "amount", "status"]
-            from apps.billing.models import Invoice
-
-            if studio:
-                try:
-                    invoices = Invoice.objects.filter(studio=studio).select_related(
-                        "student__user", "band"
-                    )
-                    for inv in invoices:
-                        bill_to = (
-                            inv.student.user.get_full_name()
-                            if inv.student
-                            else (inv.band.name if inv.band else "Unknown")
-                        )
-                        row = [
-                            str(inv.created_at.date()),
-                            f"Invoice {inv.invoice_number} - {bill_to}",
-                            "Tuition" if inv.student else "Band/Group",
-                            str(inv.total_amount),
-                            inv.status.title(),
-                        ]
-                        rows.append(row)
-                        records.append(dict(zip(headers, row)))
-                except Exception as e:
-                    rows.append(["Error generating report", str(e)])
-
-        elif report_type == "students":
-            headers = ["name", "email", "instrument", "status", "phone", "enrollment_date"]
-            from apps.core.models import Student
-
-            if studio:
-                students = Student.objects.filter(studio=studio).select_related("user")
-                for s in students:
-                    row = [
-                        s.user.get_full_name(),
-                        s.user.email,
-                        s.instrument or "",
-                        "Active" if s.is_active else "Inactive",
-                        s.user.phone or "",
-                        str(s.enrollment_date) if s.enrollment_date else "",
-                    ]
-                    rows.append(row)
-                    records.append(dict(zip(headers, row)))
-
-        elif report_type == "teachers":
-            headers = ["name", "email", "specialties", "hourly_rate", "status"]
-            from apps.core.models import Teacher
-
-            if studio:
-                teachers = Teacher.objects.filter(studio=studio).select_related("user")
-                for t in teachers:
-                    row = [
-                        t.user.get_full_name(),
-                        t.user.email,
-                        ", ".join(t.specialties) if t.specialties else "",
-                        str(t.hourly_rate) if t.hourly_rate else "",
-                        "Active" if t.is_active else "Inactive",
-                    ]
-                    rows.append(row)
-                    records.append(dict(zip(headers, row)))
-
-        elif report_type == "users":
-            headers = ["name", "email", "role", "date_joined", "last_login"]
-            from django.db.models import Q
-
-            if studio:
-                target_users = User.objects.filter(
-                    Q(student_profile__studio=studio)
-                    | Q(teacher_profile__studio=studio)
-                    | Q(id=user.id)
-                ).distinct()
-                for u in target_users:
-                    row = [
-                        u.get_full_name(),
-                        u.email,
-                        u.role.title(),
-                        str(u.created_at.date()),
-                        str(u.last_login.date()) if u.last_login else "Never",
-                    ]
-                    rows.append(row)
-                    records.append(dict(zip(headers, row)))
-
-        elif report_type == "attendance":
-            headers = ["student", "total", "attended", "cancelled", "percentage"]
-            from django.db.models import Count, Q
-
-            if studio:
-                # Group by student and count lesson statuses
-                from apps.core.models import Student
-
-                student_stats = (
-                    Student.objects.filter(studio=studio)
-                    .annotate(
-                        total_count=Count("lessons"),
-                        attended_count=Count("lessons", filter=Q(lessons__status="completed")),
-                        cancelled_count=Count("lessons", filter=Q(lessons__status="cancelled")),
-                    )
-                    .select_related("user")
-                )
-
-                for s in student_stats:
-                    percentage = (
-                        f"{(s.attended_count / s.total_count * 100):.1f}%"
-                        if s.total_count > 0
-                        else "0.0%"
-                    )
-                    row = [
-                        s.user.get_full_name(),
-                        s.total_count,
-                        s.attended_count,
-                        s.cancelled_count,
-                        percentage,
-                    ]
-                    rows.append(row)
-                    records.append(dict(zip(headers, row)))
-
-        elif report_type == "student-progress":
-            headers = ["student", "goal", "status", "progress", "target_date"]
-            from apps.lessons.models import StudentGoal
-
-            goals = StudentGoal.objects.none()
-            if studio:
-                goals = StudentGoal.objects.filter(student__studio=studio).select_related(
-                    "student__user"
-                )
-            elif hasattr(user, "teacher_profile"):
-                goals = StudentGoal.objects.filter(teacher=user.teacher_profile).select_related(
-                    "student__user"
-                )
+        The body is gzip-encoded when the client sends Accept-Encoding: gzip.
+        """
+        report_type = request.query_params.get("type", "")
+        export_format = request.query_params.get("format", "csv").lower()
 
-            for goal in goals:
-                st_name = goal.student.user.get_full_name() if goal.student else "Unknown"
-                row = [
-                    st_name,
-                    goal.title,
-                    goal.status.title(),
-                    f"{goal.progress_percentage}%",
-                    str(goal.target_date) if goal.target_date else "",
-                ]
-                rows.append(row)
-                records.append(dict(zip(headers, row)))
+        headers, rows = get_report(report_type, request.user)
 
-        return headers, rows, records
+        if export_format not in EXPORT_FORMATS:
+            export_format = "csv"
+        writer, content_type, extension = EXPORT_FORMATS[export_format]
+        chunks = writer(headers, rows)
 
-    def get(self, request):
-        report_type = request.query_params.get("type", "")
-        export_format = request.query_params.get("format", "csv").lower()
-        user = request.user
+        if accepts_gzip(request):
+            response = StreamingHttpResponse(gzip_stream(chunks), content_type=content_type)
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = StreamingHttpResponse(chunks, content_type=content_type)
+        patch_vary_headers(response, ("Accept-Encoding",))
 
-        headers, rows, records = self._get_report_data(report_type, user)
-
-        if export_format == "json":
-            return JsonResponse(records, safe=False)
-
-        # Default: CSV
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = f'attachment; filename="{report_type}_report.csv"'
-        writer = csv.writer(response)
-        if headers:
-            # Write a human-friendly header row (Title Case)
-            writer.writerow([h.replace("_", " ").title() for h in headers])
-        if rows:
-            writer.writerows(rows)
-        elif not headers:
-            writer.writerow(["Error", "Invalid report type"])
+        if export_format != "json":
+            response["Content-Disposition"] = (
+                f'attachment; filename="{report_type}_report.{extension}"'
+            )
         return response
@@ -0,0 +1,85 @@
+"""
+Background report jobs.
+
+POST   /api/core/report-jobs/                  submit {type, format}; reuses a recent identical job
+GET    /api/core/report-jobs/                  list my jobs
+GET    /api/core/report-jobs/{id}/             poll status; includes download_url when completed
+GET    /api/core/report-jobs/{id}/download/    fetch the file with a signed ?token=
+"""
+
+import logging
+
+from django.core import signing
+from django.http import FileResponse, Http404
+from django.utils import timezone
+
+from django_q.tasks import async_task
+from rest_framework import permissions, status
+from rest_framework.decorators import action
+from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+from apps.core.models import ReportJob
+from apps.core.reports import EXPORT_FORMATS, find_reusable_job, unsign_download_token
+from apps.core.serializers import ReportJobCreateSerializer, ReportJobSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobViewSet(ListModelMixin, RetrieveModelMixin, GenericViewSet):
+    serializer_class = ReportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ReportJob.objects.filter(requested_by=self.request.user)
+
+    def create(self, request):
+        serializer = ReportJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report_type = serializer.validated_data["type"]
+        export_format = serializer.validated_data["format"]
+
+        job = find_reusable_job(request.user, report_type, export_format, timezone.now())
+        if job:
+            return Response(self.get_serializer(job).data, status=status.HTTP_200_OK)
+
+        job = ReportJob.objects.create(
+            requested_by=request.user, report_type=report_type, export_format=export_format
+        )
+        async_task("apps.core.tasks.generate_report_job", job.id)
+
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[permissions.AllowAny],
+        authentication_classes=[],
+    )
+    def download(self, request, pk=None):
+        """Serve a finished report. The signed token is the only credential."""
+        try:
+            job_id = unsign_download_token(request.query_params.get("token", ""))
+        except signing.BadSignature:
+            return Response(
+                {"detail": "Download link is invalid or has expired."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        if job_id != str(pk):
+            return Response(
+                {"detail": "Download link is invalid or has expired."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        job = ReportJob.objects.filter(id=job_id, status="completed").first()
+        if not job or not job.file:
+            raise Http404
+
+        _, content_type, extension = EXPORT_FORMATS[job.export_format]
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename=f"{job.report_type}_report.{extension}",
+            content_type=content_type,
+        )
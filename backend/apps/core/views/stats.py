@@ -1,6 +1,6 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
-from django.db.models import Count, Sum
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
 from django.db.models.functions import TruncMonth
 from django.utils import timezone
 
@@ -10,7 +10,15 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.billing.models import Invoice
-from apps.core.models import Student, Studio, Teacher
+from apps.core.analytics import (
+    MAX_BUCKETS,
+    TRUNC_FUNCTIONS,
+    bucket_count,
+    default_start,
+    get_series,
+)
+from apps.core.models import Student, Studio, StudioDailyFact
+from apps.core.rollups import get_dashboard_rollup
 from apps.lessons.models import Lesson
 
 
@@ -42,46 +50,15 @@ class DashboardStatsView(APIView):
                 unpaid_invoices = 0.0
                 avg_attendance = "100%"
             else:
-                # 1. Total Students — all active students for admins in their studio
-                total_students = Student.objects.filter(studio=studio, is_active=True).count()
-                # Growth should be compared to start of month
-                students_before_month = Student.objects.filter(
-                    studio=studio, is_active=True, created_at__lt=start_of_month
-                ).count()
-                student_growth = total_students - students_before_month
-
-                # 2. Scheduled Lessons (This Week)
-                week_start = today - timedelta(days=today.weekday())
-                week_end = week_start + timedelta(days=7)
-                lessons_this_week = Lesson.objects.filter(
-                    studio=studio, scheduled_start__range=[week_start, week_end], status="scheduled"
-                ).count()
-
-                # 3. Revenue (Month) - Sum of total_amount from paid invoices issued this month in their studio
-                revenue_month = (
-                    Invoice.objects.filter(
-                        studio=studio, status="paid", issue_date__gte=start_of_month.date()
-                    ).aggregate(total=Sum("total_amount"))["total"]
-                    or 0
-                )
-
-                # 4. Active Teachers
-                active_teachers = Teacher.objects.filter(studio=studio, is_active=True).count()
-
-                # 5. Unpaid Invoices
-                unpaid_qs = Invoice.objects.filter(
-                    studio=studio, status__in=["sent", "overdue", "partial"]
-                )
-                unpaid_val = sum(inv.balance_due for inv in unpaid_qs)
-                unpaid_invoices = float(unpaid_val)
-
-                # 6. Average Attendance
-                completed_c = Lesson.objects.filter(studio=studio, status="completed").count()
-                cancelled_c = Lesson.objects.filter(studio=studio, status="cancelled").count()
-                noshow_c = Lesson.objects.filter(studio=studio, status="no_show").count()
-                total_past = completed_c + cancelled_c + noshow_c
-                rate_val = int(completed_c / total_past * 100) if total_past > 0 else 100
-                avg_attendance = f"{rate_val}%"
+                # Overview counters come from the precomputed per-studio rollup
+                rollup = get_dashboard_rollup(studio, now=today)
+                total_students = rollup.active_students
+                student_growth = rollup.new_students_month
+                lessons_this_week = rollup.lessons_this_week
+                revenue_month = rollup.revenue_month
+                active_teachers = rollup.active_teachers
+                unpaid_invoices = float(rollup.unpaid_balance)
+                avg_attendance = f"{rollup.attendance_rate}%"
 
             # 7. New Enquiries (Placeholder until Enquiry module exists)
             new_enquiries = 0
@@ -127,22 +104,25 @@ class DashboardStatsView(APIView):
             # 1. My Students
             my_students = Student.objects.filter(primary_teacher=teacher, is_active=True).count()
 
-            # 2. Today's Schedule
+            # 2. Today's Schedule and 3. Hours Taught (Month) in a single aggregate;
+            # lesson durations are summed in the database
             today_start = today.replace(hour=0, minute=0, second=0)
             today_end = today_start + timedelta(days=1)
-            lessons_today = Lesson.objects.filter(
-                teacher=teacher, scheduled_start__range=[today_start, today_end], status="scheduled"
-            ).count()
-
-            # 3. Hours Taught (Month)
-            lessons_month = Lesson.objects.filter(
-                teacher=teacher, scheduled_start__gte=start_of_month, status="completed"
+            lesson_totals = Lesson.objects.filter(teacher=teacher).aggregate(
+                lessons_today=Count(
+                    "id",
+                    filter=Q(scheduled_start__range=[today_start, today_end], status="scheduled"),
+                ),
+                time_taught=Sum(
+                    ExpressionWrapper(
+                        F("scheduled_end") - F("scheduled_start"), output_field=DurationField()
+                    ),
+                    filter=Q(scheduled_start__gte=start_of_month, status="completed"),
+                ),
             )
-            # Calculate duration in hours roughly
-            hours_taught = 0
-            for lesson in lessons_month:
-                duration = (lesson.scheduled_end - lesson.scheduled_start).total_seconds() / 3600
-                hours_taught += duration
+            lessons_today = lesson_totals["lessons_today"]
+            time_taught = lesson_totals["time_taught"]
+            hours_taught = time_taught.total_seconds() / 3600 if time_taught else 0
 
             stats["overview"] = {
                 "my_students": {"value": my_students, "label": "Active Students"},
@@ -172,11 +152,10 @@ class DashboardStatsView(APIView):
             # 2. Balance Due
             balance_due = 0.0
             if student.bands.exists():
-                unpaid_qs = Invoice.objects.filter(
+                unpaid_val = Invoice.objects.filter(
                     band__in=student.bands.all(), status__in=["sent", "overdue", "partial"]
-                )
-                unpaid_val = sum(inv.balance_due for inv in unpaid_qs)
-                balance_due = float(unpaid_val)
+                ).aggregate(balance=Sum(F("total_amount") - F("amount_paid")))["balance"]
+                balance_due = float(unpaid_val or 0)
 
             # 3. Practice Goal (Estimate from active practice-related goals)
             practice_val = "0/7"
@@ -276,6 +255,14 @@ class DashboardStatsView(APIView):
         return Response(stats)
 
 
+def _parse_date_param(request, name):
+    """Return the named query parameter as a date, or None if it is absent."""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    return date.fromisoformat(value)
+
+
 class DashboardAnalyticsView(APIView):
     """
     API View to return aggregated dashboard charts data (Revenue, Student Growth, Attendance)
@@ -301,68 +288,37 @@ class DashboardAnalyticsView(APIView):
                 }
             )
 
-        today = timezone.now()
-        six_months_ago = today - timedelta(days=180)
-
-        # 1. Revenue Trend (Last 6 Months)
-        # Assuming paid invoices confirm revenue
-        revenue_trend = []
-
-        # We'll use TruncMonth to aggregate by month
-        revenue_qs = (
-            Invoice.objects.filter(
-                studio=studio,
-                status="paid", created_at__gte=six_months_ago
+        # Series range and granularity, e.g. ?granularity=week&start=2025-01-06&end=2025-03-31
+        granularity = request.query_params.get("granularity", "month")
+        if granularity not in TRUNC_FUNCTIONS:
+            return Response(
+                {"detail": "granularity must be one of: day, week, month"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            .annotate(month=TruncMonth("created_at"))
-            .values("month")
-            .annotate(total_revenue=Sum("total_amount"))
-            .order_by("month")
-        )
-
-        # Convert to list with month names
-        # We want to ensure all 6 months are present even if 0 revenue, but for simplicity
-        # let's just map what we have and the frontend can fill gaps or we handle gaps here.
-        # Handling gaps here is better for charts.
-
-        revenue_map = {
-            item["month"].strftime("%Y-%m"): item["total_revenue"] for item in revenue_qs
-        }
-
-        for i in range(5, -1, -1):
-            date = today - timedelta(days=i * 30)  # Approx
-            key = date.strftime("%Y-%m")
-            month_label = date.strftime("%b")
-
-            revenue_trend.append({"month": month_label, "revenue": float(revenue_map.get(key, 0))})
 
-        # 2. Student Growth (Last 6 Months enrollment)
-        # This is strictly "New Students" per month, or Total Active?
-        # The chart title says "Student Growth - Monthly enrollment", implying new students.
-        student_growth = []
-
-        enrollment_qs = (
-            Student.objects.filter(
-                studio=studio,
-                created_at__gte=six_months_ago,
-                is_active=True,  # We might want historical here, but active is okay for now
+        today = timezone.now()
+        try:
+            end_date = _parse_date_param(request, "end") or timezone.localdate()
+            start_date = _parse_date_param(request, "start") or default_start(end_date, granularity)
+        except ValueError:
+            return Response(
+                {"detail": "start and end must be dates in YYYY-MM-DD format"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            .annotate(month=TruncMonth("created_at"))
-            .values("month")
-            .annotate(new_students=Count("id"))
-            .order_by("month")
-        )
 
-        enrollment_map = {
-            item["month"].strftime("%Y-%m"): item["new_students"] for item in enrollment_qs
-        }
-
-        for i in range(5, -1, -1):
-            date = today - timedelta(days=i * 30)
-            key = date.strftime("%Y-%m")
-            month_label = date.strftime("%b")
+        if start_date > end_date:
+            return Response(
+                {"detail": "start must be on or before end"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if bucket_count(start_date, end_date, granularity) > MAX_BUCKETS:
+            return Response(
+                {"detail": f"Range is too large; at most {MAX_BUCKETS} {granularity}s allowed"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            student_growth.append({"month": month_label, "students": enrollment_map.get(key, 0)})
+        # 1. Revenue Trend and 2. Student Growth (cached per studio)
+        series = get_series(studio, granularity, start_date, end_date)
 
         # 3. Lesson Attendance (This Month Breakdown)
         start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
@@ -391,8 +347,132 @@ class DashboardAnalyticsView(APIView):
 
         return Response(
             {
-                "revenue_trend": revenue_trend,
-                "student_growth": student_growth,
+                "granularity": granularity,
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat(),
+                "revenue_trend": series["revenue_trend"],
+                "student_growth": series["student_growth"],
                 "attendance": attendance_data,
             }
         )
+
+
+class FactAnalyticsView(APIView):
+    """
+    Base view for analytics served from the StudioDailyFact table.
+
+    Accepts optional ?start= and ?end= dates (YYYY-MM-DD, default: the last
+    365 days). Subclasses describe their query with class attributes: the
+    facts of `fact_kind` in range get `annotations`, are grouped by
+    `group_by`, aggregated with `aggregates` and sorted by `ordering`; each
+    row then goes through format_row(). They never query the transactional
+    lessons or invoices tables.
+    """
+
+    permission_classes = [IsAuthenticated]
+    fact_kind = None
+    annotations = {}
+    group_by = ()
+    aggregates = {}
+    ordering = ()
+
+    def get(self, request):
+        user = request.user
+
+        # Only admins can see full studio analytics
+        if user.role != "admin":
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            end_date = _parse_date_param(request, "end") or timezone.localdate()
+            start_date = _parse_date_param(request, "start") or end_date - timedelta(days=365)
+        except ValueError:
+            return Response(
+                {"detail": "start and end must be dates in YYYY-MM-DD format"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        studio = Studio.objects.filter(owner=user).first() or Studio.objects.first()
+        results = []
+        if studio:
+            rows = (
+                StudioDailyFact.objects.filter(
+                    studio=studio, kind=self.fact_kind, day__gte=start_date, day__lte=end_date
+                )
+                .annotate(**self.annotations)
+                .values(*self.group_by)
+                .annotate(**self.aggregates)
+                .order_by(*self.ordering)
+            )
+            results = [self.format_row(row) for row in rows]
+
+        return Response(
+            {"start": start_date.isoformat(), "end": end_date.isoformat(), "results": results}
+        )
+
+    def format_row(self, row):
+        return row
+
+
+class RevenueByTeacherView(FactAnalyticsView):
+    """Payments received per teacher."""
+
+    fact_kind = "revenue"
+    group_by = ("teacher_id", "teacher__user__first_name", "teacher__user__last_name")
+    aggregates = {"revenue": Sum("amount"), "invoices": Sum("count")}
+    ordering = ("-revenue",)
+
+    def format_row(self, row):
+        return {
+            "teacher_id": row["teacher_id"],
+            "teacher_name": (
+                f"{row['teacher__user__first_name']} {row['teacher__user__last_name']}".strip()
+                if row["teacher_id"]
+                else "Unassigned"
+            ),
+            "revenue": float(row["revenue"]),
+            "invoices": row["invoices"],
+        }
+
+
+class LessonsByInstrumentView(FactAnalyticsView):
+    """Lesson counts and hours taught per instrument."""
+
+    fact_kind = "lesson"
+    group_by = ("instrument",)
+    aggregates = {
+        "lessons": Sum("count"),
+        "completed": Sum("count", filter=Q(status="completed")),
+        "cancelled": Sum("count", filter=Q(status="cancelled")),
+        "no_show": Sum("count", filter=Q(status="no_show")),
+        "minutes_taught": Sum("minutes", filter=Q(status="completed")),
+    }
+    ordering = ("-lessons",)
+
+    def format_row(self, row):
+        return {
+            "instrument": row["instrument"] or "Unspecified",
+            "lessons": row["lessons"],
+            "completed": row["completed"] or 0,
+            "cancelled": row["cancelled"] or 0,
+            "no_show": row["no_show"] or 0,
+            "hours_taught": round((row["minutes_taught"] or 0) / 60, 1),
+        }
+
+
+class RetentionCohortsView(FactAnalyticsView):
+    """Students enrolled per month and how many of them are still active."""
+
+    fact_kind = "enrolment"
+    annotations = {"cohort": TruncMonth("day")}
+    group_by = ("cohort",)
+    aggregates = {"enrolled": Sum("count"), "retained": Sum("count", filter=Q(status="active"))}
+    ordering = ("cohort",)
+
+    def format_row(self, row):
+        return {
+            "cohort": row["cohort"].strftime("%Y-%m"),
+            "enrolled": row["enrolled"],
+            "retained": row["retained"] or 0,
+            "retention_rate": round((row["retained"] or 0) / row["enrolled"] * 100, 1),
+        }
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:29
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0018_band_ical_feed_url_band_last_calendar_sync_apikey"),
+        ("gigs", "0002_venue_gig_venue_ref"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BandExternalEvent",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("uid", models.CharField(db_index=True, max_length=255)),
+                ("title", models.CharField(max_length=255)),
+                ("description", models.TextField(blank=True)),
+                ("start_time", models.DateTimeField(db_index=True)),
+                ("end_time", models.DateTimeField(db_index=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "band",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="external_events",
+                        to="core.band",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "band_external_events",
+                "ordering": ["start_time"],
+                "unique_together": {("band", "uid")},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+"""
+Drop the old 30-minute band calendar Schedule.
+
+Band feeds are refreshed by apps.lessons.tasks.refresh_calendar_feeds along
+with the users' external feeds, and apps.gigs.tasks.sync_all_band_calendars
+is gone; deployments created before that still have its Schedule row.
+"""
+
+from django.db import migrations
+
+
+def remove_schedule(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.filter(func="apps.gigs.tasks.sync_all_band_calendars").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gigs", "0004_bandexternalevent_content_hash"),
+        ("django_q", "0018_task_success_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_schedule, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
 from rest_framework import serializers
+
+from apps.core.eager_loading import AnnotatedCountField
+
 from .models import BandAvailability, BandExternalEvent, Gig, GigClaim, GigPayout, Venue
 
 
@@ -30,7 +33,7 @@ class VenueSerializer(serializers.ModelSerializer):
         required=False,
     )
     allowed_poster_names = serializers.SerializerMethodField()
-    gigs_count = serializers.SerializerMethodField()
+    gigs_count = AnnotatedCountField("gigs")
 
     class Meta:
         model = Venue
@@ -47,13 +50,11 @@ class VenueSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "studio", "created_at", "updated_at"]
+        eager_load = {"allowed_poster_names": ["allowed_posters"]}
 
     def get_allowed_poster_names(self, obj):
         return [u.get_full_name() or u.email for u in obj.allowed_posters.all()]
 
-    def get_gigs_count(self, obj):
-        return obj.gigs.count()
-
 
 class BandAvailabilitySerializer(serializers.ModelSerializer):
     band_name = serializers.CharField(source="band.name", read_only=True)
@@ -102,6 +103,7 @@ class GigClaimSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "status", "created_at", "updated_at"]
+        eager_load = {"gig_venue": ["gig__venue_ref"]}
 
     def get_gig_venue(self, obj):
         if obj.gig.venue_ref:
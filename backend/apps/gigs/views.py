@@ -13,6 +13,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.eager_loading import EagerLoadingMixin
 from apps.core.models import Studio, Band
 from apps.billing.models import Invoice, Payment, InvoiceLineItem
 from .models import BandAvailability, BandExternalEvent, Gig, GigClaim, GigPayout, Venue
@@ -102,7 +103,7 @@ class BandAvailabilityViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class VenueViewSet(viewsets.ModelViewSet):
+class VenueViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     CRUD for venues. Only admins can create/update/delete; all authenticated users can list.
     """
@@ -372,7 +373,7 @@ class GigViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class GigClaimViewSet(viewsets.ModelViewSet):
+class GigClaimViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     ViewSet for viewing gig claims
     """
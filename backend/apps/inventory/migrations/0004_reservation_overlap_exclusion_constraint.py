@@ -0,0 +1,77 @@
+"""
+Exclusion constraint that stops a practice room being double-booked.
+
+PostgreSQL only, and only where the btree_gist extension is available; other
+databases rely on the in-transaction check in apps/core/booking.py.
+
+Existing rows that would violate the constraint (overlapping pending or
+confirmed reservations of a room, or reservations ending before they start,
+which tstzrange() rejects) are not changed: the migration stops and lists
+their ids, so they can be cancelled or rescheduled before running migrate
+again.
+"""
+
+from django.db import migrations
+
+CONSTRAINT = "reservations_no_room_overlap"
+DEFINITION = (
+    "EXCLUDE USING gist (room_id WITH =, tstzrange(start_time, end_time, '[)') WITH &&) "
+    "WHERE (status IN ('pending', 'confirmed'))"
+)
+
+
+def find_conflicts(cursor, table):
+    """Describe the existing reservations that would stop the constraint being added."""
+    cursor.execute(
+        f"SELECT id FROM {table} "
+        f"WHERE end_time < start_time AND status IN ('pending', 'confirmed') ORDER BY id"
+    )
+    conflicts = [f"reservation {row[0]} ends before it starts" for row in cursor.fetchall()]
+    if conflicts:
+        # The overlap check below would hit the same tstzrange() error
+        return conflicts
+    cursor.execute(
+        f"SELECT a.id, b.id FROM {table} a JOIN {table} b "
+        f"ON a.room_id = b.room_id AND a.id < b.id "
+        f"AND tstzrange(a.start_time, a.end_time, '[)') && tstzrange(b.start_time, b.end_time, '[)') "
+        f"WHERE a.status IN ('pending', 'confirmed') AND b.status IN ('pending', 'confirmed') "
+        f"ORDER BY a.id, b.id"
+    )
+    return [f"reservations {a} and {b} overlap" for a, b in cursor.fetchall()]
+
+
+def add_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("inventory", "RoomReservation")._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gist'")
+        if cursor.fetchone() is None:
+            return
+        conflicts = find_conflicts(cursor, table)
+        if conflicts:
+            raise RuntimeError(
+                "Cannot add the room reservation double-booking constraint; cancel or "
+                "reschedule these reservations and run migrate again:\n  " + "\n  ".join(conflicts)
+            )
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {CONSTRAINT} {DEFINITION}")
+
+
+def remove_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("inventory", "RoomReservation")._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {CONSTRAINT}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0003_add_studio_fk"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_constraint, remove_constraint),
+    ]
@@ -1,6 +1,7 @@
 from datetime import timedelta
 
-from django.db.models import Q
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from rest_framework import serializers, status, viewsets
@@ -8,6 +9,9 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.core.booking import RESERVATION_RULES, save_booking
+from apps.core.eager_loading import EagerLoadingMixin
+
 from .models import CheckoutLog, InventoryItem, PracticeRoom, RoomReservation
 from .serializers import (
     CheckoutLogSerializer,
@@ -52,24 +56,28 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def stats(self, request):
         """Get inventory statistics"""
-        items = self.get_queryset()
-
-        total_items = items.count()
-        total_value = sum(item.value * item.quantity for item in items)
-        low_stock = items.filter(available_quantity__lte=2).count()
-        needs_repair = items.filter(condition="needs-repair").count()
+        totals = self.get_queryset().aggregate(
+            total_items=Count("id"),
+            total_value=Coalesce(
+                Sum(F("value") * F("quantity"), output_field=DecimalField()),
+                0,
+                output_field=DecimalField(),
+            ),
+            low_stock=Count("id", filter=Q(available_quantity__lte=2)),
+            needs_repair=Count("id", filter=Q(condition="needs-repair")),
+        )
 
         return Response(
             {
-                "total_items": total_items,
-                "total_value": f"${total_value:,.2f}",
-                "low_stock": low_stock,
-                "needs_repair": needs_repair,
+                "total_items": totals["total_items"],
+                "total_value": f"${totals['total_value']:,.2f}",
+                "low_stock": totals["low_stock"],
+                "needs_repair": totals["needs_repair"],
             }
         )
 
 
-class CheckoutLogViewSet(viewsets.ModelViewSet):
+class CheckoutLogViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for checkout logs"""
 
     queryset = CheckoutLog.objects.select_related("item", "student", "approved_by")
@@ -231,7 +239,10 @@ class RoomReservationViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Create a new reservation"""
-        serializer.save(student=self.request.user.student_profile)
+        save_booking(serializer, RESERVATION_RULES, student=self.request.user.student_profile)
+
+    def perform_update(self, serializer):
+        save_booking(serializer, RESERVATION_RULES)
 
     @action(detail=True, methods=["post"])
     def cancel(self, request, pk=None):
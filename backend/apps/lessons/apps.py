@@ -7,3 +7,30 @@ class LessonsConfig(AppConfig):
 
     def ready(self):
         import apps.lessons.signals
+
+        self._register_schedule()
+
+    def _register_schedule(self):
+        try:
+            from django_q.models import Schedule
+
+            Schedule.objects.get_or_create(
+                func="apps.lessons.tasks.extend_recurring_lessons",
+                defaults={
+                    "name": "Extend recurring lesson horizon",
+                    "schedule_type": Schedule.DAILY,
+                    "repeats": -1,  # run forever
+                },
+            )
+            Schedule.objects.get_or_create(
+                func="apps.lessons.tasks.refresh_calendar_feeds",
+                defaults={
+                    "name": "Refresh external calendar feeds",
+                    "schedule_type": Schedule.MINUTES,
+                    "minutes": 10,
+                    "repeats": -1,  # run forever
+                },
+            )
+        except Exception:
+            # Tables may not exist yet during initial migrations — safe to skip.
+            pass
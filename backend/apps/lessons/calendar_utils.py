@@ -12,10 +12,12 @@ from icalendar import Calendar, Event
 from apps.lessons.models import Lesson
 
 
-def generate_teacher_calendar(teacher):
+def generate_teacher_calendar(teacher, now=None):
     """
     Generate ICS calendar feed for a teacher's lessons
+    `now` anchors the date window and DTSTAMP (default: the current time)
     """
+    now = now or timezone.now()
     calendar = Calendar()
     calendar.add("prodid", "-//Music Studio Manager//Teacher Calendar//EN")
     calendar.add("version", "2.0")
@@ -25,12 +27,16 @@ def generate_teacher_calendar(teacher):
     calendar.add("x-wr-timezone", "UTC")
 
     # Get lessons from 1 month ago to 6 months ahead
-    start_date = timezone.now() - timedelta(days=30)
-    end_date = timezone.now() + timedelta(days=180)
+    start_date = now - timedelta(days=30)
+    end_date = now + timedelta(days=180)
 
-    lessons = Lesson.objects.filter(
-        teacher=teacher, scheduled_start__gte=start_date, scheduled_start__lte=end_date
-    ).exclude(status="cancelled")
+    lessons = (
+        Lesson.objects.filter(
+            teacher=teacher, scheduled_start__gte=start_date, scheduled_start__lte=end_date
+        )
+        .exclude(status="cancelled")
+        .select_related("student__user")
+    )
 
     for lesson in lessons:
         event = Event()
@@ -41,7 +47,7 @@ def generate_teacher_calendar(teacher):
         )
         event.add("dtstart", lesson.scheduled_start)
         event.add("dtend", lesson.scheduled_end)
-        event.add("dtstamp", timezone.now())
+        event.add("dtstamp", now)
 
         # Location
         if lesson.lesson_type == "online":
@@ -55,8 +61,8 @@ def generate_teacher_calendar(teacher):
             f"Instrument: {lesson.student.instrument}",
             f"Type: {lesson.get_lesson_type_display()}",
         ]
-        if lesson.notes:
-            description_parts.append(f"\\nNotes: {lesson.notes}")
+        if lesson.summary:
+            description_parts.append(f"\\nNotes: {lesson.summary}")
 
         event.add("description", "\\n".join(description_parts))
 
@@ -76,10 +82,12 @@ def generate_teacher_calendar(teacher):
     return calendar.to_ical()
 
 
-def generate_student_calendar(student):
+def generate_student_calendar(student, now=None):
     """
     Generate ICS calendar feed for a student's lessons
+    `now` anchors the date window and DTSTAMP (default: the current time)
     """
+    now = now or timezone.now()
     calendar = Calendar()
     calendar.add("prodid", "-//Music Studio Manager//Student Calendar//EN")
     calendar.add("version", "2.0")
@@ -89,12 +97,16 @@ def generate_student_calendar(student):
     calendar.add("x-wr-timezone", "UTC")
 
     # Get lessons from 1 month ago to 6 months ahead
-    start_date = timezone.now() - timedelta(days=30)
-    end_date = timezone.now() + timedelta(days=180)
+    start_date = now - timedelta(days=30)
+    end_date = now + timedelta(days=180)
 
-    lessons = Lesson.objects.filter(
-        student=student, scheduled_start__gte=start_date, scheduled_start__lte=end_date
-    ).exclude(status="cancelled")
+    lessons = (
+        Lesson.objects.filter(
+            student=student, scheduled_start__gte=start_date, scheduled_start__lte=end_date
+        )
+        .exclude(status="cancelled")
+        .select_related("teacher__user")
+    )
 
     for lesson in lessons:
         event = Event()
@@ -105,7 +117,7 @@ def generate_student_calendar(student):
         )
         event.add("dtstart", lesson.scheduled_start)
         event.add("dtend", lesson.scheduled_end)
-        event.add("dtstamp", timezone.now())
+        event.add("dtstamp", now)
 
         # Location
         if lesson.lesson_type == "online":
@@ -139,10 +151,12 @@ def generate_student_calendar(student):
     return calendar.to_ical()
 
 
-def generate_studio_calendar(studio):
+def generate_studio_calendar(studio, now=None):
     """
     Generate ICS calendar feed for all studio lessons
+    `now` anchors the date window and DTSTAMP (default: the current time)
     """
+    now = now or timezone.now()
     calendar = Calendar()
     calendar.add("prodid", "-//Music Studio Manager//Studio Calendar//EN")
     calendar.add("version", "2.0")
@@ -152,8 +166,8 @@ def generate_studio_calendar(studio):
     calendar.add("x-wr-timezone", "UTC")
 
     # Get lessons from 1 month ago to 6 months ahead
-    start_date = timezone.now() - timedelta(days=30)
-    end_date = timezone.now() + timedelta(days=180)
+    start_date = now - timedelta(days=30)
+    end_date = now + timedelta(days=180)
 
     lessons = (
         Lesson.objects.filter(
@@ -173,7 +187,7 @@ def generate_studio_calendar(studio):
         )
         event.add("dtstart", lesson.scheduled_start)
         event.add("dtend", lesson.scheduled_end)
-        event.add("dtstamp", timezone.now())
+        event.add("dtstamp", now)
 
         # Location
         if lesson.lesson_type == "online":
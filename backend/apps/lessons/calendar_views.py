@@ -2,8 +2,10 @@
 Calendar feed views
 """
 
-from django.http import HttpResponse
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET
 
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -11,11 +13,14 @@ from rest_framework.response import Response
 
 from apps.core.models import Student, Studio, Teacher
 
-from .calendar_utils import (
-    generate_student_calendar,
-    generate_studio_calendar,
-    generate_teacher_calendar,
-)
+from .feeds import feed_response
+from .models import CalendarFeedToken
+
+FEED_MODELS = {
+    "teacher": (Teacher, ["user"]),
+    "student": (Student, ["user"]),
+    "studio": (Studio, []),
+}
 
 
 @api_view(["GET"])
@@ -26,15 +31,9 @@ def teacher_calendar_feed(request, teacher_id):
     """
     teacher = get_object_or_404(Teacher, id=teacher_id)
 
-    # Generate calendar
-    ical_data = generate_teacher_calendar(teacher)
-
-    # Return as downloadable file
-    response = HttpResponse(ical_data, content_type="text/calendar; charset=utf-8")
-    response["Content-Disposition"] = f'attachment; filename="teacher-{teacher.id}-lessons.ics"'
-    response["Cache-Control"] = "no-cache, no-store, must-revalidate"
-
-    return response
+    return feed_response(
+        request, "teacher", teacher.id, lambda: teacher, f"teacher-{teacher.id}-lessons.ics"
+    )
 
 
 @api_view(["GET"])
@@ -45,15 +44,9 @@ def student_calendar_feed(request, student_id):
     """
     student = get_object_or_404(Student, id=student_id)
 
-    # Generate calendar
-    ical_data = generate_student_calendar(student)
-
-    # Return as downloadable file
-    response = HttpResponse(ical_data, content_type="text/calendar; charset=utf-8")
-    response["Content-Disposition"] = f'attachment; filename="student-{student.id}-lessons.ics"'
-    response["Cache-Control"] = "no-cache, no-store, must-revalidate"
-
-    return response
+    return feed_response(
+        request, "student", student.id, lambda: student, f"student-{student.id}-lessons.ics"
+    )
 
 
 @api_view(["GET"])
@@ -70,15 +63,9 @@ def studio_calendar_feed(request, studio_id):
     if request.user != studio.owner and not request.user.is_staff:
         return Response({"error": "Permission denied"}, status=403)
 
-    # Generate calendar
-    ical_data = generate_studio_calendar(studio)
-
-    # Return as downloadable file
-    response = HttpResponse(ical_data, content_type="text/calendar; charset=utf-8")
-    response["Content-Disposition"] = f'attachment; filename="studio-{studio.id}-lessons.ics"'
-    response["Cache-Control"] = "no-cache, no-store, must-revalidate"
-
-    return response
+    return feed_response(
+        request, "studio", studio.id, lambda: studio, f"studio-{studio.id}-lessons.ics"
+    )
 
 
 @api_view(["GET"])
@@ -89,22 +76,71 @@ def my_calendar_feed(request):
     Automatically detects if user is a teacher or student
     URL: /api/calendar/my/lessons.ics
     """
-    # Check if user is a teacher
-    if hasattr(request.user, "teacher_profile"):
-        teacher = request.user.teacher_profile
-        ical_data = generate_teacher_calendar(teacher)
-        filename = "my-lessons.ics"
-    # Check if user is a student
-    elif hasattr(request.user, "student_profile"):
-        student = request.user.student_profile
-        ical_data = generate_student_calendar(student)
-        filename = "my-lessons.ics"
-    else:
+    scope, obj = _own_feed(request.user)
+    if obj is None:
         return Response({"error": "User is neither a teacher nor a student"}, status=400)
 
-    # Return as downloadable file
-    response = HttpResponse(ical_data, content_type="text/calendar; charset=utf-8")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    response["Cache-Control"] = "no-cache, no-store, must-revalidate"
+    return feed_response(request, scope, obj.id, lambda: obj, "my-lessons.ics")
+
+
+@require_GET
+def subscribed_calendar_feed(request, token):
+    """
+    ICS feed behind a secret subscription token, for calendar apps that can't
+    authenticate. Skips DRF entirely; a poll is a token lookup plus a cache read.
+    URL: /api/lessons/calendar/feed/{token}.ics
+    """
+    feed_token = CalendarFeedToken.objects.filter(token=token).values("scope", "object_id").first()
+    if feed_token is None:
+        raise Http404("Unknown calendar feed")
+
+    scope, object_id = feed_token["scope"], feed_token["object_id"]
+    model, related = FEED_MODELS[scope]
+
+    def get_object():
+        obj = model.objects.select_related(*related).filter(pk=object_id).first()
+        if obj is None:
+            raise Http404("Unknown calendar feed")
+        return obj
+
+    return feed_response(request, scope, object_id, get_object, f"{scope}-lessons.ics")
 
-    return response
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated])
+def calendar_subscription(request):
+    """
+    Subscription URL for the current user's feed, created on first request.
+    POST rotates the token, cutting off every existing subscriber.
+    ?scope=studio returns the studio-wide feed for studio owners.
+    URL: /api/lessons/calendar/subscription/
+    """
+    if request.query_params.get("scope") == "studio":
+        studio = Studio.objects.filter(owner=request.user).first()
+        scope, obj = ("studio", studio) if studio else (None, None)
+    else:
+        scope, obj = _own_feed(request.user)
+    if obj is None:
+        return Response({"error": "No calendar feed available for this user"}, status=400)
+
+    lookup = {"user": request.user, "scope": scope, "object_id": obj.pk}
+    if request.method == "POST":
+        CalendarFeedToken.objects.filter(**lookup).delete()
+    feed_token, _ = CalendarFeedToken.objects.get_or_create(**lookup)
+
+    url = request.build_absolute_uri(reverse("calendar-subscription-feed", args=[feed_token.token]))
+    return Response(
+        {
+            "scope": scope,
+            "url": url,
+            "webcal_url": "webcal://" + url.split("://", 1)[1],
+        }
+    )
+
+
+def _own_feed(user):
+    if hasattr(user, "teacher_profile"):
+        return "teacher", user.teacher_profile
+    if hasattr(user, "student_profile"):
+        return "student", user.student_profile
+    return None, None
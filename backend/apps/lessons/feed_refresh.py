@@ -0,0 +1,285 @@
+"""
+Scheduled refresh of every external iCal feed we mirror.
+
+Two kinds of feed are polled: users' ExternalCalendarFeed overlays and
+Band.ical_feed_url (gig marketplace availability). refresh_feeds() picks the
+ones that are due, downloads them on a thread pool and applies the results on
+the calling thread as each download finishes:
+
+- at most MAX_WORKERS requests are in flight, and at most HOST_CONCURRENCY
+  against any one host, so a run over hundreds of Google/iCloud feeds stays
+  polite while still finishing in seconds;
+- requests carry If-None-Match / If-Modified-Since from the last fetch, so an
+  unchanged feed costs a 304 and no body;
+- a 200 whose body hashes the same as the last parsed one is not parsed again
+  (many servers ignore conditional headers);
+- except that recurrences are expanded over a window measured from now (see
+  core/ical_stream.py), so the day's first fetch is unconditional and the
+  hash includes the date: every feed is re-parsed at least once a day and its
+  window moves along even if the body never changes;
+- a feed that fails is retried after RETRY_BASE, doubling per consecutive
+  failure up to RETRY_MAX, instead of every run.
+
+Worker threads only do HTTP; all database access stays on the calling thread.
+"""
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import timedelta
+from itertools import zip_longest
+from urllib.parse import urlsplit
+
+from django.utils import timezone
+
+import requests
+
+from apps.core.models import Band
+
+from .import_calendar_views import (
+    FETCH_HEADERS,
+    FETCH_TIMEOUT_SECONDS,
+    _parse_and_upsert_events,
+    _read_body,
+)
+from .models import ExternalCalendarFeed
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 16
+HOST_CONCURRENCY = 2
+REFRESH_INTERVAL = timedelta(minutes=30)
+RETRY_BASE = timedelta(minutes=15)
+RETRY_MAX = timedelta(hours=24)
+
+
+class FeedSource:
+    """Where one kind of feed keeps its URL, sync stamp and fetch state."""
+
+    def __init__(self, name, queryset, url, synced_at, state, sync):
+        self.name = name
+        self.queryset = queryset
+        self.url = url
+        self.synced_at = synced_at
+        # etag / last_modified / content_hash / last_error / failure_count /
+        # last_attempted_at -> model field name
+        self.state = state
+        self.sync = sync
+
+    def get(self, obj, key):
+        return getattr(obj, self.state[key])
+
+    def due(self, now):
+        return [
+            obj
+            for obj in self.queryset()
+            if (when := next_attempt(self, obj)) is None or when <= now
+        ]
+
+
+def _sync_band(band, body):
+    from apps.gigs.tasks import sync_band_events
+
+    return sync_band_events(band, body)
+
+
+EXTERNAL_FEEDS = FeedSource(
+    "external",
+    lambda: ExternalCalendarFeed.objects.filter(is_enabled=True),
+    url="url",
+    synced_at="last_synced_at",
+    state={
+        "etag": "etag",
+        "last_modified": "http_last_modified",
+        "content_hash": "content_hash",
+        "last_error": "last_error",
+        "failure_count": "failure_count",
+        "last_attempted_at": "last_attempted_at",
+    },
+    sync=_parse_and_upsert_events,
+)
+BAND_FEEDS = FeedSource(
+    "band",
+    lambda: Band.objects.exclude(ical_feed_url="").exclude(ical_feed_url__isnull=True),
+    url="ical_feed_url",
+    synced_at="last_calendar_sync",
+    state={
+        "etag": "ical_etag",
+        "last_modified": "ical_last_modified",
+        "content_hash": "ical_content_hash",
+        "last_error": "ical_last_error",
+        "failure_count": "ical_failure_count",
+        "last_attempted_at": "ical_last_attempted_at",
+    },
+    sync=_sync_band,
+)
+SOURCES = [EXTERNAL_FEEDS, BAND_FEEDS]
+
+
+def next_attempt(source, obj):
+    """When `obj` should next be fetched; None if it never has been."""
+    failures = source.get(obj, "failure_count")
+    attempted = source.get(obj, "last_attempted_at")
+    if source.get(obj, "last_error") and failures and attempted:
+        return attempted + min(RETRY_BASE * 2 ** (failures - 1), RETRY_MAX)
+    synced = getattr(obj, source.synced_at)
+    return synced + REFRESH_INTERVAL if synced else None
+
+
+@dataclass
+class Fetched:
+    not_modified: bool = False
+    body: bytes = b""
+    etag: str = ""
+    last_modified: str = ""
+
+
+def body_digest(body, now):
+    """The skip key for a fetched body: its sha256, salted with the expansion window's day."""
+    return hashlib.sha256(now.date().isoformat().encode() + b"\n" + body).hexdigest()
+
+
+def validators(source, obj, now):
+    """(etag, last_modified) to send with obj's next fetch; blank on the day's first one."""
+    synced = getattr(obj, source.synced_at)
+    if synced is None or synced.date() != now.date():
+        return "", ""
+    return source.get(obj, "etag"), source.get(obj, "last_modified")
+
+
+def fetch_feed(url, etag="", last_modified=""):
+    """Conditional GET of a feed; runs on a worker thread, so no database access."""
+    headers = dict(FETCH_HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    resp = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT_SECONDS, stream=True)
+    if resp.status_code == 304:
+        resp.close()
+        return Fetched(not_modified=True, etag=etag, last_modified=last_modified)
+    resp.raise_for_status()
+    return Fetched(
+        body=_read_body(resp),
+        etag=resp.headers.get("ETag", ""),
+        last_modified=resp.headers.get("Last-Modified", ""),
+    )
+
+
+def _polite_fetch(host_slots, url, etag, last_modified):
+    with host_slots:
+        return fetch_feed(url, etag, last_modified)
+
+
+def _record(source, obj, now, fields, **extra):
+    update = {source.state[key]: value for key, value in fields.items()}
+    update[source.state["last_attempted_at"]] = now
+    update.update(extra)
+    for name, value in update.items():
+        setattr(obj, name, value)
+    obj.save(update_fields=list(update))
+
+
+def _record_fetch(source, obj, fetched, digest, now):
+    _record(
+        source,
+        obj,
+        now,
+        {
+            "etag": fetched.etag[:255],
+            "last_modified": fetched.last_modified[:64],
+            "content_hash": digest,
+            "last_error": "",
+            "failure_count": 0,
+        },
+        **{source.synced_at: now},
+    )
+
+
+def _apply(source, obj, fetched, now):
+    """Store a successful fetch, parsing the body only if it changed. Returns the outcome."""
+    outcome = "not_modified"
+    digest = source.get(obj, "content_hash")
+    if not fetched.not_modified:
+        digest = body_digest(fetched.body, now)
+        if digest == source.get(obj, "content_hash"):
+            outcome = "unchanged"
+        else:
+            source.sync(obj, fetched.body)
+            outcome = "synced"
+
+    _record_fetch(source, obj, fetched, digest, now)
+    return outcome
+
+
+def sync_now(source, obj):
+    """
+    Fetch and parse one feed right away (the manual sync actions), recording the
+    fetch as refresh_feeds() does so later runs compare against this body.
+    Returns the SyncResult; fetch and parse errors propagate.
+    """
+    now = timezone.now()
+    fetched = fetch_feed(getattr(obj, source.url))
+    result = source.sync(obj, fetched.body)
+    _record_fetch(source, obj, fetched, body_digest(fetched.body, now), now)
+    return result
+
+
+def refresh_feeds(sources=None, force=False):
+    """
+    Refresh every due feed of the given sources (default: all). `force`
+    ignores the schedule and backoff. Returns a count per outcome:
+    synced, unchanged, not_modified and failed.
+    """
+    now = timezone.now()
+    jobs = [
+        (source, obj)
+        for source in sources or SOURCES
+        for obj in (source.queryset() if force else source.due(now))
+    ]
+    totals = {"synced": 0, "unchanged": 0, "not_modified": 0, "failed": 0}
+    if not jobs:
+        return totals
+
+    by_host = {}
+    for source, obj in jobs:
+        host = urlsplit(getattr(obj, source.url)).hostname or ""
+        by_host.setdefault(host, []).append((source, obj))
+    host_slots = {host: threading.BoundedSemaphore(HOST_CONCURRENCY) for host in by_host}
+    # Round-robin across hosts so workers aren't all queued on one host's slots
+    queue = [job for batch in zip_longest(*by_host.values()) for job in batch if job]
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(jobs))) as pool:
+        futures = {}
+        for source, obj in queue:
+            url = getattr(obj, source.url)
+            future = pool.submit(
+                _polite_fetch,
+                host_slots[urlsplit(url).hostname or ""],
+                url,
+                *validators(source, obj, now),
+            )
+            futures[future] = (source, obj)
+
+        for future in as_completed(futures):
+            source, obj = futures[future]
+            try:
+                totals[_apply(source, obj, future.result(), timezone.now())] += 1
+            except Exception as exc:
+                logger.error(f"Failed to refresh {source.name} feed {obj.pk}: {exc}")
+                _record(
+                    source,
+                    obj,
+                    timezone.now(),
+                    {
+                        "last_error": str(exc),
+                        "failure_count": source.get(obj, "failure_count") + 1,
+                    },
+                )
+                totals["failed"] += 1
+
+    logger.info(f"Refreshed {len(jobs)} calendar feeds: {totals}")
+    return totals
@@ -0,0 +1,178 @@
+"""
+Cached, conditional delivery of the exported ICS feeds.
+
+Calendar clients poll feeds every few minutes, but a feed only changes when
+one of its lessons does. Each feed's rendered body is cached with an ETag and
+Last-Modified stamp, so a poll is a cache read, and a poll carrying
+If-None-Match / If-Modified-Since that still matches gets an empty 304.
+Lesson writes retire the cached bodies of the teacher, student and studio feeds
+they appear in (see lessons/signals.py); FEED_CACHE_TIMEOUT bounds staleness
+for changes that don't go through a Lesson save, such as a renamed student.
+
+Each feed has a version counter, bumped when a write commits. A body is cached
+with the version read before it was rendered and only served while that is
+still current, so a render that raced a write can't leave the old body cached.
+
+Bodies are written by the streaming writer in lessons/ics.py. Studio feeds,
+which can run to thousands of events, are streamed to the client on a miss
+and cached as they go out, so the first poll doesn't wait for (or buffer)
+the whole feed; bodies over FEED_CACHE_MAX_BYTES are streamed every time.
+"""
+
+import hashlib
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .ics import iter_student_calendar, iter_studio_calendar, iter_teacher_calendar
+
+logger = logging.getLogger(__name__)
+
+FEED_CACHE_TIMEOUT = 60 * 60
+FEED_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+WRITERS = {
+    "teacher": iter_teacher_calendar,
+    "student": iter_student_calendar,
+    "studio": iter_studio_calendar,
+}
+
+# Scopes streamed to the client on a cache miss instead of rendered up front
+STREAMED_SCOPES = {"studio"}
+
+
+def feed_cache_key(scope, object_id):
+    return f"ics:{scope}:{object_id}"
+
+
+def _version_key(key):
+    return f"{key}:version"
+
+
+def feed_version(key):
+    """Return the current version of a feed's cache entry."""
+    version_key = _version_key(key)
+    version = cache.get(version_key)
+    if version is None:
+        # Seeded from the clock, as for the analytics cache, so a version lost
+        # to eviction never matches a body cached under an older one
+        cache.add(version_key, time.time_ns(), timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def bump_feed_version(key):
+    """Retire a feed's cached body, including one still being rendered."""
+    version_key = _version_key(key)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.add(version_key, time.time_ns(), timeout=None)
+    cache.delete(key)
+
+
+def _cached_feed(key):
+    """(current version, cached feed or None) for a feed, in one cache read."""
+    cached = cache.get_many([key, _version_key(key)])
+    version = cached.get(_version_key(key))
+    if version is None:
+        return feed_version(key), None
+    feed = cached.get(key)
+    if feed is None or feed["version"] != version:
+        return version, None
+    return version, feed
+
+
+def _feed_entry(body, version, digest=None):
+    digest = digest or hashlib.sha256(body)
+    return {
+        "version": version,
+        "body": body,
+        "etag": f'"{digest.hexdigest()[:32]}"',
+        "last_modified": int(timezone.now().timestamp()),
+    }
+
+
+def _render_feed(key, version, scope, obj):
+    feed = _feed_entry(b"".join(WRITERS[scope](obj)), version)
+    if len(feed["body"]) <= FEED_CACHE_MAX_BYTES:
+        cache.set(key, feed, FEED_CACHE_TIMEOUT)
+    return feed
+
+
+def _stream_and_cache(key, version, chunks):
+    """Pass chunks through, caching the body once it has all been sent."""
+    digest = hashlib.sha256()
+    kept, size = [], 0
+    for chunk in chunks:
+        digest.update(chunk)
+        size += len(chunk)
+        if size > FEED_CACHE_MAX_BYTES:
+            kept = None
+        elif kept is not None:
+            kept.append(chunk)
+        yield chunk
+    if kept is not None:
+        cache.set(key, _feed_entry(b"".join(kept), version, digest), FEED_CACHE_TIMEOUT)
+
+
+def feed_response(request, scope, object_id, get_object, filename):
+    """
+    Serve a feed, answering 304 when the client's copy is current. `get_object`
+    is only called on a miss, so a cached poll never loads the teacher/student/studio.
+    """
+    key = feed_cache_key(scope, object_id)
+    version, feed = _cached_feed(key)
+    if feed is None and scope in STREAMED_SCOPES:
+        chunks = WRITERS[scope](get_object())
+        response = StreamingHttpResponse(
+            _stream_and_cache(key, version, chunks), content_type="text/calendar; charset=utf-8"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        # No ETag until the body has been hashed; the next poll gets one
+        response["Cache-Control"] = "private, no-cache"
+        return response
+    if feed is None:
+        feed = _render_feed(key, version, scope, get_object())
+
+    response = get_conditional_response(
+        request, etag=feed["etag"], last_modified=feed["last_modified"]
+    )
+    if response is None:
+        response = HttpResponse(feed["body"], content_type="text/calendar; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["ETag"] = feed["etag"]
+    response["Last-Modified"] = http_date(feed["last_modified"])
+    # Clients must revalidate, which the ETag makes cheap
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def invalidate_lesson_feeds(teacher_id=None, student_id=None, studio_id=None):
+    """Retire the cached feeds a lesson appears in once the transaction commits."""
+    keys = [
+        feed_cache_key(scope, object_id)
+        for scope, object_id in (
+            ("teacher", teacher_id),
+            ("student", student_id),
+            ("studio", studio_id),
+        )
+        if object_id
+    ]
+    if not keys:
+        return
+
+    def _bump():
+        try:
+            for key in keys:
+                bump_feed_version(key)
+        except Exception as e:
+            logger.error(f"Failed to invalidate calendar feeds {keys}: {e}")
+
+    transaction.on_commit(_bump)
@@ -0,0 +1,244 @@
+"""
+Streaming ICS writer for the exported lesson feeds.
+
+The generators in calendar_utils build an icalendar.Calendar with an Event
+(and for students an Alarm) object per lesson, then serialise the whole tree.
+The iter_*_calendar functions here write the same bytes directly from a
+values() iterator: content lines are escaped and folded as icalendar does
+(properties in its canonical-then-alphabetical order), and output is yielded
+in STREAM_BUFFER_SIZE chunks, so memory stays flat however many lessons a
+feed has and the first bytes go out before the query finishes.
+
+tests/api/test_ics_writer.py pins the output to calendar_utils byte for byte;
+`manage.py benchmark_ics_feeds` compares the two.
+"""
+
+from datetime import UTC, timedelta
+
+from django.utils import timezone
+
+from .models import Lesson
+
+STREAM_BUFFER_SIZE = 64 * 1024
+FOLD_LIMIT = 75
+FEED_PAST = timedelta(days=30)
+FEED_AHEAD = timedelta(days=180)
+
+LESSON_TYPES = dict(Lesson.LESSON_TYPE_CHOICES)
+
+# Columns every feed reads; names are joined in rather than loaded per row
+LESSON_COLUMNS = (
+    "id",
+    "scheduled_start",
+    "scheduled_end",
+    "status",
+    "lesson_type",
+    "location",
+    "summary",
+    "teacher__user__first_name",
+    "teacher__user__last_name",
+    "student_id",
+    "student__user__first_name",
+    "student__user__last_name",
+    "student__instrument",
+    "band__name",
+)
+
+
+def escape_text(value):
+    """RFC 5545 TEXT escaping, identical to icalendar.parser.escape_char."""
+    return (
+        value.replace(r"\N", "\n")
+        .replace("\\", "\\\\")
+        .replace(";", r"\;")
+        .replace(",", r"\,")
+        .replace("\r\n", r"\n")
+        .replace("\n", r"\n")
+    )
+
+
+def fold(line):
+    """Fold a content line at 75 octets, identical to icalendar.parser.foldline."""
+    if line.isascii():
+        step = FOLD_LIMIT - 1
+        return "\r\n ".join(line[i : i + step] for i in range(0, len(line), step))
+
+    chars = []
+    size = 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        size += width
+        if size >= FOLD_LIMIT:
+            chars.append("\r\n ")
+            size = width
+        chars.append(char)
+    return "".join(chars)
+
+
+def text_line(name, value):
+    return fold(f"{name}:{escape_text(value)}") + "\r\n"
+
+
+def datetime_line(name, value):
+    value = value.astimezone(UTC)
+    return f"{name}:{value:%Y%m%dT%H%M%S}Z\r\n"
+
+
+def _full_name(first, last):
+    return f"{first or ''} {last or ''}".strip()
+
+
+def _attendee(row):
+    """Display name and instrument for the lesson's student (or band)."""
+    if row["student_id"]:
+        return (
+            _full_name(row["student__user__first_name"], row["student__user__last_name"]),
+            row["student__instrument"],
+        )
+    return row["band__name"] or "Group", ""
+
+
+def _buffered(pieces):
+    """Join small text pieces into UTF-8 chunks of about STREAM_BUFFER_SIZE."""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_BUFFER_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _calendar(prodid, calname, rows, write_event, stamp):
+    yield "BEGIN:VCALENDAR\r\n"
+    yield text_line("VERSION", "2.0")
+    yield text_line("PRODID", prodid)
+    yield text_line("CALSCALE", "GREGORIAN")
+    yield text_line("METHOD", "PUBLISH")
+    yield text_line("X-WR-CALNAME", calname)
+    yield text_line("X-WR-TIMEZONE", "UTC")
+    for row in rows:
+        yield "BEGIN:VEVENT\r\n"
+        yield from write_event(row, stamp)
+        yield "END:VEVENT\r\n"
+    yield "END:VCALENDAR\r\n"
+
+
+def _event_head(row, summary, stamp):
+    yield text_line("SUMMARY", summary)
+    yield datetime_line("DTSTART", row["scheduled_start"])
+    yield datetime_line("DTEND", row["scheduled_end"])
+    yield datetime_line("DTSTAMP", stamp)
+    yield text_line("UID", f"lesson-{row['id']}@musicstudio.local")
+
+
+def _feed_rows(now, **filters):
+    return (
+        Lesson.objects.filter(
+            scheduled_start__gte=now - FEED_PAST, scheduled_start__lte=now + FEED_AHEAD, **filters
+        )
+        .exclude(status="cancelled")
+        .values(*LESSON_COLUMNS)
+        .iterator(chunk_size=2000)
+    )
+
+
+def iter_teacher_calendar(teacher, now=None):
+    """Stream a teacher's feed; same bytes as generate_teacher_calendar for the same `now`."""
+    now = now or timezone.now()
+
+    def write_event(row, stamp):
+        name, instrument = _attendee(row)
+        yield from _event_head(row, f"🎵 {name} - {instrument}", stamp)
+        description = [
+            f"Student: {name}",
+            f"Instrument: {instrument}",
+            f"Type: {LESSON_TYPES.get(row['lesson_type'], row['lesson_type'])}",
+        ]
+        if row["summary"]:
+            description.append(f"\\nNotes: {row['summary']}")
+        yield text_line("DESCRIPTION", "\\n".join(description))
+        if row["lesson_type"] == "online":
+            yield text_line("LOCATION", "Online Lesson")
+        else:
+            yield text_line("LOCATION", row["location"] or "Studio")
+        yield text_line(
+            "STATUS", "CONFIRMED" if row["status"] in ("completed", "scheduled") else "TENTATIVE"
+        )
+
+    return _buffered(
+        _calendar(
+            "-//Music Studio Manager//Teacher Calendar//EN",
+            f"{teacher.user.get_full_name()} - Lessons",
+            _feed_rows(now, teacher=teacher),
+            write_event,
+            now,
+        )
+    )
+
+
+def iter_student_calendar(student, now=None):
+    """Stream a student's feed; same bytes as generate_student_calendar for the same `now`."""
+    now = now or timezone.now()
+
+    def write_event(row, stamp):
+        teacher_name = _full_name(row["teacher__user__first_name"], row["teacher__user__last_name"])
+        yield from _event_head(row, f"🎹 {student.instrument} Lesson with {teacher_name}", stamp)
+        description = [
+            f"Teacher: {teacher_name}",
+            f"Instrument: {student.instrument}",
+            f"Type: {LESSON_TYPES.get(row['lesson_type'], row['lesson_type'])}",
+        ]
+        yield text_line("DESCRIPTION", "\\n".join(description))
+        if row["lesson_type"] == "online":
+            yield text_line("LOCATION", "Online Lesson")
+        else:
+            yield text_line("LOCATION", row["location"] or "Studio")
+        yield "BEGIN:VALARM\r\n"
+        yield text_line("ACTION", "DISPLAY")
+        yield text_line("DESCRIPTION", "Lesson starts in 15 minutes")
+        yield "TRIGGER:-PT15M\r\n"
+        yield "END:VALARM\r\n"
+
+    return _buffered(
+        _calendar(
+            "-//Music Studio Manager//Student Calendar//EN",
+            f"{student.user.get_full_name()} - Lessons",
+            _feed_rows(now, student=student),
+            write_event,
+            now,
+        )
+    )
+
+
+def iter_studio_calendar(studio, now=None):
+    """Stream a studio's feed; same bytes as generate_studio_calendar for the same `now`."""
+    now = now or timezone.now()
+
+    def write_event(row, stamp):
+        teacher_name = _full_name(row["teacher__user__first_name"], row["teacher__user__last_name"])
+        name, instrument = _attendee(row)
+        yield from _event_head(row, f"{teacher_name} → {name}", stamp)
+        description = [
+            f"Teacher: {teacher_name}",
+            f"Student: {name}",
+            f"Instrument: {instrument}",
+        ]
+        yield text_line("DESCRIPTION", "\\n".join(description))
+        if row["lesson_type"] == "online":
+            yield text_line("LOCATION", "Online")
+        else:
+            yield text_line("LOCATION", row["location"] or "Studio")
+
+    return _buffered(
+        _calendar(
+            "-//Music Studio Manager//Studio Calendar//EN",
+            f"{studio.name} - All Lessons",
+            _feed_rows(now, teacher__studio=studio),
+            write_event,
+            now,
+        )
+    )
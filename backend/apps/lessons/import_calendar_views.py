@@ -4,19 +4,16 @@ Allows users to subscribe to external iCal feeds and overlay events on their sch
 """
 
 import logging
-from datetime import datetime, timezone
 
 import requests
-
-from django.utils import timezone as dj_timezone
-
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from icalendar import Calendar as ICalendar
-
+from apps.core.bulk_sync import SyncResult, sync_rows
+from apps.core.eager_loading import EagerLoadingMixin
+from apps.core.ical_stream import iter_chunks, read_events
 from apps.lessons.models import ExternalCalendarEvent, ExternalCalendarFeed
 from apps.lessons.serializers import ExternalCalendarEventSerializer, ExternalCalendarFeedSerializer
 
@@ -29,91 +26,56 @@ FETCH_TIMEOUT_SECONDS = 10
 MAX_FEED_SIZE_BYTES = 5 * 1024 * 1024
 
 
-def _fetch_ical(url: str) -> bytes:
-    """
-    Fetch raw ICS bytes from a URL.
-    Raises requests.RequestException on network failure.
-    Raises ValueError if the response is too large or doesn't look like iCal.
-    """
-    headers = {
-        "User-Agent": "StudioSync/1.0 (iCal import)",
-        "Accept": "text/calendar, application/ics, */*",
-    }
-    resp = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT_SECONDS, stream=True)
-    resp.raise_for_status()
+FETCH_HEADERS = {
+    "User-Agent": "StudioSync/1.0 (iCal import)",
+    "Accept": "text/calendar, application/ics, */*",
+}
 
-    content_type = resp.headers.get("Content-Type", "")
-    # Don't be too strict — some servers send wrong content types
-    # (e.g. application/octet-stream) but the body is valid ICS
 
-    data = b""
+def _iter_body(resp):
+    """Yield a streamed response's chunks, giving up once it passes MAX_FEED_SIZE_BYTES."""
+    size = 0
     for chunk in resp.iter_content(chunk_size=8192):
-        data += chunk
-        if len(data) > MAX_FEED_SIZE_BYTES:
+        size += len(chunk)
+        if size > MAX_FEED_SIZE_BYTES:
             raise ValueError(
                 f"Feed exceeds maximum allowed size of {MAX_FEED_SIZE_BYTES // 1024 // 1024} MB"
             )
+        yield chunk
 
-    return data
 
+def _read_body(resp) -> bytes:
+    return b"".join(_iter_body(resp))
 
-def _parse_and_upsert_events(feed: ExternalCalendarFeed, ics_bytes: bytes) -> int:
+
+def _parse_events(ics) -> dict:
     """
-    Parse raw ICS bytes and upsert ExternalCalendarEvent records for the given feed.
-    Returns the number of events created or updated.
+    Parse ICS bytes (or an iterable of byte chunks) into {uid: event fields},
+    one VEVENT at a time, with recurring events expanded (see core/ical_stream.py).
     """
-    cal = ICalendar.from_ical(ics_bytes)
-    count = 0
-
-    for component in cal.walk():
-        if component.name != "VEVENT":
-            continue
-
-        uid = str(component.get("UID", ""))
-        if not uid:
-            continue
-
-        summary = str(component.get("SUMMARY", ""))
-        description = str(component.get("DESCRIPTION", ""))
-        location = str(component.get("LOCATION", ""))
-
-        dtstart = component.get("DTSTART")
-        dtend = component.get("DTEND")
-
-        if dtstart is None:
-            continue
-
-        def to_aware_dt(dt_prop):
-            """Convert a vDatetime/vDate to timezone-aware datetime."""
-            dt = dt_prop.dt if hasattr(dt_prop, "dt") else dt_prop
-            if isinstance(dt, datetime):
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                return dt
-            else:
-                # all-day date — treat as midnight UTC
-                return datetime(dt.year, dt.month, dt.day, tzinfo=timezone.utc)
-
-        start_dt = to_aware_dt(dtstart)
-        end_dt = to_aware_dt(dtend) if dtend else start_dt
-
-        ExternalCalendarEvent.objects.update_or_create(
-            feed=feed,
-            uid=uid,
-            defaults={
-                "title": summary[:500],
-                "description": description,
-                "location": location[:500],
-                "start_dt": start_dt,
-                "end_dt": end_dt,
-            },
-        )
-        count += 1
+    chunks = iter_chunks(ics) if isinstance(ics, bytes) else ics
+    return {
+        uid: {
+            "title": event.summary[:500],
+            "description": event.description,
+            "location": event.location[:500],
+            "start_dt": event.start,
+            "end_dt": event.end,
+        }
+        for uid, event in read_events(chunks).items()
+    }
+
 
-    return count
+def _parse_and_upsert_events(feed: ExternalCalendarFeed, ics) -> SyncResult:
+    """
+    Parse ICS bytes or chunks and mirror them into the feed's ExternalCalendarEvent rows:
+    new UIDs are inserted, changed ones updated and UIDs gone from the feed deleted.
+    Nothing is written unless the whole feed parses.
+    """
+    return sync_rows(ExternalCalendarEvent, {"feed": feed}, _parse_events(ics))
 
 
-class ExternalCalendarFeedViewSet(viewsets.ModelViewSet):
+class ExternalCalendarFeedViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     CRUD for a user's external iCal feed subscriptions.
 
@@ -133,16 +95,13 @@ class ExternalCalendarFeedViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Save the feed and immediately attempt a first sync."""
-        url = serializer.validated_data["url"]
+        from .feed_refresh import EXTERNAL_FEEDS, sync_now
+
         feed = serializer.save(user=self.request.user, last_error="")
 
         # Attempt initial fetch
         try:
-            ics_bytes = _fetch_ical(url)
-            _parse_and_upsert_events(feed, ics_bytes)
-            feed.last_synced_at = dj_timezone.now()
-            feed.last_error = ""
-            feed.save(update_fields=["last_synced_at", "last_error"])
+            sync_now(EXTERNAL_FEEDS, feed)
         except Exception as exc:
             logger.error("Initial sync failed for feed %s: %s", feed.id, exc)
             feed.last_error = str(exc)
@@ -155,19 +114,20 @@ class ExternalCalendarFeedViewSet(viewsets.ModelViewSet):
         Manually trigger a re-sync of a specific feed.
         POST /api/lessons/external-feeds/{id}/refresh/
         """
+        from .feed_refresh import EXTERNAL_FEEDS, sync_now
+
         feed = self.get_object()  # Ensures ownership via get_queryset
 
         try:
-            ics_bytes = _fetch_ical(feed.url)
-            count = _parse_and_upsert_events(feed, ics_bytes)
-            feed.last_synced_at = dj_timezone.now()
-            feed.last_error = ""
-            feed.save(update_fields=["last_synced_at", "last_error"])
+            result = sync_now(EXTERNAL_FEEDS, feed)
 
             return Response(
                 {
                     "status": "ok",
-                    "events_synced": count,
+                    "events_synced": result.total,
+                    "created": result.created,
+                    "updated": result.updated,
+                    "deleted": result.deleted,
                     "last_synced_at": feed.last_synced_at,
                 }
             )
@@ -198,9 +158,9 @@ class ExternalCalendarEventViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        qs = ExternalCalendarEvent.objects.filter(
-            feed__user=self.request.user
-        ).select_related("feed")
+        qs = ExternalCalendarEvent.objects.filter(feed__user=self.request.user).select_related(
+            "feed"
+        )
 
         # Default: only return events from enabled feeds
         enabled_only = self.request.query_params.get("enabled_only", "true").lower()
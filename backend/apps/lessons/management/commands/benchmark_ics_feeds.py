@@ -0,0 +1,71 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.models import Studio
+from apps.lessons import calendar_utils, ics
+
+
+def _measure(render):
+    tracemalloc.start()
+    started = time.perf_counter()
+    body = render()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return body, elapsed, peak
+
+
+def _first_chunk_time(chunks):
+    started = time.perf_counter()
+    next(iter(chunks), b"")
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Compare the icalendar-built studio feed with the streaming ICS writer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--studio", help="Studio id (default: the first studio)")
+        parser.add_argument(
+            "--rounds", type=int, default=3, help="Runs per writer, best is reported (default: 3)"
+        )
+
+    def handle(self, *args, **options):
+        studios = Studio.objects.all()
+        if options["studio"]:
+            studios = studios.filter(pk=options["studio"])
+        studio = studios.first()
+        if not studio:
+            raise CommandError("No studio found. Run seed_data / seed_calendar_chaos first.")
+
+        # DTSTAMP and the date window are "now", so both writers share one clock reading
+        now = timezone.now()
+
+        def tree():
+            return calendar_utils.generate_studio_calendar(studio, now)
+
+        def stream():
+            # Count bytes without holding the body, as a streamed response does
+            return sum(len(chunk) for chunk in ics.iter_studio_calendar(studio, now))
+
+        expected = tree()
+        if b"".join(ics.iter_studio_calendar(studio, now)) != expected:
+            raise CommandError("Streaming writer output differs from calendar_utils")
+
+        events = expected.count(b"BEGIN:VEVENT")
+        self.stdout.write(f"📅 {studio.name}: {events} events, {len(expected)} bytes")
+
+        for label, render in (("icalendar tree", tree), ("streaming writer", stream)):
+            runs = [_measure(render) for _ in range(options["rounds"])]
+            elapsed = min(run[1] for run in runs)
+            peak = min(run[2] for run in runs)
+            self.stdout.write(
+                f"  {label:<17} {elapsed * 1000:8.1f} ms   peak {peak / 1024:9.1f} KiB"
+            )
+
+        first_chunk = _first_chunk_time(ics.iter_studio_calendar(studio, now))
+        self.stdout.write(f"  first chunk after {first_chunk * 1000:.1f} ms")
+        self.stdout.write(self.style.SUCCESS("✅ Outputs are byte-identical"))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0021_reportjob"),
+        ("inventory", "0003_add_studio_fk"),
+        ("lessons", "0008_external_calendar_models"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="lesson",
+            name="lessons_schedul_2a33e1_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="lesson",
+            name="lessons_teacher_6c03b5_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="lesson",
+            name="lessons_student_5c727d_idx",
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(fields=["scheduled_start", "id"], name="lessons_schedul_d0034b_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["teacher", "scheduled_start", "id"], name="lessons_teacher_71ea1c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["student", "scheduled_start", "id"], name="lessons_student_83429f_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lessons", "0009_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recurringpattern",
+            name="generated_until",
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
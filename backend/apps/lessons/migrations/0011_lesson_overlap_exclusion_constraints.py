@@ -0,0 +1,91 @@
+"""
+Exclusion constraints that stop a teacher or room being double-booked.
+
+PostgreSQL only, and only where the btree_gist extension is available; other
+databases rely on the in-transaction check in apps/core/booking.py.
+
+Existing rows that would violate the constraints (overlapping non-cancelled
+lessons, or lessons ending before they start, which tstzrange() rejects) are
+not changed: the migration stops and lists their ids, so they can be
+cancelled or rescheduled before running migrate again.
+"""
+
+from django.db import migrations
+
+# Column each constraint keeps unique over time
+OVERLAP_COLUMNS = {
+    "lessons_no_teacher_overlap": "teacher_id",
+    "lessons_no_room_overlap": "room_id",
+}
+
+CONSTRAINTS = {
+    "lessons_no_teacher_overlap": (
+        "EXCLUDE USING gist (teacher_id WITH =, "
+        "tstzrange(scheduled_start, scheduled_end, '[)') WITH &&) "
+        "WHERE (status <> 'cancelled')"
+    ),
+    "lessons_no_room_overlap": (
+        "EXCLUDE USING gist (room_id WITH =, "
+        "tstzrange(scheduled_start, scheduled_end, '[)') WITH &&) "
+        "WHERE (room_id IS NOT NULL AND status <> 'cancelled')"
+    ),
+}
+
+
+def find_conflicts(cursor):
+    """Describe the existing lessons that would stop the constraints being added."""
+    cursor.execute(
+        "SELECT id FROM lessons "
+        "WHERE scheduled_end < scheduled_start AND status <> 'cancelled' ORDER BY id"
+    )
+    conflicts = [f"lesson {row[0]} ends before it starts" for row in cursor.fetchall()]
+    if conflicts:
+        # The overlap check below would hit the same tstzrange() error
+        return conflicts
+    for name, column in OVERLAP_COLUMNS.items():
+        cursor.execute(
+            f"SELECT a.id, b.id FROM lessons a JOIN lessons b "
+            f"ON a.{column} = b.{column} AND a.id < b.id "
+            f"AND tstzrange(a.scheduled_start, a.scheduled_end, '[)') "
+            f"&& tstzrange(b.scheduled_start, b.scheduled_end, '[)') "
+            f"WHERE a.status <> 'cancelled' AND b.status <> 'cancelled' ORDER BY a.id, b.id"
+        )
+        conflicts += [f"lessons {a} and {b} overlap ({name})" for a, b in cursor.fetchall()]
+    return conflicts
+
+
+def add_constraints(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gist'")
+        if cursor.fetchone() is None:
+            return
+        conflicts = find_conflicts(cursor)
+        if conflicts:
+            raise RuntimeError(
+                "Cannot add the lesson double-booking constraints; cancel or reschedule "
+                "these lessons and run migrate again:\n  " + "\n  ".join(conflicts)
+            )
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        for name, definition in CONSTRAINTS.items():
+            cursor.execute(f"ALTER TABLE lessons ADD CONSTRAINT {name} {definition}")
+
+
+def remove_constraints(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name in CONSTRAINTS:
+            cursor.execute(f"ALTER TABLE lessons DROP CONSTRAINT IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lessons", "0010_recurringpattern_generated_until"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_constraints, remove_constraints),
+    ]
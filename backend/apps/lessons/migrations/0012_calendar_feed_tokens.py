@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:20
+
+import apps.lessons.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lessons", "0011_lesson_overlap_exclusion_constraints"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CalendarFeedToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "token",
+                    models.CharField(
+                        default=apps.lessons.models._new_feed_token, max_length=64, unique=True
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("teacher", "Teacher"),
+                            ("student", "Student"),
+                            ("studio", "Studio"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("object_id", models.UUIDField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="calendar_feed_tokens",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "calendar_feed_tokens",
+                "unique_together": {("user", "scope", "object_id")},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lessons", "0012_calendar_feed_tokens"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="externalcalendarevent",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
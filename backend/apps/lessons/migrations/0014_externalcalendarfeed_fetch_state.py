@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lessons", "0013_externalcalendarevent_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="externalcalendarfeed",
+            name="content_hash",
+            field=models.CharField(
+                blank=True, help_text="sha256 of the last body parsed", max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="externalcalendarfeed",
+            name="etag",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="externalcalendarfeed",
+            name="failure_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="externalcalendarfeed",
+            name="http_last_modified",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="externalcalendarfeed",
+            name="last_attempted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
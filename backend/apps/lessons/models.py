@@ -2,6 +2,7 @@
 Lesson models - Lesson, LessonNote, RecurringPattern
 """
 
+import secrets
 import uuid
 
 from django.db import models
@@ -48,6 +49,9 @@ class RecurringPattern(models.Model):
     start_date = models.DateField()
     end_date = models.DateField(null=True, blank=True)  # Null means ongoing
 
+    # Lessons exist up to and including this date (see apps/lessons/recurrence.py)
+    generated_until = models.DateField(null=True, blank=True)
+
     # Flags
     is_active = models.BooleanField(default=True)
 
@@ -157,9 +161,10 @@ class Lesson(models.Model):
         db_table = "lessons"
         ordering = ["-scheduled_start"]
         indexes = [
-            models.Index(fields=["scheduled_start"]),
-            models.Index(fields=["teacher", "scheduled_start"]),
-            models.Index(fields=["student", "scheduled_start"]),
+            # (…, scheduled_start, id) back keyset pagination of the lesson list
+            models.Index(fields=["scheduled_start", "id"]),
+            models.Index(fields=["teacher", "scheduled_start", "id"]),
+            models.Index(fields=["student", "scheduled_start", "id"]),
             models.Index(fields=["status"]),
         ]
 
@@ -336,6 +341,15 @@ class ExternalCalendarFeed(models.Model):
         blank=True, help_text="Last fetch error message, if any"
     )
 
+    # Conditional-fetch and retry state for the scheduled refresh (see feed_refresh.py)
+    etag = models.CharField(max_length=255, blank=True)
+    http_last_modified = models.CharField(max_length=64, blank=True)
+    content_hash = models.CharField(
+        max_length=64, blank=True, help_text="sha256 of the last body parsed"
+    )
+    failure_count = models.PositiveIntegerField(default=0)
+    last_attempted_at = models.DateTimeField(null=True, blank=True)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -371,6 +385,9 @@ class ExternalCalendarEvent(models.Model):
     start_dt = models.DateTimeField()
     end_dt = models.DateTimeField()
 
+    # sha256 of the event fields, so a re-sync only rewrites changed events
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -386,3 +403,38 @@ class ExternalCalendarEvent(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.start_dt:%Y-%m-%d %H:%M})"
+
+
+def _new_feed_token():
+    return secrets.token_urlsafe(32)
+
+
+class CalendarFeedToken(models.Model):
+    """
+    Secret subscription URL for one exported ICS feed.
+
+    Calendar apps can't send a JWT, so a feed is shared as
+    /api/lessons/calendar/feed/<token>.ics instead. Rotating the token
+    (delete and recreate) revokes every existing subscription.
+    """
+
+    SCOPE_CHOICES = [
+        ("teacher", "Teacher"),
+        ("student", "Student"),
+        ("studio", "Studio"),
+    ]
+
+    token = models.CharField(max_length=64, unique=True, default=_new_feed_token)
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    object_id = models.UUIDField()
+    user = models.ForeignKey(
+        "core.User", on_delete=models.CASCADE, related_name="calendar_feed_tokens"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "calendar_feed_tokens"
+        unique_together = [("user", "scope", "object_id")]
+
+    def __str__(self):
+        return f"{self.scope} feed {self.object_id} for {self.user}"
@@ -0,0 +1,233 @@
+"""
+Materialise RecurringPattern rows into Lesson rows.
+
+A pattern is expanded over a rolling horizon rather than all at once, so an
+open-ended weekly slot doesn't create years of lessons up front:
+
+    expand_pattern(pattern)                 # up to today + DEFAULT_HORIZON
+    expand_pattern(pattern, until=term_end) # up to an explicit date
+
+Each call picks up after `pattern.generated_until`, so running it again (the
+daily `extend_recurring_lessons` task does) only adds the newly uncovered
+dates. Conflicts are checked for the whole batch with one range query, the
+free slots are inserted with a single bulk_create, and teacher and student get
+one summary notification per batch instead of one per lesson, queued in the
+notification outbox in the same transaction.
+"""
+
+import bisect
+import logging
+import zoneinfo
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.analytics import schedule_analytics_invalidation
+from apps.core.models import Teacher
+from apps.core.rollups import schedule_rollup_refresh
+
+from .feeds import invalidate_lesson_feeds
+from .models import Lesson, RecurringPattern
+
+logger = logging.getLogger(__name__)
+
+# How far ahead lessons are kept materialised for open-ended patterns
+DEFAULT_HORIZON = timedelta(weeks=12)
+
+# Hard cap on an explicit ?until=, so one request can't create unbounded rows
+MAX_HORIZON = timedelta(days=366)
+
+FREQUENCY_STEPS = {
+    "weekly": timedelta(weeks=1),
+    "biweekly": timedelta(weeks=2),
+}
+
+
+@dataclass
+class ExpansionResult:
+    created: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)  # (start, end) slots that clashed
+    generated_until: date | None = None
+
+
+def _first_on_or_after(day, weekday):
+    return day + timedelta(days=(weekday - day.weekday()) % 7)
+
+
+def _nth_weekday(year, month, weekday, n):
+    first = _first_on_or_after(date(year, month, 1), weekday)
+    return first + timedelta(weeks=n - 1)
+
+
+def occurrence_dates(pattern, start, end):
+    """
+    Dates on which `pattern` falls within [start, end].
+
+    Weekly and bi-weekly patterns step from the first matching weekday on or
+    after pattern.start_date, so a bi-weekly series keeps its parity however
+    the range is sliced. Monthly patterns fall on the same nth weekday each
+    month as the first occurrence (a 5th-weekday start is treated as the 4th,
+    which every month has).
+    """
+    first = _first_on_or_after(pattern.start_date, pattern.day_of_week)
+    if pattern.end_date:
+        end = min(end, pattern.end_date)
+    start = max(start, first)
+    if start > end:
+        return []
+
+    if pattern.frequency == "monthly":
+        n = min((first.day - 1) // 7 + 1, 4)
+        dates = []
+        year, month = start.year, start.month
+        while True:
+            day = _nth_weekday(year, month, pattern.day_of_week, n)
+            if day > end:
+                break
+            if day >= start:
+                dates.append(day)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return dates
+
+    step = FREQUENCY_STEPS[pattern.frequency]
+    periods = -(-(start - first).days // step.days)  # ceil division
+    day = first + step * periods
+    dates = []
+    while day <= end:
+        dates.append(day)
+        day += step
+    return dates
+
+
+def _pattern_tz(pattern):
+    try:
+        return zoneinfo.ZoneInfo(pattern.teacher.studio.timezone)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return timezone.get_current_timezone()
+
+
+def occurrence_slots(pattern, start, end):
+    """(scheduled_start, scheduled_end) pairs, in the studio's local time."""
+    tz = _pattern_tz(pattern)
+    length = timedelta(minutes=pattern.duration_minutes)
+    slots = []
+    for day in occurrence_dates(pattern, start, end):
+        begins = datetime.combine(day, pattern.time, tzinfo=tz)
+        slots.append((begins, begins + length))
+    return slots
+
+
+def find_conflicts(pattern, slots):
+    """
+    Return the subset of `slots` that overlap an existing lesson for the
+    pattern's teacher or student.
+
+    One query fetches every live lesson in the batch's overall span; each slot
+    is then checked with a binary search over start times plus a running
+    maximum of end times, so the cost stays O((n + m) log m).
+    """
+    if not slots:
+        return set()
+
+    span_start = min(s for s, _ in slots)
+    span_end = max(e for _, e in slots)
+    busy = sorted(
+        Lesson.objects.filter(
+            Q(teacher=pattern.teacher) | Q(student=pattern.student),
+            scheduled_start__lt=span_end,
+            scheduled_end__gt=span_start,
+        )
+        .exclude(status="cancelled")
+        .values_list("scheduled_start", "scheduled_end")
+    )
+
+    starts = [s for s, _ in busy]
+    latest_end = []
+    for _, busy_end in busy:
+        latest_end.append(max(busy_end, latest_end[-1]) if latest_end else busy_end)
+
+    conflicts = set()
+    for slot_start, slot_end in slots:
+        # Lessons starting before this slot ends; any still running is a clash
+        i = bisect.bisect_left(starts, slot_end)
+        if i and latest_end[i - 1] > slot_start:
+            conflicts.add((slot_start, slot_end))
+    return conflicts
+
+
+def expand_pattern(pattern, until=None, notify=True):
+    """
+    Create the lessons for `pattern` from where it last stopped up to `until`
+    (default: today + DEFAULT_HORIZON), skipping slots that clash.
+    """
+    result = ExpansionResult(generated_until=pattern.generated_until)
+    if not pattern.is_active:
+        return result
+
+    today = timezone.localdate()
+    until = min(until or today + DEFAULT_HORIZON, today + MAX_HORIZON)
+    start = pattern.start_date
+    if pattern.generated_until:
+        start = max(start, pattern.generated_until + timedelta(days=1))
+    if pattern.end_date:
+        until = min(until, pattern.end_date)
+    if start > until:
+        return result
+
+    studio = pattern.teacher.studio
+    with transaction.atomic():
+        # Serialise concurrent expansions (API call vs. the daily task)
+        locked = RecurringPattern.objects.select_for_update().get(pk=pattern.pk)
+        if locked.generated_until and locked.generated_until >= until:
+            result.generated_until = locked.generated_until
+            return result
+        if locked.generated_until:
+            start = max(start, locked.generated_until + timedelta(days=1))
+
+        # Hold the teacher's booking lock so the batch check can't race a
+        # single booking (see apps/core/booking.py)
+        list(Teacher.objects.select_for_update().filter(pk=pattern.teacher_id).values_list("pk"))
+
+        slots = occurrence_slots(pattern, start, until)
+        conflicts = find_conflicts(pattern, slots)
+        result.skipped = sorted(conflicts)
+        result.created = Lesson.objects.bulk_create(
+            Lesson(
+                studio=studio,
+                teacher=pattern.teacher,
+                student=pattern.student,
+                recurring_pattern=pattern,
+                scheduled_start=slot_start,
+                scheduled_end=slot_end,
+                rate=pattern.teacher.hourly_rate,
+            )
+            for slot_start, slot_end in slots
+            if (slot_start, slot_end) not in conflicts
+        )
+        RecurringPattern.objects.filter(pk=pattern.pk).update(
+            generated_until=until, updated_at=timezone.now()
+        )
+        pattern.generated_until = result.generated_until = until
+
+        if result.created:
+            # bulk_create skips post_save, so do what the Lesson receivers would
+            schedule_rollup_refresh(studio.id)
+            schedule_analytics_invalidation(studio.id)
+            invalidate_lesson_feeds(
+                teacher_id=pattern.teacher_id,
+                student_id=pattern.student_id,
+                studio_id=studio.id,
+            )
+            if notify:
+                from apps.notifications.outbox import record_lessons_scheduled
+
+                record_lessons_scheduled(pattern, result.created)
+
+    logger.info(
+        f"Expanded recurring pattern {pattern.id}: "
+        f"{len(result.created)} created, {len(result.skipped)} skipped"
+    )
+    return result
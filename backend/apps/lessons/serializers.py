@@ -4,6 +4,7 @@ Lesson API serializers
 
 from rest_framework import serializers
 
+from apps.core.eager_loading import AnnotatedCountField
 from apps.lessons.models import Lesson, LessonNote, LessonPlan, RecurringPattern, StudentGoal
 
 
@@ -52,6 +53,7 @@ class LessonListSerializer(serializers.ModelSerializer):
             "lesson_plan",
             "lesson_plan_title",
         ]
+        eager_load = {"student_profile_id": ["student"]}
 
 
 class LessonDetailSerializer(serializers.ModelSerializer):
@@ -66,6 +68,12 @@ class LessonDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lesson
         fields = "__all__"
+        eager_load = {
+            "student": ["student__user"],
+            "teacher": ["teacher__user"],
+            "band": ["band"],
+            "room": ["room"],
+        }
 
     def get_student(self, obj):
         if not obj.student:
@@ -123,11 +131,20 @@ class LessonCreateSerializer(serializers.ModelSerializer):
         ]
 
     def validate(self, data):
-        """Ensure either student, band, or room is provided"""
-        if not data.get("student") and not data.get("band") and not data.get("room"):
+        """Ensure either student, band, or room is provided, and the times are ordered"""
+        if not self.partial and (
+            not data.get("student") and not data.get("band") and not data.get("room")
+        ):
             raise serializers.ValidationError(
                 "Either a student, band, or room must be selected for the lesson."
             )
+
+        start = data.get("scheduled_start", getattr(self.instance, "scheduled_start", None))
+        end = data.get("scheduled_end", getattr(self.instance, "scheduled_end", None))
+        if start and end and end <= start:
+            raise serializers.ValidationError(
+                {"scheduled_end": "End time must be after start time"}
+            )
         return data
 
 
@@ -261,11 +278,12 @@ class RecurringPatternSerializer(serializers.ModelSerializer):
             "duration_minutes",
             "start_date",
             "end_date",
+            "generated_until",
             "is_active",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["created_at", "updated_at"]
+        read_only_fields = ["generated_until", "created_at", "updated_at"]
 
     def validate(self, data):
         """Validate that end_date is after start_date"""
@@ -280,10 +298,7 @@ class ExternalCalendarFeedSerializer(serializers.ModelSerializer):
 
     # Use CharField so we can normalise webcal:// before URL validation
     url = serializers.CharField(max_length=2000)
-    event_count = serializers.SerializerMethodField()
-
-    def get_event_count(self, obj):
-        return obj.events.count()
+    event_count = AnnotatedCountField("events")
 
     class Meta:
         from apps.lessons.models import ExternalCalendarFeed
@@ -0,0 +1,154 @@
+"""
+Open booking slots for a teacher.
+
+find_open_slots() turns the teacher's weekly availability into concrete
+intervals for a date range, subtracts everything that makes them busy, and
+cuts what's left into bookable slots:
+
+    availability windows  - Teacher.availability, in the studio's timezone
+    minus busy intervals  - the teacher's lessons (padded by
+                            booking_buffer_minutes), their enabled external
+                            calendar events, and optionally a room's lessons
+                            and reservations
+
+Busy intervals come from three range queries whatever the calendar density;
+both lists are sorted and merged, and the subtraction is one linear sweep.
+"""
+
+import zoneinfo
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.availability import merge_ranges, parse_weekly_availability
+from apps.inventory.models import RoomReservation
+
+from .models import ExternalCalendarEvent, Lesson
+
+DEFAULT_SLOT_STEP = timedelta(minutes=15)
+
+
+def _studio_tz(teacher):
+    try:
+        return zoneinfo.ZoneInfo(teacher.studio.timezone)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return timezone.get_current_timezone()
+
+
+def availability_windows(teacher, start, end):
+    """Sorted (start, end) datetimes the teacher is available within [start, end)."""
+    weekly = parse_weekly_availability(teacher.availability)
+    if not weekly:
+        return []
+
+    tz = _studio_tz(teacher)
+    windows = []
+    day = start.astimezone(tz).date()
+    last_day = end.astimezone(tz).date()
+    while day <= last_day:
+        midnight = datetime.combine(day, datetime.min.time(), tzinfo=tz)
+        for start_minute, end_minute in weekly.get(day.weekday(), []):
+            window_start = max(midnight + timedelta(minutes=start_minute), start)
+            window_end = min(midnight + timedelta(minutes=end_minute), end)
+            if window_start < window_end:
+                windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return merge_ranges(windows)
+
+
+def busy_intervals(teacher, start, end, room=None):
+    """Merged, sorted (start, end) intervals that block bookings in [start, end)."""
+    buffer = timedelta(minutes=max(teacher.booking_buffer_minutes or 0, 0))
+    busy = []
+
+    # Widen the read by the buffer so a lesson just outside the range still pads into it
+    owner = Q(teacher=teacher)
+    if room is not None:
+        owner |= Q(room=room)
+    lessons = (
+        Lesson.objects.filter(
+            owner, scheduled_start__lt=end + buffer, scheduled_end__gt=start - buffer
+        )
+        .exclude(status="cancelled")
+        .values_list("scheduled_start", "scheduled_end", "teacher_id")
+    )
+    for lesson_start, lesson_end, teacher_id in lessons:
+        pad = buffer if teacher_id == teacher.pk else timedelta(0)
+        busy.append((lesson_start - pad, lesson_end + pad))
+
+    busy.extend(
+        ExternalCalendarEvent.objects.filter(
+            feed__user_id=teacher.user_id,
+            feed__is_enabled=True,
+            start_dt__lt=end,
+            end_dt__gt=start,
+        ).values_list("start_dt", "end_dt")
+    )
+
+    if room is not None:
+        busy.extend(
+            RoomReservation.objects.filter(
+                room=room,
+                status__in=["pending", "confirmed"],
+                start_time__lt=end,
+                end_time__gt=start,
+            ).values_list("start_time", "end_time")
+        )
+
+    return merge_ranges(busy)
+
+
+def subtract_intervals(windows, busy):
+    """
+    Parts of `windows` not covered by `busy`. Both must be sorted and
+    non-overlapping; a single pass walks them together.
+    """
+    free = []
+    i = 0
+    for window_start, window_end in windows:
+        cursor = window_start
+        # Skip busy intervals that finished before this window
+        while i < len(busy) and busy[i][1] <= cursor:
+            i += 1
+        j = i
+        while j < len(busy) and busy[j][0] < window_end:
+            if busy[j][0] > cursor:
+                free.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if cursor < window_end:
+            free.append((cursor, window_end))
+    return free
+
+
+def _align(moment, step):
+    """Round `moment` up to the next multiple of `step` past the hour."""
+    seconds = step.total_seconds()
+    offset = (moment.minute * 60 + moment.second + moment.microsecond / 1e6) % seconds
+    if not offset:
+        return moment
+    return moment + timedelta(seconds=seconds - offset)
+
+
+def find_open_slots(teacher, start, end, duration, step=DEFAULT_SLOT_STEP, room=None):
+    """
+    Bookable (start, end) slots of `duration` for `teacher` in [start, end),
+    starting on `step` boundaries. Slots in the past are never offered.
+    """
+    start = max(start, timezone.now())
+    if start >= end:
+        return []
+
+    free = subtract_intervals(
+        availability_windows(teacher, start, end), busy_intervals(teacher, start, end, room)
+    )
+
+    tz = _studio_tz(teacher)
+    slots = []
+    for free_start, free_end in free:
+        slot_start = _align(free_start.astimezone(tz), step)
+        while slot_start + duration <= free_end:
+            slots.append((slot_start, slot_start + duration))
+            slot_start += step
+    return slots
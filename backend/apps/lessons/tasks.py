@@ -0,0 +1,49 @@
+import logging
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .feed_refresh import refresh_feeds
+from .models import RecurringPattern
+from .recurrence import DEFAULT_HORIZON, expand_pattern
+
+logger = logging.getLogger(__name__)
+
+
+def extend_recurring_lessons():
+    """
+    Daily task: roll every active recurring pattern's horizon forward so
+    there are always DEFAULT_HORIZON worth of lessons on the calendar.
+    Only patterns that have fallen behind are touched, and each one only
+    creates the days it hasn't covered yet.
+    """
+    horizon = timezone.localdate() + DEFAULT_HORIZON
+    patterns = (
+        RecurringPattern.objects.filter(is_active=True)
+        .filter(Q(generated_until__isnull=True) | Q(generated_until__lt=horizon))
+        .filter(
+            Q(end_date__isnull=True)
+            | Q(generated_until__isnull=True)
+            | Q(end_date__gt=F("generated_until"))
+        )
+        .select_related("teacher__studio", "teacher__user", "student__user")
+    )
+
+    created = 0
+    for pattern in patterns:
+        try:
+            created += len(expand_pattern(pattern, until=horizon).created)
+        except Exception as e:
+            logger.error(f"Failed to extend recurring pattern {pattern.id}: {e}")
+
+    logger.info(f"Extended recurring patterns: {created} lessons created")
+    return f"Created {created} recurring lessons"
+
+
+def refresh_calendar_feeds():
+    """
+    Scheduled task: re-fetch every due external iCal feed (user overlays and
+    band calendars) with conditional requests; see feed_refresh.py.
+    """
+    totals = refresh_feeds()
+    return ", ".join(f"{count} {outcome}" for outcome, count in totals.items())
@@ -9,6 +9,7 @@ from . import calendar_views, import_calendar_views, views
 router = OptionalSlashRouter()
 router.register(r"plans", views.LessonPlanViewSet, basename="lesson-plan")
 router.register(r"goals", views.StudentGoalViewSet, basename="goal")
+router.register(r"recurring-patterns", views.RecurringPatternViewSet, basename="recurring-pattern")
 router.register(r"", views.LessonViewSet, basename="lesson")
 
 # External calendar import — registered on their own router with explicit prefix
@@ -55,6 +56,17 @@ urlpatterns = [
         name="studio-calendar-feed",
     ),
     path("calendar/my/lessons.ics", calendar_views.my_calendar_feed, name="my-calendar-feed"),
+    # Token-authenticated subscription URLs for calendar apps
+    path(
+        "calendar/subscription/",
+        calendar_views.calendar_subscription,
+        name="calendar-subscription",
+    ),
+    path(
+        "calendar/feed/<str:token>.ics",
+        calendar_views.subscribed_calendar_feed,
+        name="calendar-subscription-feed",
+    ),
 ]
 
 
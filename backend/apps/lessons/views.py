@@ -2,28 +2,125 @@
 Lesson API views
 """
 
-from datetime import timedelta
+import uuid
+from datetime import datetime, timedelta
 
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
-from rest_framework import filters, serializers, viewsets
+from rest_framework import filters, serializers, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, ParseError, PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from apps.lessons.models import Lesson, LessonPlan, StudentGoal
+from apps.core.booking import LESSON_RULES, save_booking
+from apps.core.eager_loading import EagerLoadingMixin
+from apps.core.models import Teacher
+from apps.inventory.models import PracticeRoom
+from apps.lessons.models import Lesson, LessonPlan, RecurringPattern, StudentGoal
+from apps.lessons.recurrence import MAX_HORIZON, expand_pattern
 from apps.lessons.serializers import (
     LessonCreateSerializer,
     LessonDetailSerializer,
     LessonListSerializer,
     LessonPlanSerializer,
+    RecurringPatternSerializer,
     StudentGoalSerializer,
 )
+from apps.lessons.slots import find_open_slots
 
+# Widest range the calendar endpoint serves (a six-week month grid)
+MAX_CALENDAR_WINDOW = timedelta(days=42)
 
-class LessonViewSet(viewsets.ModelViewSet):
+# Bounds for the slot finder's ?duration= and ?step=
+MIN_SLOT_MINUTES = 5
+MAX_SLOT_MINUTES = 8 * 60
+
+
+def _parse_calendar_bound(value):
+    """Parse an ISO date or datetime query value into an aware datetime, or None."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        parsed = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _slot_params(params):
+    """
+    (start, end, duration, step) for the slot finder from its query params;
+    raises ParseError for a missing or oversized range or bad minute counts.
+    """
+    start = _parse_calendar_bound(params.get("start"))
+    end = _parse_calendar_bound(params.get("end"))
+    if not start or not end or end <= start:
+        raise ParseError("start and end are required, with end after start")
+    if end - start > MAX_CALENDAR_WINDOW:
+        raise ParseError(f"Range may span at most {MAX_CALENDAR_WINDOW.days} days")
+
+    try:
+        duration = int(params.get("duration", 60))
+        step = int(params.get("step", 15))
+    except ValueError:
+        duration = step = 0
+    if not (MIN_SLOT_MINUTES <= duration <= MAX_SLOT_MINUTES) or not (
+        MIN_SLOT_MINUTES <= step <= MAX_SLOT_MINUTES
+    ):
+        raise ParseError(
+            f"duration and step must be between {MIN_SLOT_MINUTES} "
+            f"and {MAX_SLOT_MINUTES} minutes"
+        )
+    return start, end, duration, step
+
+
+def _slot_teacher(user, teacher_id):
+    """
+    The active teacher in `user`'s studio whose slots are wanted (the user's
+    own teacher profile if `teacher_id` is empty); raises NotFound otherwise.
+    """
+    teachers = Teacher.objects.select_related("studio").filter(is_active=True)
+    if user.role == "admin":
+        teachers = teachers.filter(studio__owner=user)
+    elif hasattr(user, "teacher_profile"):
+        teachers = teachers.filter(studio=user.teacher_profile.studio)
+    elif hasattr(user, "student_profile"):
+        teachers = teachers.filter(studio=user.student_profile.studio)
+    else:
+        teachers = teachers.none()
+
+    if not teacher_id and hasattr(user, "teacher_profile"):
+        teacher_id = user.teacher_profile.pk
+    try:
+        teacher = teachers.filter(pk=uuid.UUID(str(teacher_id))).first() if teacher_id else None
+    except ValueError:
+        teacher = None
+    if teacher is None:
+        raise NotFound("Teacher not found")
+    return teacher
+
+
+def _slot_room(teacher, room_id):
+    """The room in `teacher`'s studio named by ?room=, None without one, else NotFound."""
+    if not room_id:
+        return None
+    try:
+        room = PracticeRoom.objects.filter(pk=int(room_id), studio=teacher.studio).first()
+    except ValueError:
+        room = None
+    if room is None:
+        raise NotFound("Room not found")
+    return room
+
+
+class LessonViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     API endpoints for lessons
     """
@@ -37,6 +134,8 @@ class LessonViewSet(viewsets.ModelViewSet):
     ]
     ordering_fields = ["scheduled_start", "created_at"]
     ordering = ["scheduled_start"]
+    # Keyset order for ?pagination=cursor (see config/pagination.py)
+    cursor_ordering = ("scheduled_start", "id")
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -97,6 +196,141 @@ class LessonViewSet(viewsets.ModelViewSet):
             return None
         return super().paginate_queryset(queryset)
 
+    @action(detail=False, methods=["get"])
+    def calendar(self, request):
+        """
+        Compact lessons for the schedule UI.
+
+        ?start= and ?end= (ISO date or datetime) bound the range, at most
+        MAX_CALENDAR_WINDOW apart. Names are sent once in lookup tables keyed
+        by id, and events refer to them by id.
+        """
+        start = _parse_calendar_bound(request.query_params.get("start"))
+        end = _parse_calendar_bound(request.query_params.get("end"))
+        if not start or not end:
+            return Response(
+                {"detail": "start and end are required ISO dates or datetimes"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if end <= start:
+            return Response(
+                {"detail": "end must be after start"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if end - start > MAX_CALENDAR_WINDOW:
+            return Response(
+                {"detail": f"Range may span at most {MAX_CALENDAR_WINDOW.days} days"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = (
+            self.get_queryset()
+            .filter(scheduled_start__lt=end, scheduled_end__gt=start)
+            .order_by("scheduled_start", "id")
+            .values(
+                "id",
+                "scheduled_start",
+                "scheduled_end",
+                "status",
+                "lesson_type",
+                "is_online",
+                "location",
+                "teacher_id",
+                "teacher__user__first_name",
+                "teacher__user__last_name",
+                "student_id",
+                "student__user__first_name",
+                "student__user__last_name",
+                "student__instrument",
+                "band_id",
+                "band__name",
+                "room_id",
+                "room__name",
+            )
+        )
+
+        teachers, students, bands, rooms = {}, {}, {}, {}
+        events = []
+        for row in rows:
+            teacher_id = str(row["teacher_id"])
+            if teacher_id not in teachers:
+                teachers[teacher_id] = (
+                    f"{row['teacher__user__first_name']} {row['teacher__user__last_name']}"
+                ).strip()
+
+            student_id = str(row["student_id"]) if row["student_id"] else None
+            if student_id and student_id not in students:
+                students[student_id] = {
+                    "name": (
+                        f"{row['student__user__first_name']} {row['student__user__last_name']}"
+                    ).strip(),
+                    "instrument": row["student__instrument"],
+                }
+
+            band_id = str(row["band_id"]) if row["band_id"] else None
+            if band_id and band_id not in bands:
+                bands[band_id] = row["band__name"]
+
+            room_id = str(row["room_id"]) if row["room_id"] else None
+            if room_id and room_id not in rooms:
+                rooms[room_id] = row["room__name"]
+
+            events.append(
+                {
+                    "id": str(row["id"]),
+                    "start": row["scheduled_start"],
+                    "end": row["scheduled_end"],
+                    "status": row["status"],
+                    "type": row["lesson_type"],
+                    "online": row["is_online"],
+                    "location": row["location"],
+                    "teacher": teacher_id,
+                    "student": student_id,
+                    "band": band_id,
+                    "room": room_id,
+                }
+            )
+
+        return Response(
+            {
+                "start": start,
+                "end": end,
+                "teachers": teachers,
+                "students": students,
+                "bands": bands,
+                "rooms": rooms,
+                "events": events,
+            }
+        )
+
+    @action(detail=False, methods=["get"])
+    def slots(self, request):
+        """
+        Open booking slots for a teacher.
+
+        ?teacher= (defaults to the requesting teacher), ?start= and ?end= as
+        for the calendar, ?duration= and ?step= in minutes (default 60/15) and
+        an optional ?room= whose bookings should also be avoided.
+        """
+        start, end, duration, step = _slot_params(request.query_params)
+        teacher = _slot_teacher(request.user, request.query_params.get("teacher"))
+        room = _slot_room(teacher, request.query_params.get("room"))
+
+        open_slots = find_open_slots(
+            teacher,
+            start,
+            end,
+            timedelta(minutes=duration),
+            step=timedelta(minutes=step),
+            room=room,
+        )
+        return Response(
+            {
+                "teacher": str(teacher.pk),
+                "duration_minutes": duration,
+                "slots": [{"start": s, "end": e} for s, e in open_slots],
+            }
+        )
+
     @action(detail=False, methods=["get"])
     def upcoming(self, request):
         """Get upcoming lessons"""
@@ -144,10 +378,17 @@ class LessonViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         user = self.request.user
         if hasattr(user, "teacher_profile"):
-            serializer.save(teacher=user.teacher_profile, studio=user.teacher_profile.studio)
+            save_booking(
+                serializer,
+                LESSON_RULES,
+                teacher=user.teacher_profile,
+                studio=user.teacher_profile.studio,
+            )
         elif hasattr(user, "student_profile"):
             # allow student to book, forcing themselves as the student
-            serializer.save(
+            save_booking(
+                serializer,
+                LESSON_RULES,
                 student=user.student_profile,
                 studio=user.student_profile.studio,
                 # If teacher is not in payload, validation would have failed if required.
@@ -160,10 +401,14 @@ class LessonViewSet(viewsets.ModelViewSet):
             # For now, let validation fail if not provided, or default if possible.
             # But the serializer will require them.
             # If admin is creating, they likely send the data.
-            serializer.save()
+            save_booking(serializer, LESSON_RULES)
         else:
             # Fallback
-            serializer.save()
+            save_booking(serializer, LESSON_RULES)
+
+    def perform_update(self, serializer):
+        # Rescheduling or changing room is checked the same way as booking
+        save_booking(serializer, LESSON_RULES)
 
 
 class LessonPlanViewSet(viewsets.ModelViewSet):
@@ -313,3 +558,89 @@ class StudentGoalViewSet(viewsets.ModelViewSet):
             serializer.save(teacher=teacher)
         else:
             raise PermissionDenied("You don't have permission to create goals")
+
+
+class RecurringPatternViewSet(viewsets.ModelViewSet):
+    """
+    API endpoints for recurring lesson patterns.
+
+    Creating a pattern materialises its lessons up to the rolling horizon in
+    the same request; POST .../expand/ with an optional "until" date extends
+    it further (e.g. to the end of term). The daily extend_recurring_lessons
+    task keeps open-ended patterns topped up.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = RecurringPatternSerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = RecurringPattern.objects.select_related(
+            "teacher__user", "teacher__studio", "student__user"
+        )
+
+        if user.role == "admin":
+            return queryset.filter(teacher__studio__owner=user)
+        elif user.role == "teacher" and hasattr(user, "teacher_profile"):
+            return queryset.filter(teacher=user.teacher_profile)
+        elif user.role == "student" and hasattr(user, "student_profile"):
+            return queryset.filter(student=user.student_profile)
+        return queryset.none()
+
+    def _check_can_schedule(self, teacher):
+        user = self.request.user
+        if user.role == "admin" and teacher.studio.owner_id == user.id:
+            return
+        if user.role == "teacher" and getattr(user, "teacher_profile", None) == teacher:
+            return
+        raise PermissionDenied("You don't have permission to schedule lessons for this teacher")
+
+    def perform_create(self, serializer):
+        self._check_can_schedule(serializer.validated_data["teacher"])
+        serializer.save()
+
+    def perform_update(self, serializer):
+        teacher = serializer.validated_data.get("teacher", serializer.instance.teacher)
+        self._check_can_schedule(teacher)
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        self._check_can_schedule(instance.teacher)
+        instance.delete()
+
+    def _expansion_response(self, pattern, result, status_code):
+        data = self.get_serializer(pattern).data
+        data["lessons_created"] = len(result.created)
+        data["conflicts"] = [
+            {"scheduled_start": start, "scheduled_end": end} for start, end in result.skipped
+        ]
+        return Response(data, status=status_code)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        result = expand_pattern(serializer.instance)
+        return self._expansion_response(serializer.instance, result, status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["post"])
+    def expand(self, request, pk=None):
+        """Materialise lessons up to ?until= (ISO date), or the default horizon."""
+        pattern = self.get_object()
+        self._check_can_schedule(pattern.teacher)
+
+        until = request.data.get("until") or request.query_params.get("until")
+        if until:
+            until = parse_date(str(until))
+            if until is None:
+                return Response(
+                    {"detail": "until must be an ISO date"}, status=status.HTTP_400_BAD_REQUEST
+                )
+            if until > timezone.localdate() + MAX_HORIZON:
+                return Response(
+                    {"detail": f"until may be at most {MAX_HORIZON.days} days ahead"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        result = expand_pattern(pattern, until=until)
+        return self._expansion_response(pattern, result, status.HTTP_200_OK)
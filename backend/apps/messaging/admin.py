@@ -4,7 +4,7 @@ Django Admin configuration for Messaging models
 
 from django.contrib import admin
 
-from .models import Message, MessageThread
+from .models import Message, MessageThread, ThreadReadState
 
 
 @admin.register(MessageThread)
@@ -49,7 +49,6 @@ class MessageAdmin(admin.ModelAdmin):
         "__str__",
         "thread",
         "sender",
-        "get_read_count",
         "created_at",
     ]
     list_filter = ["created_at", "updated_at"]
@@ -61,17 +60,18 @@ class MessageAdmin(admin.ModelAdmin):
         "thread__subject",
     ]
     readonly_fields = ["id", "created_at", "updated_at"]
-    filter_horizontal = ["read_by"]
     fieldsets = (
         ("Message Information", {"fields": ("thread", "sender", "body")}),
         ("Attachments", {"fields": ("attachments",), "classes": ("collapse",)}),
-        ("Read Tracking", {"fields": ("read_by",), "classes": ("collapse",)}),
         ("Timestamps", {"fields": ("created_at", "updated_at"), "classes": ("collapse",)}),
         ("Metadata", {"fields": ("id",), "classes": ("collapse",)}),
     )
 
-    def get_read_count(self, obj):
-        """Get the number of users who have read this message"""
-        return obj.read_by.count()
 
-    get_read_count.short_description = "Read By"
+@admin.register(ThreadReadState)
+class ThreadReadStateAdmin(admin.ModelAdmin):
+    """Django Admin interface for ThreadReadState model"""
+
+    list_display = ["thread", "user", "last_read_at"]
+    search_fields = ["thread__subject", "user__email"]
+    raw_id_fields = ["thread", "user", "last_read_message"]
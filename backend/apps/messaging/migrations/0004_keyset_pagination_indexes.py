@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0021_reportjob"),
+        ("messaging", "0003_delete_notification"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="messagethread",
+            index=models.Index(
+                fields=["studio", "-updated_at", "id"], name="message_thr_studio__109b17_idx"
+            ),
+        ),
+    ]
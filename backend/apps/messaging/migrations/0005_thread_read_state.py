@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def backfill_read_states(apps, schema_editor):
+    Message = apps.get_model("messaging", "Message")
+    MessageThread = apps.get_model("messaging", "MessageThread")
+    ThreadReadState = apps.get_model("messaging", "ThreadReadState")
+    ReadBy = Message.read_by.through
+
+    # A user has read a thread up to the newest message they had read in it
+    newest_read = (
+        ReadBy.objects.filter(
+            message__thread_id=OuterRef("message__thread_id"), user_id=OuterRef("user_id")
+        )
+        .order_by("-message__created_at")
+        .values("message_id")[:1]
+    )
+    cursors = (
+        ReadBy.objects.values("message__thread_id", "user_id")
+        .annotate(
+            last_read_at=Max("message__created_at"), last_read_message_id=Subquery(newest_read)
+        )
+        .order_by()
+    )
+    ThreadReadState.objects.bulk_create(
+        (
+            ThreadReadState(
+                thread_id=row["message__thread_id"],
+                user_id=row["user_id"],
+                last_read_at=row["last_read_at"],
+                last_read_message_id=row["last_read_message_id"],
+            )
+            for row in cursors.iterator()
+        ),
+        batch_size=1000,
+    )
+
+    MessageThread.objects.update(
+        last_message=Subquery(
+            Message.objects.filter(thread=OuterRef("pk")).order_by("-created_at").values("pk")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0004_keyset_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(fields=["thread", "created_at"], name="messages_thread__08a06b_idx"),
+        ),
+        migrations.AddField(
+            model_name="messagethread",
+            name="last_message",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="messaging.message",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ThreadReadState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("last_read_at", models.DateTimeField()),
+                (
+                    "last_read_message",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="messaging.message",
+                    ),
+                ),
+                (
+                    "thread",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="read_states",
+                        to="messaging.messagethread",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="thread_read_states",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "message_thread_read_states",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("thread", "user"), name="thread_read_state_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_read_states, migrations.RunPython.noop),
+    ]
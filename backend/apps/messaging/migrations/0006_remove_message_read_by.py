@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0005_thread_read_state"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="message",
+            name="read_by",
+        ),
+    ]
@@ -0,0 +1,35 @@
+"""
+Full-text search index over message bodies and thread subjects.
+
+PostgreSQL gets generated tsvector columns with GIN indexes, SQLite gets
+FTS5 tables kept in sync by triggers; see apps/messaging/search.py.
+"""
+
+from django.db import migrations
+
+from apps.messaging import search
+
+
+def install(apps, schema_editor):
+    installer = getattr(search, f"install_{schema_editor.connection.vendor}", None)
+    if installer is not None:
+        with schema_editor.connection.cursor() as cursor:
+            installer(cursor)
+
+
+def uninstall(apps, schema_editor):
+    uninstaller = getattr(search, f"uninstall_{schema_editor.connection.vendor}", None)
+    if uninstaller is not None:
+        with schema_editor.connection.cursor() as cursor:
+            uninstaller(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0006_remove_message_read_by"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
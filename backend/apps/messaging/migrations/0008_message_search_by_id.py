@@ -0,0 +1,28 @@
+"""
+Re-key the SQLite message search tables on the UUID `id` instead of rowid.
+
+0007 built them as external-content FTS5 tables keyed by rowid, which VACUUM
+can renumber on these UUID-keyed tables. install_sqlite() drops and rebuilds
+them (and their triggers) keyed on `id`; other databases are unaffected.
+"""
+
+from django.db import migrations
+
+from apps.messaging import search
+
+
+def reinstall(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            search.install_sqlite(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0007_message_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(reinstall, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0024_channel_layer"),
+        ("messaging", "0008_message_search_by_id"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="messagethread",
+            name="message_thr_studio__109b17_idx",
+        ),
+        migrations.AddIndex(
+            model_name="messagethread",
+            index=models.Index(fields=["-updated_at", "id"], name="message_thr_updated_c4a20e_idx"),
+        ),
+    ]
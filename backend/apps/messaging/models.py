@@ -5,6 +5,8 @@ Messaging models - Message, Thread, Notification
 import uuid
 
 from django.db import models
+from django.utils import timezone
+
 from apps.core.models import Studio, User
 
 
@@ -22,6 +24,11 @@ class MessageThread(models.Model):
     # Subject/topic
     subject = models.CharField(max_length=200, blank=True)
 
+    # Kept current by Message.save() so the inbox needn't look it up per thread
+    last_message = models.ForeignKey(
+        "Message", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -29,6 +36,10 @@ class MessageThread(models.Model):
     class Meta:
         db_table = "message_threads"
         ordering = ["-updated_at"]
+        indexes = [
+            # MessageThreadViewSet.cursor_ordering; its rows come via the participants join
+            models.Index(fields=["-updated_at", "id"]),
+        ]
 
     def __str__(self):
         return self.subject or f"Thread {self.id}"
@@ -49,9 +60,6 @@ class Message(models.Model):
     # Attachments
     attachments = models.JSONField(default=list, blank=True)
 
-    # Read tracking
-    read_by = models.ManyToManyField(User, blank=True, related_name="read_messages")
-
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -59,8 +67,62 @@ class Message(models.Model):
     class Meta:
         db_table = "messages"
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["thread", "created_at"]),
+        ]
 
     def __str__(self):
         return f"Message from {self.sender.get_full_name()} at {self.created_at}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            MessageThread.objects.filter(pk=self.thread_id).update(
+                last_message=self, updated_at=self.created_at
+            )
+            if Message.thread.is_cached(self):
+                # Keep the caller's thread from writing the old values back
+                self.thread.last_message = self
+                self.thread.updated_at = self.created_at
+
+
+class ThreadReadState(models.Model):
+    """
+    How far a user has read a thread. Everything in the thread created after
+    last_read_at (and not sent by the user) is unread.
+    """
+
+    thread = models.ForeignKey(MessageThread, on_delete=models.CASCADE, related_name="read_states")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="thread_read_states")
+    last_read_at = models.DateTimeField()
+    last_read_message = models.ForeignKey(
+        Message, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    class Meta:
+        db_table = "message_thread_read_states"
+        constraints = [
+            models.UniqueConstraint(fields=["thread", "user"], name="thread_read_state_unique")
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} read {self.thread_id} up to {self.last_read_at}"
+
+    @classmethod
+    def mark_read(cls, thread, user, message=None):
+        """
+        Move `user`'s cursor in `thread` to `message` (default: the thread's
+        latest message) with a single upsert, however long the thread is.
+        """
+        if message is None:
+            message = thread.last_message
+        last_read_at = message.created_at if message else timezone.now()
+        cls.objects.bulk_create(
+            [cls(thread=thread, user=user, last_read_at=last_read_at, last_read_message=message)],
+            update_conflicts=True,
+            unique_fields=["thread", "user"],
+            update_fields=["last_read_at", "last_read_message"],
+        )
+
 
@@ -0,0 +1,142 @@
+"""
+Full-text search over message bodies and thread subjects.
+
+The search index lives outside the Django models, set up per database by
+migration 0007_message_search:
+
+- PostgreSQL: a generated `search_vector` tsvector column on `messages`
+  (body) and `message_threads` (subject), maintained by the database on
+  every write and indexed with GIN. Queries use websearch_to_tsquery, so
+  users can type "quoted phrases", `or` and `-excluded` words, and are
+  ranked with ts_rank.
+- SQLite: FTS5 tables (`messages_fts`, `message_threads_fts`) holding each
+  row's UUID `id` as an UNINDEXED column next to its text, kept in sync by
+  triggers and joined back on `id`. (Not keyed on rowid: the tables have
+  UUID primary keys, so their rowids aren't stable and VACUUM can renumber
+  them.) Queries match every word typed and are ranked with bm25.
+
+Both are index lookups, so search stays interactive as history grows. Other
+databases fall back to an unranked icontains scan.
+
+SQLite drops triggers when Django remakes a table (e.g. AlterField on
+`messages`); a migration that does so must re-run install_sqlite().
+"""
+
+import re
+from itertools import chain
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Message, MessageThread
+
+SEARCH_CONFIG = "english"
+
+# (table, indexed column) per searched model
+INDEXED = {
+    Message: ("messages", "body"),
+    MessageThread: ("message_threads", "subject"),
+}
+
+
+def install_postgresql(cursor):
+    for table, column in INDEXED.values():
+        cursor.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+            f"(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, ''))) STORED"
+        )
+        cursor.execute(
+            f"CREATE INDEX {table}_search_vector_idx ON {table} USING gin (search_vector)"
+        )
+
+
+def uninstall_postgresql(cursor):
+    for table, _ in INDEXED.values():
+        cursor.execute(f"DROP INDEX IF EXISTS {table}_search_vector_idx")
+        cursor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+
+
+def install_sqlite(cursor):
+    uninstall_sqlite(cursor)
+    for table, column in INDEXED.values():
+        fts = f"{table}_fts"
+        cursor.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5(id UNINDEXED, {column})")
+        insert = f"INSERT INTO {fts}(id, {column}) VALUES (new.id, new.{column});"
+        delete = f"DELETE FROM {fts} WHERE id = old.id;"
+        cursor.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END")
+        cursor.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END")
+        cursor.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} "
+            f"BEGIN {delete} {insert} END"
+        )
+        cursor.execute(f"INSERT INTO {fts}(id, {column}) SELECT id, {column} FROM {table}")
+
+
+def uninstall_sqlite(cursor):
+    for table, _ in INDEXED.values():
+        fts = f"{table}_fts"
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def _fts5_query(query):
+    # Quote every word so FTS5 operators and punctuation in user input are literal
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+def _match_and_rank(model, query):
+    """(filter, rank) expressions finding `query` in `model`'s indexed column."""
+    table, column = INDEXED[model]
+    if connection.vendor == "postgresql":
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return (
+            RawSQL(f"{table}.search_vector @@ {tsquery}", [query], BooleanField()),
+            RawSQL(f"ts_rank({table}.search_vector, {tsquery})", [query], FloatField()),
+        )
+    if connection.vendor == "sqlite":
+        fts = f"{table}_fts"
+        return (
+            RawSQL(
+                f"{table}.id IN (SELECT id FROM {fts} WHERE {fts} MATCH %s)",
+                [query],
+                BooleanField(),
+            ),
+            RawSQL(
+                f"(SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND id = {table}.id)",
+                [query],
+                FloatField(),
+            ),
+        )
+    return Q(**{f"{column}__icontains": query}), Value(0.0)
+
+
+def search(threads, query, limit=50):
+    """
+    The best `limit` matches for `query` in `threads` (a MessageThread
+    queryset the caller has already scoped to the user), best first, as
+    (rank, thread, message) tuples; message is None for a subject match.
+    """
+    if connection.vendor == "sqlite":
+        query = _fts5_query(query)
+    if not query.strip():
+        return []
+
+    match, rank = _match_and_rank(MessageThread, query)
+    thread_hits = threads.filter(match).annotate(rank=rank).order_by("-rank", "-updated_at")[:limit]
+
+    match, rank = _match_and_rank(Message, query)
+    message_hits = (
+        Message.objects.filter(thread__in=threads.values("pk"))
+        .filter(match)
+        .annotate(rank=rank)
+        .select_related("sender", "thread")
+        .order_by("-rank", "-created_at")[:limit]
+    )
+
+    hits = chain(
+        ((thread.rank, thread, None) for thread in thread_hits),
+        ((message.rank, message.thread, message) for message in message_hits),
+    )
+    return sorted(hits, key=lambda hit: hit[0], reverse=True)[:limit]
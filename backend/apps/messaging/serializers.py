@@ -1,11 +1,33 @@
+from datetime import UTC, datetime
+
 from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 
 from rest_framework import serializers
 
-from .models import Message, MessageThread
+from apps.core.eager_loading import AnnotatedCountField
+
+from .models import Message, MessageThread, ThreadReadState
 
 User = get_user_model()
 
+NEVER_READ = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _unread(request):
+    """
+    Messages past the request user's read cursor, excluding their own. The
+    cursor is correlated with the thread row rather than each message, so
+    counting is one range scan of the (thread, created_at) index per thread.
+    """
+    last_read_at = ThreadReadState.objects.filter(
+        thread=OuterRef(OuterRef("pk")), user=request.user
+    ).values("last_read_at")[:1]
+    return Q(created_at__gt=Coalesce(Subquery(last_read_at), Value(NEVER_READ))) & ~Q(
+        sender=request.user
+    )
+
 
 class MessageUserSerializer(serializers.ModelSerializer):
     """Minimal user info for messages"""
@@ -30,15 +52,14 @@ class MessageSerializer(serializers.ModelSerializer):
             "body",
             "attachments",
             "created_at",
-            "read_by",
         ]
-        read_only_fields = ["thread", "sender", "created_at", "read_by"]
+        read_only_fields = ["thread", "sender", "created_at"]
 
 
 class MessageThreadSerializer(serializers.ModelSerializer):
     participants_details = MessageUserSerializer(source="participants", many=True, read_only=True)
-    last_message = serializers.SerializerMethodField()
-    unread_count = serializers.SerializerMethodField()
+    last_message = MessageSerializer(read_only=True)
+    unread_count = AnnotatedCountField("messages", filter=_unread)
 
     class Meta:
         model = MessageThread
@@ -54,19 +75,4 @@ class MessageThreadSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["created_at", "updated_at", "participants"]
 
-    def get_last_message(self, obj):
-        last_msg = obj.messages.last()
-        if last_msg:
-            return MessageSerializer(last_msg).data
-        return None
-
-    def get_unread_count(self, obj):
-        request = self.context.get("request")
-        if not request:
-            return 0
-        user = request.user
-        # Count messages in this thread NOT in user.read_messages
-        # Logic: Message.read_by is M2M.
-        return obj.messages.exclude(read_by=user).count()
-
 
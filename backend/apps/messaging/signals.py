@@ -36,7 +36,6 @@ def notify_new_message(sender, instance, created, **kwargs):
                 },
                 "body": instance.body,
                 "created_at": instance.created_at.isoformat(),
-                "read_by": [],
             }
 
             async_to_sync(channel_layer.group_send)(
@@ -1,12 +1,19 @@
+import uuid
+
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.db.models import Q
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
+from apps.core.eager_loading import EagerLoadingMixin
 from apps.core.models import Studio, User
 
-from .models import Message, MessageThread
+from . import search
+from .models import Message, MessageThread, ThreadReadState
 from .serializers import MessageSerializer, MessageThreadSerializer
 
 
@@ -31,7 +38,7 @@ class StreamTokenView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=500)
 
-class MessageThreadViewSet(viewsets.ModelViewSet):
+class MessageThreadViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     API for managing conversation threads
     """
@@ -42,6 +49,12 @@ class MessageThreadViewSet(viewsets.ModelViewSet):
     search_fields = ["subject", "participants__first_name", "participants__last_name"]
     ordering_fields = ["updated_at"]
     ordering = ["-updated_at"]
+    # Keyset order for ?pagination=cursor (see config/pagination.py)
+    cursor_ordering = ("-updated_at", "id")
+    # Messages per page of thread history
+    message_page_size = 50
+    # Matches returned by ?q= full-text search
+    search_limit = 50
 
     def get_queryset(self):
         user = self.request.user
@@ -113,7 +126,7 @@ class MessageThreadViewSet(viewsets.ModelViewSet):
             thread=thread, sender=request.user, body=initial_message_body
         )
         # Mark read by sender
-        message.read_by.add(request.user)
+        ThreadReadState.mark_read(thread, request.user, message)
 
         serializer = self.get_serializer(thread)
         
@@ -138,11 +151,9 @@ class MessageThreadViewSet(viewsets.ModelViewSet):
         if not body:
             return Response({"error": "Body required"}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Saving the message also touches the thread's updated_at / last_message
         message = Message.objects.create(thread=thread, sender=request.user, body=body)
-        message.read_by.add(request.user)
-
-        # Touch thread update time
-        thread.save()  # Updates updated_at auto_now
+        ThreadReadState.mark_read(thread, request.user, message)
 
         # Notify via WebSocket
         channel_layer = get_channel_layer()
@@ -158,20 +169,91 @@ class MessageThreadViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=["get"])
     def messages(self, request, pk=None):
-        """Get all messages in thread"""
+        """
+        Thread history a page at a time, oldest first. Without parameters this
+        is the latest page; ?before=<message id> / ?after=<message id> page
+        backwards / forwards from a message. Each page is a keyset range on
+        the (thread, created_at) index, and reading up to the newest message
+        moves the user's read cursor there.
+        """
         thread = self.get_object()
-        messages = thread.messages.all().order_by("created_at")
+        size = self.message_page_size
+        messages = thread.messages.select_related("sender")
+
+        after = self._message_anchor(thread, "after")
+        before = self._message_anchor(thread, "before")
+        if after:
+            newer = Q(created_at__gt=after["created_at"]) | Q(
+                created_at=after["created_at"], id__gt=after["id"]
+            )
+            rows = list(messages.filter(newer).order_by("created_at", "id")[: size + 1])
+            has_newer, has_older = len(rows) > size, True
+            rows = rows[:size]
+        else:
+            if before:
+                messages = messages.filter(
+                    Q(created_at__lt=before["created_at"])
+                    | Q(created_at=before["created_at"], id__lt=before["id"])
+                )
+            rows = list(messages.order_by("-created_at", "-id")[: size + 1])
+            has_older, has_newer = len(rows) > size, bool(before)
+            rows = rows[:size][::-1]
+
+        if rows and not has_newer:
+            ThreadReadState.mark_read(thread, request.user, rows[-1])
+
+        url = remove_query_param(
+            remove_query_param(request.build_absolute_uri(), "before"), "after"
+        )
+        return Response(
+            {
+                "next": replace_query_param(url, "after", rows[-1].id) if has_newer else None,
+                "previous": replace_query_param(url, "before", rows[0].id) if has_older else None,
+                "results": MessageSerializer(rows, many=True).data,
+            }
+        )
+
+    def _message_anchor(self, thread, param):
+        """created_at / id of the message named by ?<param>=, if given."""
+        message_id = self.request.query_params.get(param)
+        if not message_id:
+            return None
+        try:
+            anchor = thread.messages.filter(pk=uuid.UUID(message_id)).values("created_at", "id")
+        except ValueError:
+            raise NotFound(f"Unknown message for '{param}'") from None
+        anchor = anchor.first()
+        if anchor is None:
+            raise NotFound(f"Unknown message for '{param}'")
+        return anchor
 
-        # Mark all as read for this user?
-        # Or allow manual marking. Usually opening thread marks as read.
-        for msg in messages:
-            msg.read_by.add(request.user)
+    @action(detail=False, methods=["get"], url_path="search", url_name="search")
+    def search_messages(self, request):
+        """
+        Ranked full-text search (?q=) over message bodies and subjects of the
+        threads the user participates in; see apps/messaging/search.py.
+        """
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"error": "q required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(MessageSerializer(messages, many=True).data)
+        hits = search.search(self.get_queryset(), query, limit=self.search_limit)
+        return Response(
+            {
+                "results": [
+                    {
+                        "thread": str(thread.id),
+                        "subject": thread.subject,
+                        "rank": rank,
+                        "message": MessageSerializer(message).data if message else None,
+                    }
+                    for rank, thread, message in hits
+                ]
+            }
+        )
 
     @action(detail=True, methods=["post"])
     def mark_read(self, request, pk=None):
         thread = self.get_object()
-        for msg in thread.messages.all():
-            msg.read_by.add(request.user)
+        ThreadReadState.mark_read(thread, request.user)
         return Response({"status": "read"})
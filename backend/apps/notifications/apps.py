@@ -8,3 +8,30 @@ class NotificationsConfig(AppConfig):
 
     def ready(self):
         import apps.notifications.signals  # noqa
+
+        self._register_schedule()
+
+    def _register_schedule(self):
+        try:
+            from django_q.models import Schedule
+
+            Schedule.objects.get_or_create(
+                func="apps.notifications.tasks.drain_outbox",
+                defaults={
+                    "name": "Drain notification outbox",
+                    "schedule_type": Schedule.MINUTES,
+                    "minutes": 1,
+                    "repeats": -1,  # run forever
+                },
+            )
+            Schedule.objects.get_or_create(
+                func="apps.notifications.tasks.purge_outbox",
+                defaults={
+                    "name": "Purge processed notification outbox events",
+                    "schedule_type": Schedule.DAILY,
+                    "repeats": -1,
+                },
+            )
+        except Exception:
+            # Tables may not exist yet during initial migrations — safe to skip.
+            pass
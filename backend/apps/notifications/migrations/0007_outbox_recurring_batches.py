@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lessons", "0014_externalcalendarfeed_fetch_state"),
+        ("notifications", "0006_notification_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxevent",
+            name="lesson_ids",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="outboxevent",
+            name="pattern",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="outbox_events",
+                to="lessons.recurringpattern",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="outboxevent",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("lesson_created", "Lesson Created"),
+                    ("lessons_scheduled", "Recurring Lessons Scheduled"),
+                ],
+                max_length=30,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="outboxevent",
+            name="lesson",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="outbox_events",
+                to="lessons.lesson",
+            ),
+        ),
+    ]
@@ -52,7 +52,7 @@ class Notification(models.Model):
     class Meta:
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["user", "-created_at"]),
+            models.Index(fields=["user", "-created_at", "id"]),
             models.Index(fields=["user", "read"]),
         ]
 
@@ -79,33 +79,92 @@ class Notification(models.Model):
         )
 
     @classmethod
-    def notify_lesson_scheduled(cls, lesson):
-        """Create notification for newly scheduled lesson"""
+    def lesson_scheduled_notifications(cls, lesson):
+        """Unsaved notifications for a newly scheduled lesson, respecting prefs"""
+        notifications = []
+        when = lesson.scheduled_start.strftime("%B %d at %I:%M %p")
+
         # Notify student
         if lesson.student and lesson.student.user:
             user = lesson.student.user
             if user.wants_notification("lesson_scheduled", "push"):
-                cls.create_notification(
-                    user=user,
-                    notification_type="lesson_scheduled",
-                    title="New Lesson Scheduled",
-                    message=f'Your {lesson.student.instrument} lesson is scheduled for {lesson.scheduled_start.strftime("%B %d at %I:%M %p")}',
-                    link=f"/dashboard/lessons/{lesson.id}",
-                    related_lesson_id=lesson.id,
+                notifications.append(
+                    cls(
+                        user=user,
+                        notification_type="lesson_scheduled",
+                        title="New Lesson Scheduled",
+                        message=f"Your {lesson.student.instrument} lesson is scheduled for {when}",
+                        link=f"/dashboard/lessons/{lesson.id}",
+                        related_lesson_id=lesson.id,
+                    )
                 )
 
         # Notify teacher
         if lesson.teacher and lesson.teacher.user:
             user = lesson.teacher.user
             if user.wants_notification("lesson_scheduled", "push"):
-                cls.create_notification(
+                if lesson.student:
+                    with_whom = lesson.student.user.get_full_name()
+                else:
+                    with_whom = lesson.band.name if lesson.band else "Group/Band"
+                notifications.append(
+                    cls(
+                        user=user,
+                        notification_type="lesson_scheduled",
+                        title="New Lesson Scheduled",
+                        message=f"Lesson with {with_whom} scheduled for {when}",
+                        link=f"/dashboard/lessons/{lesson.id}",
+                        related_lesson_id=lesson.id,
+                    )
+                )
+        return notifications
+
+    @classmethod
+    def notify_lesson_scheduled(cls, lesson):
+        """Create notification for newly scheduled lesson"""
+        for notification in cls.lesson_scheduled_notifications(lesson):
+            notification.save()
+
+    @classmethod
+    def recurring_lessons_scheduled_notifications(cls, pattern, lessons):
+        """Unsaved notifications, one per recipient, for a batch of recurring lessons"""
+        first = min(lesson.scheduled_start for lesson in lessons)
+        schedule = (
+            f"{pattern.get_frequency_display().lower()} on {pattern.get_day_of_week_display()}s "
+            f'at {pattern.time.strftime("%I:%M %p")}, starting {first.strftime("%B %d")}'
+        )
+
+        notifications = []
+
+        # Notify student
+        user = pattern.student.user
+        if user.wants_notification("lesson_scheduled", "push"):
+            notifications.append(
+                cls(
                     user=user,
                     notification_type="lesson_scheduled",
-                    title="New Lesson Scheduled",
-                    message=f'Lesson with {lesson.student.user.get_full_name()} scheduled for {lesson.scheduled_start.strftime("%B %d at %I:%M %p")}',
-                    link=f"/dashboard/lessons/{lesson.id}",
-                    related_lesson_id=lesson.id,
+                    title=f"{len(lessons)} Lessons Scheduled",
+                    message=f"Your {pattern.student.instrument} lessons are scheduled {schedule}",
+                    link="/dashboard/lessons",
+                    related_lesson_id=lessons[0].id,
                 )
+            )
+
+        # Notify teacher
+        user = pattern.teacher.user
+        if user.wants_notification("lesson_scheduled", "push"):
+            with_whom = pattern.student.user.get_full_name()
+            notifications.append(
+                cls(
+                    user=user,
+                    notification_type="lesson_scheduled",
+                    title=f"{len(lessons)} Lessons Scheduled",
+                    message=f"Lessons with {with_whom} scheduled {schedule}",
+                    link="/dashboard/lessons",
+                    related_lesson_id=lessons[0].id,
+                )
+            )
+        return notifications
 
     @classmethod
     def notify_new_student(cls, teacher_user, student):
@@ -149,6 +208,23 @@ class Notification(models.Model):
                     related_lesson_id=lesson.id,
                 )
 
+    @classmethod
+    def notify_lesson_reminders(cls, lessons):
+        """Create day-before reminders for many lessons' students in one insert"""
+        notifications = [
+            cls(
+                user=lesson.student.user,
+                notification_type="lesson_reminder",
+                title="Upcoming Lesson Reminder",
+                message=f'Your {lesson.student.instrument} lesson is tomorrow at {lesson.scheduled_start.strftime("%I:%M %p")}',
+                link=f"/dashboard/lessons/{lesson.id}",
+                related_lesson_id=lesson.id,
+            )
+            for lesson in lessons
+            if lesson.student.user.wants_notification("lesson_reminder", "push")
+        ]
+        return cls.objects.bulk_create(notifications)
+
     @classmethod
     def notify_document_pending(cls, user, document_name):
         """Notify user of document requiring signature"""
@@ -185,3 +261,80 @@ class Notification(models.Model):
                 message=f"New student {student_user.get_full_name()} ({student_user.email}) has registered and is pending approval.",
                 link="/dashboard/users",
             )
+
+
+class ReminderLedger(models.Model):
+    """
+    One row per reminder dispatched, so each (lesson, user, kind) goes out
+    exactly once however often the reminder task runs.
+    """
+
+    KIND_CHOICES = [
+        ("day_before", "Day Before"),
+    ]
+
+    lesson = models.ForeignKey(
+        "lessons.Lesson", on_delete=models.CASCADE, related_name="reminder_ledger"
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reminder_ledger")
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "reminder_ledger"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lesson", "user", "kind"], name="reminder_ledger_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind} reminder for {self.lesson_id} to {self.user_id}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Side effects owed for a domain change, written in the same transaction as
+    the change and carried out later by notifications.outbox.drain().
+    """
+
+    KIND_CHOICES = [
+        ("lesson_created", "Lesson Created"),
+        ("lessons_scheduled", "Recurring Lessons Scheduled"),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    # lesson_created: the new lesson
+    lesson = models.ForeignKey(
+        "lessons.Lesson",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="outbox_events",
+    )
+    # lessons_scheduled: the pattern and the ids of the lessons one expansion created
+    pattern = models.ForeignKey(
+        "lessons.RecurringPattern",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="outbox_events",
+    )
+    lesson_ids = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = "notification_outbox"
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(processed_at__isnull=True),
+                name="notification_outbox_pending",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for {self.lesson_id or self.pattern_id}"
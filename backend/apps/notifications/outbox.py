@@ -0,0 +1,230 @@
+"""
+Transactional outbox for lesson side effects.
+
+Creating a lesson used to notify both parties inline: two notification
+inserts, a channel-layer broadcast per notification, two rendered email
+contexts and two Django-Q enqueues, all inside the request that saved the
+lesson. Now the Lesson post_save receiver only writes an OutboxEvent row in
+the same transaction (so it exists exactly when the lesson does) and, once
+that commits, asks for a drain. A recurring pattern's expansion, which
+bulk-creates its lessons, records one "lessons_scheduled" event for the whole
+batch the same way, so teacher and student get a single summary.
+
+drain() takes pending events in batches, oldest first, and for a whole batch:
+
+- inserts every in-app notification with one bulk_create and marks the
+  events processed in the same transaction;
+- broadcasts the new notifications after commit;
+- enqueues the emails EMAIL_BATCH_SIZE at a time to send_email_batch.
+
+Drains are kicked at most once per DRAIN_DEBOUNCE_SECONDS; anything a kick
+misses is picked up by the every-minute schedule. An event whose lesson
+cannot be rendered is retried on later drains up to MAX_ATTEMPTS times.
+Processed events are kept for PROCESSED_RETENTION, then deleted by the
+daily purge_outbox task.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from django_q.tasks import async_task
+
+from apps.core.tasks import EMAIL_BATCH_SIZE, send_email_batch
+
+from .models import Notification, OutboxEvent
+from .signals import broadcast_notifications
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+MAX_ATTEMPTS = 5
+DRAIN_DEBOUNCE_SECONDS = 2
+DRAIN_KICK_KEY = "notifications:outbox:kick"
+PROCESSED_RETENTION = timedelta(days=7)
+
+
+def record_lesson_created(lesson):
+    """Queue the lesson-created side effects; call inside the saving transaction."""
+    OutboxEvent.objects.create(kind="lesson_created", lesson=lesson)
+    transaction.on_commit(kick)
+
+
+def record_lessons_scheduled(pattern, lessons):
+    """Queue the summary for a recurring batch; call inside the creating transaction."""
+    OutboxEvent.objects.create(
+        kind="lessons_scheduled",
+        pattern=pattern,
+        lesson_ids=[str(lesson.id) for lesson in lessons],
+    )
+    transaction.on_commit(kick)
+
+
+def kick():
+    """Enqueue a drain unless one was enqueued moments ago."""
+    try:
+        if cache.add(DRAIN_KICK_KEY, True, DRAIN_DEBOUNCE_SECONDS):
+            async_task("apps.notifications.tasks.drain_outbox")
+    except Exception as e:
+        # The scheduled drain will still pick the events up
+        logger.error(f"Failed to enqueue outbox drain: {e}")
+
+
+def _lesson_emails(lesson):
+    """(subject, to_email, template_name, context) per recipient who wants email."""
+    if lesson.student:
+        student_name = lesson.student.user.get_full_name()
+        instrument = lesson.student.instrument
+    else:
+        student_name = lesson.band.name if lesson.band else "Group/Band"
+        instrument = "Music"
+
+    recipients = []
+    if lesson.teacher and lesson.teacher.user:
+        recipients.append(lesson.teacher.user)
+    if lesson.student and lesson.student.user:
+        recipients.append(lesson.student.user)
+
+    messages = []
+    for user in recipients:
+        if not user.wants_notification("lesson_scheduled", "email"):
+            continue
+        context = {
+            "recipient_name": user.first_name,
+            "instructor_name": lesson.teacher.user.get_full_name(),
+            "lesson_start_time": lesson.scheduled_start.strftime("%A, %B %d at %I:%M %p"),
+            "location": lesson.location,
+            "student_name": student_name,
+            "instrument": instrument,
+            "duration_minutes": lesson.duration_minutes,
+            "lesson_url": f"{settings.FRONTEND_BASE_URL}/dashboard/lessons/{lesson.id}",
+        }
+        messages.append(
+            ("New Lesson Scheduled 🎵", user.email, "emails/lesson_scheduled.html", context)
+        )
+    return messages
+
+
+def _recurring_emails(pattern, lessons):
+    """(subject, to_email, template_name, context) per recipient of a batch summary."""
+    first = min(lesson.scheduled_start for lesson in lessons)
+    last = max(lesson.scheduled_start for lesson in lessons)
+    messages = []
+    for user in (pattern.teacher.user, pattern.student.user):
+        if not user.wants_notification("lesson_scheduled", "email"):
+            continue
+        context = {
+            "recipient_name": user.first_name,
+            "instructor_name": pattern.teacher.user.get_full_name(),
+            "student_name": pattern.student.user.get_full_name(),
+            "instrument": pattern.student.instrument,
+            "lesson_count": len(lessons),
+            "frequency": pattern.get_frequency_display(),
+            "weekday": pattern.get_day_of_week_display(),
+            "time": pattern.time.strftime("%I:%M %p"),
+            "first_lesson": first.strftime("%A, %B %d"),
+            "last_lesson": last.strftime("%A, %B %d"),
+            "duration_minutes": pattern.duration_minutes,
+            "lessons_url": f"{settings.FRONTEND_BASE_URL}/dashboard/lessons",
+        }
+        messages.append(
+            (
+                f"{len(lessons)} Lessons Scheduled 🎵",
+                user.email,
+                "emails/recurring_lessons_scheduled.html",
+                context,
+            )
+        )
+    return messages
+
+
+def _render(event):
+    """The (unsaved notifications, emails) an event owes."""
+    if event.kind == "lessons_scheduled":
+        # Lessons deleted before the drain are left out of the summary
+        lessons = list(event.pattern.lessons.filter(id__in=event.lesson_ids))
+        if not lessons:
+            return [], []
+        return (
+            Notification.recurring_lessons_scheduled_notifications(event.pattern, lessons),
+            _recurring_emails(event.pattern, lessons),
+        )
+    return Notification.lesson_scheduled_notifications(event.lesson), _lesson_emails(event.lesson)
+
+
+def _drain_batch(after_id, batch_size):
+    """Process one batch of events past `after_id`; returns the events taken."""
+    now = timezone.now()
+    notifications, messages, failed = [], [], []
+
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS, id__gt=after_id)
+            .select_related(
+                "lesson__teacher__user",
+                "lesson__student__user",
+                "lesson__band",
+                "pattern__teacher__user",
+                "pattern__student__user",
+            )
+            .order_by("id")[:batch_size]
+        )
+        if not events:
+            return events
+
+        done = []
+        for event in events:
+            try:
+                event_notifications, event_messages = _render(event)
+            except Exception as e:
+                logger.error(f"Failed to render outbox event {event.id}: {e}")
+                event.attempts += 1
+                event.last_error = str(e)
+                failed.append(event)
+                continue
+            notifications += event_notifications
+            messages += event_messages
+            done.append(event.id)
+
+        notifications = Notification.objects.bulk_create(notifications)
+        OutboxEvent.objects.filter(id__in=done).update(processed_at=now, attempts=F("attempts") + 1)
+        if failed:
+            OutboxEvent.objects.bulk_update(failed, ["attempts", "last_error"])
+
+    broadcast_notifications(notifications)
+    for offset in range(0, len(messages), EMAIL_BATCH_SIZE):
+        try:
+            async_task(send_email_batch, messages[offset : offset + EMAIL_BATCH_SIZE])
+        except Exception as e:
+            logger.error(f"Failed to enqueue lesson scheduled emails: {e}")
+
+    logger.info(
+        f"Drained {len(done)} outbox events: {len(notifications)} notifications, "
+        f"{len(messages)} emails, {len(failed)} failed"
+    )
+    return events
+
+
+def drain(batch_size=BATCH_SIZE):
+    """
+    Process every pending outbox event once, a batch at a time. Events that
+    fail stay pending for the next drain. Returns how many events were taken.
+    """
+    taken = 0
+    last_id = 0
+    while events := _drain_batch(last_id, batch_size):
+        taken += len(events)
+        last_id = events[-1].id
+    return taken
+
+
+def purge(older_than=PROCESSED_RETENTION):
+    """Delete events processed more than `older_than` ago. Returns how many."""
+    deleted, _ = OutboxEvent.objects.filter(processed_at__lt=timezone.now() - older_than).delete()
+    return deleted
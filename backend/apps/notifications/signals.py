@@ -8,14 +8,21 @@ from .serializers import NotificationSerializer
 @receiver(post_save, sender=Notification)
 def broadcast_notification(sender, instance, created, **kwargs):
     if created:
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            user_group = f"user_notifications_{instance.user.id}"
-            serializer = NotificationSerializer(instance)
-            async_to_sync(channel_layer.group_send)(
-                user_group,
-                {
-                    "type": "send_notification",
-                    "notification": serializer.data
-                }
-            )
+        broadcast_notifications([instance])
+
+
+def broadcast_notifications(notifications):
+    """Push new notifications to their users' sockets; bulk_create skips post_save."""
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        return
+    for notification in notifications:
+        user_group = f"user_notifications_{notification.user_id}"
+        serializer = NotificationSerializer(notification)
+        async_to_sync(channel_layer.group_send)(
+            user_group,
+            {
+                "type": "send_notification",
+                "notification": serializer.data
+            }
+        )
@@ -0,0 +1,16 @@
+from .outbox import drain, purge
+
+
+def drain_outbox():
+    """
+    Django-Q task: carry out pending outbox side effects. Enqueued after each
+    lesson commit and scheduled every minute to catch anything a kick missed.
+    """
+    taken = drain()
+    return f"Drained {taken} outbox events"
+
+
+def purge_outbox():
+    """Django-Q task, daily: delete outbox events processed over a week ago."""
+    purged = purge()
+    return f"Purged {purged} processed outbox events"
@@ -16,6 +16,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    # Keyset order for ?pagination=cursor (see config/pagination.py)
+    cursor_ordering = ("-created_at", "id")
 
     def get_queryset(self):
         """Return notifications for current user only"""
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0021_reportjob"),
+        ("resources", "0010_resource_bpm_capo_chord_content"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="resource",
+            index=models.Index(
+                fields=["studio", "-created_at", "id"], name="resources_studio__345064_idx"
+            ),
+        ),
+    ]
@@ -150,6 +150,7 @@ class Resource(models.Model):
             models.Index(fields=["band"]),
             models.Index(fields=["instrument"]),
             models.Index(fields=["resource_type", "instrument"]),
+            models.Index(fields=["studio", "-created_at", "id"]),
         ]
 
     def __str__(self):
@@ -1,13 +1,15 @@
 from rest_framework import serializers
 
+from apps.core.eager_loading import AnnotatedCountField
+
 from .models import Resource, ResourceCheckout, ResourceFolder
 
 
 class ResourceFolderSerializer(serializers.ModelSerializer):
     """Serializer for virtual resource folders."""
 
-    children_count = serializers.SerializerMethodField()
-    resources_count = serializers.SerializerMethodField()
+    children_count = AnnotatedCountField("children")
+    resources_count = AnnotatedCountField("resources")
 
     class Meta:
         model = ResourceFolder
@@ -22,12 +24,6 @@ class ResourceFolderSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["created_by"]
 
-    def get_children_count(self, obj):
-        return obj.children.count()
-
-    def get_resources_count(self, obj):
-        return obj.resources.count()
-
 
 class ResourceSerializer(serializers.ModelSerializer):
     uploaded_by_name = serializers.SerializerMethodField()
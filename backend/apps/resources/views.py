@@ -9,6 +9,7 @@ from rest_framework.decorators import action
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 
+from apps.core.eager_loading import EagerLoadingMixin
 
 from .models import Resource, ResourceFolder
 from .serializers import ResourceFolderSerializer, ResourceSerializer
@@ -73,7 +74,7 @@ class PublicResourceViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 
-class ResourceFolderViewSet(viewsets.ModelViewSet):
+class ResourceFolderViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     CRUD for virtual resource folders, scoped to the user's studio.
     """
@@ -89,7 +90,7 @@ class ResourceFolderViewSet(viewsets.ModelViewSet):
         studio = _get_studio_for_user(user)
         if not studio:
             return ResourceFolder.objects.none()
-        return ResourceFolder.objects.filter(studio=studio).prefetch_related("children")
+        return ResourceFolder.objects.filter(studio=studio)
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -108,6 +109,8 @@ class ResourceViewSet(viewsets.ModelViewSet):
 
     search_fields = ["title", "description", "tags", "composer"]
     ordering_fields = ["created_at", "title"]
+    # Keyset order for ?pagination=cursor (see config/pagination.py)
+    cursor_ordering = ("-created_at", "id")
 
     def get_queryset(self):
         user = self.request.user
@@ -89,17 +89,12 @@ class StudentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], url_path="stats")
     def stats(self, request):
         """Return aggregate stats for the students the current user can access."""
-        qs = self.get_queryset()
-        total = qs.count()
-        active = qs.filter(is_active=True).count()
-        unassigned = qs.filter(primary_teacher__isnull=True).count()
-        return Response(
-            {
-                "total_students": total,
-                "active_students": active,
-                "unassigned_students": unassigned,
-            }
+        totals = self.get_queryset().aggregate(
+            total_students=models.Count("id"),
+            active_students=models.Count("id", filter=models.Q(is_active=True)),
+            unassigned_students=models.Count("id", filter=models.Q(primary_teacher__isnull=True)),
         )
+        return Response(totals)
 
     def perform_create(self, serializer):
         # Automatically assign the studio from the admin's owned studio
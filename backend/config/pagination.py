@@ -0,0 +1,144 @@
+"""
+Default DRF pagination with an opt-in keyset (cursor) mode.
+
+Page-number pagination runs a COUNT(*) and an OFFSET scan for every page, so
+deep pages of large tables get slower as history grows. Views that declare a
+stable `cursor_ordering` (ending in a unique column, e.g.
+("scheduled_start", "id")) can be paged by keyset instead:
+
+    GET /api/lessons/lessons/?pagination=cursor
+    -> {"next": "...?cursor=<token>", "previous": null, "results": [...]}
+
+Each page is a `WHERE (ordering columns) > (last row)` range read backed by a
+composite index, so latency stays flat however deep the page. Requests
+without ?pagination=cursor or ?cursor= get the usual page-number response,
+so existing clients are unaffected.
+"""
+
+import base64
+import json
+
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """PageNumberPagination that switches to keyset paging when asked to."""
+
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    invalid_cursor_message = "Invalid cursor"
+
+    use_cursor = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, "cursor_ordering", None)
+        self.use_cursor = bool(ordering) and (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == "cursor"
+        )
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        fields = [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+
+        position, reverse = self.decode_cursor(request)
+        if reverse:
+            # Walk backwards from the cursor by flipping every direction
+            fields = [(name, not desc) for name, desc in fields]
+
+        queryset = queryset.order_by(*[f"-{name}" if desc else name for name, desc in fields])
+        if position is not None:
+            if len(position) != len(fields):
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(self._after(fields, position))
+
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        names = [name for name, _ in fields]
+
+        if reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = position is not None, has_more
+
+        self.first_position = self._position(rows[0], names) if rows else position
+        self.last_position = self._position(rows[-1], names) if rows else position
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next or self.last_position is None:
+            return None
+        return self._link(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self._link(self.first_position, reverse=True)
+
+    @staticmethod
+    def _after(fields, position):
+        """
+        Rows strictly after `position` in the given ordering.
+
+        The expanded comparison (a > x OR (a = x AND b > y) ...) is ANDed
+        with a plain bound on the leading column (a >= x), which the planner
+        can use as the start of an index range scan.
+        """
+        condition = Q()
+        for i, (name, desc) in enumerate(fields):
+            step = Q(**{f"{name}__{'lt' if desc else 'gt'}": position[i]})
+            for j, (prev_name, _) in enumerate(fields[:i]):
+                step &= Q(**{prev_name: position[j]})
+            condition |= step
+        leading, desc = fields[0]
+        return Q(**{f"{leading}__{'lte' if desc else 'gte'}": position[0]}) & condition
+
+    @staticmethod
+    def _position(obj, names):
+        values = []
+        for name in names:
+            value = getattr(obj, name)
+            # isoformat() keeps microseconds, which keyset comparisons need
+            values.append(value.isoformat() if hasattr(value, "isoformat") else str(value))
+        return values
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            return list(payload["p"]), bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message) from None
+
+    def _link(self, position, reverse):
+        token = base64.urlsafe_b64encode(
+            json.dumps({"p": position, "r": reverse}, separators=(",", ":")).encode()
+        ).decode("ascii")
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
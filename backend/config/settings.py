@@ -217,7 +217,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "config.pagination.OptionalCursorPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_FILTER_BACKENDS": [
         "rest_framework.filters.SearchFilter",
@@ -226,6 +226,10 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Raise instead of logging when a list endpoint lazy-loads a relation while
+# serializing (apps/core/eager_loading.py); the test suite always turns it on
+EAGER_LOADING_STRICT = os.getenv("EAGER_LOADING_STRICT", "False") == "True"
+
 # API Documentation (drf-spectacular)
 SPECTACULAR_SETTINGS = {
     "TITLE": "StudioSync API",
@@ -264,13 +268,18 @@ Q_CLUSTER = {
     "orm": "default",  # Use Postgres (default DB)
 }
 
-# Channels settings (Single-node/In-memory)
+# Channels settings (in-memory, single process, unless CHANNEL_LAYER=postgres)
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels.layers.InMemoryChannelLayer",
     },
 }
 
+# CHANNEL_LAYER=postgres shares group messages between daphne workers and
+# Django-Q workers through the database (see apps/core/channel_layer.py)
+if os.getenv("CHANNEL_LAYER", "memory") == "postgres":
+    CHANNEL_LAYERS["default"] = {"BACKEND": "apps.core.channel_layer.PostgresChannelLayer"}
+
 ### Docs???
 
 # Email Configuration (Uses custom backend to read from DB)
@@ -0,0 +1,250 @@
+"""
+Tests for teacher and room double-booking prevention.
+"""
+
+import importlib
+from datetime import UTC, datetime, timedelta
+
+from django.db import IntegrityError, connection
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.core.booking import enforced_constraints
+from apps.inventory.models import PracticeRoom, RoomReservation
+from apps.lessons.models import Lesson
+
+START = datetime(2026, 3, 10, 15, 0, tzinfo=UTC)
+
+
+@pytest.fixture
+def room(studio):
+    return PracticeRoom.objects.create(studio=studio, name="Room A")
+
+
+@pytest.fixture
+def booked(studio, teacher, student, room):
+    return Lesson.objects.create(
+        studio=studio,
+        teacher=teacher,
+        student=student,
+        room=room,
+        scheduled_start=START,
+        scheduled_end=START + timedelta(hours=1),
+    )
+
+
+def _lesson_payload(studio, teacher, student, start, minutes=60, **extra):
+    return {
+        "studio": str(studio.id),
+        "teacher": str(teacher.id),
+        "student": str(student.id),
+        "scheduled_start": start.isoformat(),
+        "scheduled_end": (start + timedelta(minutes=minutes)).isoformat(),
+        **extra,
+    }
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestLessonDoubleBooking:
+    """Test overlap rejection on /api/lessons/."""
+
+    def test_teacher_overlap_is_409(self, authenticated_client, booked, studio, teacher, student):
+        response = authenticated_client.post(
+            reverse("lesson-list"),
+            _lesson_payload(studio, teacher, student, START + timedelta(minutes=30)),
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.data["code"] == "booking_conflict"
+        assert response.data["resource"] == "teacher"
+        assert response.data["conflicts"][0]["id"] == str(booked.id)
+        assert Lesson.objects.count() == 1
+
+    def test_back_to_back_is_allowed(self, authenticated_client, booked, studio, teacher, student):
+        response = authenticated_client.post(
+            reverse("lesson-list"),
+            _lesson_payload(studio, teacher, student, START + timedelta(hours=1)),
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_cancelled_lesson_frees_the_slot(
+        self, authenticated_client, booked, studio, teacher, student
+    ):
+        booked.status = "cancelled"
+        booked.save()
+
+        response = authenticated_client.post(
+            reverse("lesson-list"), _lesson_payload(studio, teacher, student, START), format="json"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_room_overlap_with_another_teacher(
+        self, authenticated_client, booked, studio, student, room, django_user_model
+    ):
+        other = django_user_model.objects.create_user(
+            email="other@test.com",
+            password="x",
+            first_name="Other",
+            last_name="Teacher",
+            role="teacher",
+        )
+        other.teacher_profile.studio = studio
+        other.teacher_profile.save()
+
+        response = authenticated_client.post(
+            reverse("lesson-list"),
+            _lesson_payload(studio, other.teacher_profile, student, START, room=str(room.id)),
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.data["resource"] == "room"
+
+    def test_reschedule_into_overlap_is_409(
+        self, authenticated_client, booked, studio, teacher, student
+    ):
+        later = Lesson.objects.create(
+            studio=studio,
+            teacher=teacher,
+            student=student,
+            scheduled_start=START + timedelta(hours=2),
+            scheduled_end=START + timedelta(hours=3),
+        )
+
+        response = authenticated_client.patch(
+            reverse("lesson-detail", args=[later.id]),
+            {
+                "scheduled_start": (START + timedelta(minutes=45)).isoformat(),
+                "scheduled_end": (START + timedelta(minutes=105)).isoformat(),
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        later.refresh_from_db()
+        assert later.scheduled_start == START + timedelta(hours=2)
+
+    def test_end_before_start_rejected(self, authenticated_client, studio, teacher, student):
+        response = authenticated_client.post(
+            reverse("lesson-list"),
+            _lesson_payload(studio, teacher, student, START, minutes=-30),
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestReservationDoubleBooking:
+    """Test overlap rejection on /api/inventory/reservations/."""
+
+    def test_room_overlap_is_409(self, student_authenticated_client, student, room):
+        RoomReservation.objects.create(
+            room=room,
+            student=student,
+            start_time=START,
+            end_time=START + timedelta(hours=1),
+            status="confirmed",
+        )
+
+        response = student_authenticated_client.post(
+            reverse("reservation-list"),
+            {
+                "room": room.id,
+                "student": str(student.id),
+                "start_time": (START + timedelta(minutes=15)).isoformat(),
+                "end_time": (START + timedelta(minutes=75)).isoformat(),
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.data["resource"] == "room"
+        assert RoomReservation.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_database_rejects_overlap_when_constraint_installed(booked):
+    if "lessons_no_teacher_overlap" not in enforced_constraints():
+        pytest.skip("exclusion constraints need PostgreSQL with btree_gist")
+
+    with pytest.raises(IntegrityError):
+        Lesson.objects.create(
+            studio=booked.studio,
+            teacher=booked.teacher,
+            scheduled_start=START + timedelta(minutes=10),
+            scheduled_end=START + timedelta(minutes=20),
+        )
+
+
+LESSON_MIGRATION = "apps.lessons.migrations.0011_lesson_overlap_exclusion_constraints"
+RESERVATION_MIGRATION = "apps.inventory.migrations.0004_reservation_overlap_exclusion_constraint"
+
+
+def _drop_constraints(table, names):
+    """Drop exclusion constraints until the test's rollback, so conflicts can be seeded."""
+    if connection.vendor != "postgresql":
+        pytest.skip("exclusion constraints need PostgreSQL")
+    with connection.cursor() as cursor:
+        # Fire deferred FK checks from fixture rows; ALTER TABLE refuses to run past them
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for name in names:
+            cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}")
+
+
+def _find_conflicts(migration, *args):
+    with connection.cursor() as cursor:
+        return migration.find_conflicts(cursor, *args)
+
+
+@pytest.mark.django_db
+def test_lesson_constraint_migration_lists_existing_overlaps(booked):
+    migration = importlib.import_module(LESSON_MIGRATION)
+    _drop_constraints("lessons", migration.CONSTRAINTS)
+    overlapping = Lesson.objects.create(
+        studio=booked.studio,
+        teacher=booked.teacher,
+        scheduled_start=START + timedelta(minutes=30),
+        scheduled_end=START + timedelta(minutes=90),
+    )
+
+    first, second = sorted([booked.pk, overlapping.pk])
+    assert _find_conflicts(migration) == [
+        f"lessons {first} and {second} overlap (lessons_no_teacher_overlap)"
+    ]
+
+
+@pytest.mark.django_db
+def test_lesson_constraint_migration_lists_inverted_lessons(booked):
+    migration = importlib.import_module(LESSON_MIGRATION)
+    _drop_constraints("lessons", migration.CONSTRAINTS)
+    Lesson.objects.filter(pk=booked.pk).update(scheduled_end=START - timedelta(hours=1))
+
+    assert _find_conflicts(migration) == [f"lesson {booked.pk} ends before it starts"]
+
+
+@pytest.mark.django_db
+def test_reservation_constraint_migration_lists_existing_overlaps(student, room):
+    migration = importlib.import_module(RESERVATION_MIGRATION)
+    table = RoomReservation._meta.db_table
+    _drop_constraints(table, [migration.CONSTRAINT])
+    first, second = [
+        RoomReservation.objects.create(
+            room=room,
+            student=student,
+            start_time=START + timedelta(minutes=offset),
+            end_time=START + timedelta(minutes=offset + 60),
+            status="confirmed",
+        )
+        for offset in (0, 30)
+    ]
+
+    assert _find_conflicts(migration, table) == [f"reservations {first.pk} and {second.pk} overlap"]
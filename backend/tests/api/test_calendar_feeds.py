@@ -0,0 +1,144 @@
+"""
+Tests for cached, conditional ICS feeds and tokenised subscription URLs.
+"""
+
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+
+from apps.core.models import Teacher, User
+from apps.lessons import feeds
+from apps.lessons.calendar_utils import generate_teacher_calendar
+from apps.lessons.models import Lesson
+
+
+def _lesson(studio, teacher, student, days=1):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=days)
+    return Lesson.objects.create(
+        studio=studio,
+        teacher=teacher,
+        student=student,
+        scheduled_start=start,
+        scheduled_end=start + timedelta(hours=1),
+        summary="Scales",
+    )
+
+
+@pytest.fixture
+def feed_url(teacher_authenticated_client, teacher):
+    response = teacher_authenticated_client.get(reverse("calendar-subscription"))
+    return response.data["url"]
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestSubscriptionFeeds:
+    """Test /api/lessons/calendar/feed/<token>.ics."""
+
+    def test_token_url_needs_no_auth(self, api_client, feed_url, studio, teacher, student):
+        lesson = _lesson(studio, teacher, student)
+
+        response = api_client.get(feed_url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/calendar; charset=utf-8"
+        assert response["ETag"]
+        assert f"lesson-{lesson.id}@musicstudio.local".encode() in response.content
+        assert b"Notes: Scales" in response.content
+
+    def test_matching_etag_gets_304(self, api_client, feed_url):
+        first = api_client.get(feed_url)
+
+        second = api_client.get(feed_url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert second.content == b""
+
+    def test_cached_poll_skips_feed_queries(
+        self, api_client, feed_url, studio, teacher, student, django_assert_max_num_queries
+    ):
+        for days in range(5):
+            _lesson(studio, teacher, student, days=days + 1)
+        api_client.get(feed_url)
+
+        # token lookup + cache read
+        with django_assert_max_num_queries(2):
+            api_client.get(feed_url)
+
+    def test_lesson_write_invalidates(
+        self, api_client, feed_url, studio, teacher, student, django_capture_on_commit_callbacks
+    ):
+        before = api_client.get(feed_url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            lesson = _lesson(studio, teacher, student)
+        after = api_client.get(feed_url, HTTP_IF_NONE_MATCH=before["ETag"])
+
+        assert after.status_code == status.HTTP_200_OK
+        assert after["ETag"] != before["ETag"]
+        assert str(lesson.id).encode() in after.content
+
+    def test_write_during_render_is_not_cached(self, api_client, feed_url, monkeypatch):
+        render = feeds.WRITERS["teacher"]
+        renders = []
+
+        def render_racing_a_write(teacher):
+            renders.append(teacher.pk)
+            yield from render(teacher)
+            if len(renders) == 1:
+                # A lesson write commits while the old body is still being rendered
+                feeds.bump_feed_version(feeds.feed_cache_key("teacher", teacher.pk))
+
+        monkeypatch.setitem(feeds.WRITERS, "teacher", render_racing_a_write)
+        api_client.get(feed_url)
+        api_client.get(feed_url)
+        api_client.get(feed_url)
+
+        assert len(renders) == 2
+
+    def test_reassigned_lesson_leaves_old_teacher_feed(
+        self, api_client, feed_url, studio, teacher, student, django_capture_on_commit_callbacks
+    ):
+        lesson = _lesson(studio, teacher, student)
+        before = api_client.get(feed_url)
+        substitute_user = User.objects.create_user(
+            email="substitute@test.com", password="testpass123", role="teacher"
+        )
+        substitute, _ = Teacher.objects.get_or_create(
+            user=substitute_user, defaults={"studio": studio}
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            lesson.teacher = substitute
+            lesson.save()
+        after = api_client.get(feed_url, HTTP_IF_NONE_MATCH=before["ETag"])
+
+        assert after.status_code == status.HTTP_200_OK
+        assert str(lesson.id).encode() not in after.content
+
+    def test_rotation_revokes_old_url(self, api_client, teacher_authenticated_client, feed_url):
+        rotated = teacher_authenticated_client.post(reverse("calendar-subscription"))
+
+        assert rotated.data["url"] != feed_url
+        assert api_client.get(feed_url).status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get(rotated.data["url"]).status_code == status.HTTP_200_OK
+
+    def test_unknown_token_is_404(self, api_client):
+        url = reverse("calendar-subscription-feed", args=["not-a-token"])
+
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_teacher_feed_query_count_is_flat(studio, teacher, student, django_assert_num_queries):
+    for days in range(5):
+        _lesson(studio, teacher, student, days=days + 1)
+    # Loaded with its user, as the feed view does, so only the lesson query counts
+    teacher = Teacher.objects.select_related("user").get(pk=teacher.pk)
+
+    with django_assert_num_queries(1):
+        generate_teacher_calendar(teacher)
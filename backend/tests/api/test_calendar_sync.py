@@ -0,0 +1,103 @@
+"""
+Tests for the diff-based bulk sync of imported calendar events.
+"""
+
+import math
+from datetime import UTC, datetime, timedelta
+
+from django.db import connection
+from django.db.models import Q
+
+import pytest
+
+from apps.core.bulk_sync import BATCH_SIZE, sync_rows
+from apps.core.models import Band
+from apps.gigs.models import BandExternalEvent
+from apps.lessons.import_calendar_views import _parse_and_upsert_events
+from apps.lessons.models import ExternalCalendarEvent, ExternalCalendarFeed
+
+BASE = datetime(2026, 3, 10, 9, 0, tzinfo=UTC)
+
+
+def _ics(events):
+    """Build a VCALENDAR from (uid, summary) pairs, one hour apart."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Test//Test//EN"]
+    for i, (uid, summary) in enumerate(events):
+        start = BASE + timedelta(hours=i)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{uid}",
+            f"SUMMARY:{summary}",
+            f"DTSTART:{start:%Y%m%dT%H%M%SZ}",
+            f"DTEND:{start + timedelta(minutes=30):%Y%m%dT%H%M%SZ}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines).encode()
+
+
+def _insert_batches(model, count):
+    """INSERT statements bulk_create needs for `count` rows on this database."""
+    fields = model._meta.concrete_fields
+    per_statement = connection.ops.bulk_batch_size(fields, range(count)) or count
+    return math.ceil(count / min(BATCH_SIZE, per_statement))
+
+
+@pytest.fixture
+def feed(admin_user):
+    return ExternalCalendarFeed.objects.create(
+        user=admin_user, name="Imported", url="https://example.com/cal.ics"
+    )
+
+
+@pytest.mark.django_db
+class TestExternalFeedSync:
+    """Test _parse_and_upsert_events on top of sync_rows."""
+
+    def test_diff_inserts_updates_and_deletes(self, feed):
+        _parse_and_upsert_events(feed, _ics([("a", "Gig"), ("b", "Rehearsal"), ("c", "Lesson")]))
+        untouched = ExternalCalendarEvent.objects.get(feed=feed, uid="a")
+
+        result = _parse_and_upsert_events(feed, _ics([("a", "Gig"), ("b", "Moved"), ("d", "New")]))
+
+        assert (result.created, result.updated, result.unchanged, result.deleted) == (1, 1, 1, 1)
+        titles = dict(ExternalCalendarEvent.objects.filter(feed=feed).values_list("uid", "title"))
+        assert titles == {"a": "Gig", "b": "Moved", "d": "New"}
+        assert ExternalCalendarEvent.objects.get(uid="a").updated_at == untouched.updated_at
+
+    def test_repeated_uid_keeps_last(self, feed):
+        _parse_and_upsert_events(feed, _ics([("a", "First"), ("a", "Override")]))
+
+        assert ExternalCalendarEvent.objects.get(feed=feed, uid="a").title == "Override"
+
+    def test_large_refresh_is_a_handful_of_queries(self, feed, django_assert_max_num_queries):
+        events = [(f"event-{i}", f"Event {i}") for i in range(2000)]
+        # Fixed overhead plus one INSERT per batch; SQLite's parameter limit
+        # makes its batches smaller than BATCH_SIZE
+        with django_assert_max_num_queries(6 + _insert_batches(ExternalCalendarEvent, 2000)):
+            _parse_and_upsert_events(feed, _ics(events))
+
+        events[5] = ("event-5", "Changed")
+        with django_assert_max_num_queries(10):
+            result = _parse_and_upsert_events(feed, _ics(events[:-100]))
+
+        assert (result.updated, result.deleted) == (1, 100)
+        assert ExternalCalendarEvent.objects.filter(feed=feed).count() == 1900
+
+
+@pytest.mark.django_db
+def test_band_sync_only_prunes_future_events(studio, student):
+    band = Band.objects.create(studio=studio, primary_contact=student.user, name="The Band")
+    now = datetime.now(UTC)
+    rows = {
+        uid: {"title": uid, "description": "", "start_time": start, "end_time": start}
+        for uid, start in (("past", now - timedelta(days=3)), ("future", now + timedelta(days=3)))
+    }
+    sync_rows(BandExternalEvent, {"band": band}, rows)
+
+    result = sync_rows(BandExternalEvent, {"band": band}, {}, prune=Q(start_time__gte=now))
+
+    assert result.deleted == 1
+    assert list(BandExternalEvent.objects.filter(band=band).values_list("uid", flat=True)) == [
+        "past"
+    ]
@@ -0,0 +1,138 @@
+"""
+Tests for AnnotatedCountField counters on list endpoints.
+"""
+
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+
+from apps.core.eager_loading import _condition, plan_for
+from apps.core.models import Band, Studio
+from apps.core.serializers import BandSerializer
+from apps.gigs.models import Gig, Venue
+from apps.messaging.models import Message, MessageThread, ThreadReadState
+from apps.resources.models import Resource, ResourceFolder
+from apps.resources.serializers import ResourceFolderSerializer
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so views resolve the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+def _queries(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return len(captured), response.data["results"]
+
+
+class TestCounterPlan:
+    """Test how counters are turned into annotations."""
+
+    def test_single_counter_is_a_join(self):
+        sql = str(plan_for(BandSerializer).apply(Band.objects.all()).query)
+
+        assert "COUNT(" in sql and "GROUP BY" in sql
+
+    def test_several_counters_use_subqueries(self):
+        sql = str(plan_for(ResourceFolderSerializer).apply(ResourceFolder.objects.all()).query)
+
+        assert "GROUP BY" not in sql.split("FROM")[-1]
+        assert sql.count("SELECT COUNT(") == 2
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestCountersOnListEndpoints:
+    """Test that counters cost no per-row queries."""
+
+    def test_folder_counts_are_flat(self, authenticated_client, studio, admin_user):
+        def add_folders(start, count):
+            for i in range(start, start + count):
+                folder = ResourceFolder.objects.create(
+                    studio=studio, name=f"Folder {i}", created_by=admin_user
+                )
+                ResourceFolder.objects.create(
+                    studio=studio, name=f"Child {i}", parent=folder, created_by=admin_user
+                )
+                for n in range(2):
+                    Resource.objects.create(
+                        studio=studio, title=f"R{n}", resource_type="other", folder=folder
+                    )
+
+        url = reverse("resource-folder-list") + "?page_size=100"
+        add_folders(0, 2)
+        _queries(authenticated_client, url)  # warm the request user's profile lookups
+        few, _ = _queries(authenticated_client, url)
+        add_folders(2, 8)
+        many, results = _queries(authenticated_client, url)
+
+        assert few == many
+        parents = [r for r in results if r["name"].startswith("Folder")]
+        assert {(r["children_count"], r["resources_count"]) for r in parents} == {(1, 2)}
+
+    def test_venue_counts_are_flat(self, authenticated_client, studio):
+        def add_venues(first, count):
+            start = timezone.now() + timedelta(days=7)
+            for i in range(first, first + count):
+                venue = Venue.objects.create(studio=studio, name=f"Venue {i}")
+                for n in range(3):
+                    Gig.objects.create(
+                        studio=studio,
+                        title=f"Gig {n}",
+                        venue_ref=venue,
+                        scheduled_start=start,
+                        scheduled_end=start + timedelta(hours=2),
+                    )
+
+        url = reverse("venue-list")
+        add_venues(0, 2)
+        _queries(authenticated_client, url)
+        few, _ = _queries(authenticated_client, url)
+        add_venues(2, 8)
+        many, results = _queries(authenticated_client, url)
+
+        assert few == many
+        assert {r["gigs_count"] for r in results} == {3}
+
+    def test_write_responses_fall_back_to_a_count(self, authenticated_client, studio, student):
+        band = Band.objects.create(studio=studio, name="Band")
+        band.members.add(student)
+
+        response = authenticated_client.patch(
+            reverse("band-detail", args=[band.id]), {"genre": "Jazz"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["members_count"] == 1
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+def test_unread_count_is_per_request_user(api_client, studio, admin_user, teacher_user):
+    thread = MessageThread.objects.create(studio=studio, subject="Hello")
+    thread.participants.add(admin_user, teacher_user)
+    for i in range(3):
+        message = Message.objects.create(thread=thread, sender=teacher_user, body=f"m{i}")
+        if i == 0:
+            ThreadReadState.mark_read(thread, admin_user, message)
+
+    url = reverse("thread-detail", args=[thread.id])
+    api_client.force_authenticate(user=admin_user)
+    assert api_client.get(url).data["unread_count"] == 2
+    api_client.force_authenticate(user=teacher_user)
+    assert api_client.get(url).data["unread_count"] == 0
+
+
+def test_callable_filters_need_a_request():
+    assert _condition(lambda request: Q(pk=1), None) is None
+    assert _condition(None, None) == Q()
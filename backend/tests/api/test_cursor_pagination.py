@@ -0,0 +1,106 @@
+"""
+Tests for the opt-in keyset (cursor) pagination mode.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.lessons.models import Lesson
+from apps.notifications.models import Notification
+
+
+def _ids(response):
+    return [item["id"] for item in response.data["results"]]
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestCursorPagination:
+    """Test ?pagination=cursor on list endpoints."""
+
+    @pytest.fixture
+    def notifications(self, admin_user):
+        return [
+            Notification.objects.create(
+                user=admin_user,
+                notification_type="system",
+                title=f"Notice {i}",
+                message="Hello",
+            )
+            for i in range(25)
+        ]
+
+    def test_page_number_mode_is_the_default(self, authenticated_client, notifications):
+        response = authenticated_client.get(reverse("notification-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 25
+        assert len(response.data["results"]) == 20
+
+    def test_cursor_pages_forward_and_back(self, authenticated_client, notifications):
+        url = reverse("notification-list")
+        first = authenticated_client.get(url, {"pagination": "cursor"})
+
+        assert "count" not in first.data
+        assert first.data["previous"] is None
+        assert len(first.data["results"]) == 20
+
+        second = authenticated_client.get(first.data["next"])
+        assert len(second.data["results"]) == 5
+        assert second.data["next"] is None
+        assert not set(_ids(first)) & set(_ids(second))
+
+        back = authenticated_client.get(second.data["previous"])
+        assert _ids(back) == _ids(first)
+        assert back.data["previous"] is None
+
+    def test_ties_on_the_leading_column_are_not_skipped(
+        self, authenticated_client, studio, teacher, student
+    ):
+        start = datetime(2026, 3, 10, 15, 0, tzinfo=UTC)
+        for _ in range(23):
+            Lesson.objects.create(
+                studio=studio,
+                teacher=teacher,
+                student=student,
+                scheduled_start=start,
+                scheduled_end=start + timedelta(hours=1),
+            )
+
+        url = reverse("lesson-list")
+        first = authenticated_client.get(url, {"pagination": "cursor"})
+        second = authenticated_client.get(first.data["next"])
+
+        seen = _ids(first) + _ids(second)
+        assert len(seen) == 23
+        assert len(set(seen)) == 23
+
+    def test_invalid_cursor_is_404(self, authenticated_client):
+        response = authenticated_client.get(reverse("notification-list"), {"cursor": "garbage"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_deep_page_skips_count_query(
+        self, authenticated_client, notifications, django_assert_num_queries
+    ):
+        first = authenticated_client.get(reverse("notification-list"), {"pagination": "cursor"})
+
+        # one range read for the page; no COUNT(*)
+        with django_assert_num_queries(1):
+            authenticated_client.get(first.data["next"])
+
+    def test_cursor_seeks_on_the_leading_column(
+        self, authenticated_client, notifications, django_assert_num_queries
+    ):
+        first = authenticated_client.get(reverse("notification-list"), {"pagination": "cursor"})
+
+        with django_assert_num_queries(1) as captured:
+            authenticated_client.get(first.data["next"])
+
+        # A plain bound beside the OR chain, so the index range scan starts at the cursor
+        sql = captured.captured_queries[0]["sql"]
+        assert '"notifications_notification"."created_at" <= ' in sql
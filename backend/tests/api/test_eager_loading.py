@@ -0,0 +1,110 @@
+"""
+Tests for serializer-driven eager loading of list endpoints.
+"""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+
+from apps.billing.models import Invoice, Payment
+from apps.billing.serializers import InvoiceSerializer
+from apps.core.eager_loading import LazyLoadError, plan_for
+from apps.core.models import Band, Student, User
+from apps.core.serializers import BandSerializer
+from apps.gigs.serializers import GigClaimSerializer
+from apps.lessons.serializers import LessonListSerializer
+
+
+def _students(studio, teacher, count):
+    students = []
+    for i in range(count):
+        user = User.objects.create_user(
+            email=f"member{i}@test.com", password="testpass123", first_name=f"M{i}", role="student"
+        )
+        student, _ = Student.objects.update_or_create(
+            user=user, defaults={"studio": studio, "primary_teacher": teacher}
+        )
+        students.append(student)
+    return students
+
+
+class TestPlan:
+    """Test plan_for()."""
+
+    def test_dotted_sources_are_selected(self):
+        plan = plan_for(LessonListSerializer)
+
+        assert {"student__user", "teacher__user", "room", "band", "lesson_plan"} <= (
+            plan.select_related
+        )
+        assert not plan.prefetch_related
+
+    def test_many_relations_and_hints_are_prefetched(self):
+        assert plan_for(BandSerializer).prefetch_related == {"members", "members__user"}
+        assert plan_for(InvoiceSerializer).prefetch_related == {"line_items", "payments"}
+
+    def test_pk_fields_need_no_join(self):
+        plan = plan_for(GigClaimSerializer)
+
+        assert plan.select_related == {"gig", "gig__venue_ref", "band"}
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestListEndpoints:
+    """Test EagerLoadingMixin on real viewsets."""
+
+    def test_band_list_is_flat(
+        self, authenticated_client, studio, teacher, django_assert_max_num_queries
+    ):
+        members = _students(studio, teacher, 6)
+        for i in range(5):
+            band = Band.objects.create(studio=studio, name=f"Band {i}")
+            band.members.set(members[i : i + 2])
+
+        # bands, count, members, member users (+ auth)
+        with django_assert_max_num_queries(8):
+            response = authenticated_client.get(reverse("band-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [b["members_count"] for b in response.data["results"]] == [2] * 5
+
+    def test_invoice_list_reads_prefetched_payments(self, authenticated_client, studio, student):
+        for i in range(3):
+            invoice = Invoice.objects.create(
+                studio=studio, student=student, due_date=date.today(), total_amount=100
+            )
+            for minutes, txn in ((10, "older"), (5, "newest"), (1, "failed")):
+                Payment.objects.create(
+                    invoice=invoice,
+                    amount=10,
+                    payment_method="stripe",
+                    status="failed" if txn == "failed" else "completed",
+                    transaction_id=f"{txn}-{i}",
+                    processed_at=timezone.now() - timedelta(minutes=minutes),
+                )
+
+        response = authenticated_client.get(reverse("invoice-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(r["stripe_transaction_id"] for r in response.data["results"]) == [
+            "newest-0",
+            "newest-1",
+            "newest-2",
+        ]
+
+    def test_unloaded_relation_is_reported(self, authenticated_client, studio, teacher):
+        band = Band.objects.create(studio=studio, name="Band")
+        band.members.set(_students(studio, teacher, 1))
+        plan_for.cache_clear()
+        try:
+            with patch.object(BandSerializer.Meta, "eager_load", {}):
+                with pytest.raises(LazyLoadError):
+                    authenticated_client.get(reverse("band-list"))
+        finally:
+            plan_for.cache_clear()
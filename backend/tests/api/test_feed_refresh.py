@@ -0,0 +1,208 @@
+"""
+Tests for the scheduled, conditional refresh of external calendar feeds.
+"""
+
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.utils import timezone
+
+import pytest
+
+from apps.core.ical_stream import EXPAND_AHEAD, EXPAND_PAST
+from apps.core.models import Band
+from apps.gigs.models import BandExternalEvent
+from apps.lessons import feed_refresh
+from apps.lessons.models import ExternalCalendarEvent, ExternalCalendarFeed
+
+ICS = b"""BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Test//Test//EN
+BEGIN:VEVENT
+UID:gig-1@example.com
+SUMMARY:Gig
+DTSTART:20990310T190000Z
+DTEND:20990310T220000Z
+END:VEVENT
+END:VCALENDAR
+"""
+
+DAILY_ICS = b"""BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Test//Test//EN
+BEGIN:VEVENT
+UID:practice@example.com
+SUMMARY:Practice
+DTSTART:20260101T090000Z
+DTEND:20260101T100000Z
+RRULE:FREQ=DAILY
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def _response(status_code=200, body=ICS, headers=None):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.headers = headers or {}
+    resp.iter_content = MagicMock(return_value=[body])
+    if status_code >= 400:
+        resp.raise_for_status.side_effect = feed_refresh.requests.HTTPError(str(status_code))
+    return resp
+
+
+@pytest.fixture
+def feed(admin_user):
+    return ExternalCalendarFeed.objects.create(
+        user=admin_user, name="Google", url="https://calendar.example.com/a.ics"
+    )
+
+
+@pytest.mark.django_db
+class TestRefreshFeeds:
+    """Test feed_refresh.refresh_feeds."""
+
+    @patch("apps.lessons.feed_refresh.requests.get")
+    def test_first_fetch_parses_and_stores_validators(self, mock_get, feed):
+        mock_get.return_value = _response(headers={"ETag": '"v1"', "Last-Modified": "Tue"})
+
+        totals = feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS])
+
+        feed.refresh_from_db()
+        assert totals["synced"] == 1
+        assert ExternalCalendarEvent.objects.filter(feed=feed).count() == 1
+        assert (feed.etag, feed.http_last_modified) == ('"v1"', "Tue")
+        assert feed.last_synced_at is not None
+
+    @patch("apps.lessons.feed_refresh.requests.get")
+    def test_sends_conditional_headers_and_honours_304(self, mock_get, feed):
+        ExternalCalendarFeed.objects.filter(pk=feed.pk).update(
+            etag='"v1"', http_last_modified="Tue", content_hash="abc", last_synced_at=timezone.now()
+        )
+        mock_get.return_value = _response(status_code=304)
+
+        totals = feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS], force=True)
+
+        headers = mock_get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+        assert headers["If-Modified-Since"] == "Tue"
+        assert totals["not_modified"] == 1
+        assert not ExternalCalendarEvent.objects.exists()
+
+    @patch("apps.lessons.feed_refresh.requests.get")
+    def test_same_body_is_not_reparsed(self, mock_get, feed):
+        mock_get.return_value = _response()
+        feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS], force=True)
+
+        with patch.object(feed_refresh.EXTERNAL_FEEDS, "sync") as mock_sync:
+            totals = feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS], force=True)
+
+        assert totals["unchanged"] == 1
+        mock_sync.assert_not_called()
+
+    @patch("apps.lessons.feed_refresh.requests.get")
+    def test_unchanged_body_is_reparsed_as_the_window_moves(self, mock_get, feed):
+        mock_get.return_value = _response(body=DAILY_ICS, headers={"ETag": '"v1"'})
+        feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS])
+
+        later = timezone.now() + EXPAND_PAST + EXPAND_AHEAD
+        with patch("django.utils.timezone.now", return_value=later):
+            totals = feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS])
+
+        events = ExternalCalendarEvent.objects.filter(feed=feed)
+        assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+        assert totals["synced"] == 1
+        assert events.filter(start_dt__lt=later - EXPAND_PAST - timedelta(days=1)).count() == 0
+        assert events.filter(start_dt__gt=later + EXPAND_AHEAD - timedelta(days=2)).exists()
+
+    @patch("apps.lessons.feed_refresh.requests.get")
+    def test_manual_sync_records_the_body_it_parsed(self, mock_get, feed):
+        mock_get.return_value = _response()
+        feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS])
+        mock_get.return_value = _response(body=DAILY_ICS)
+        feed_refresh.sync_now(feed_refresh.EXTERNAL_FEEDS, feed)
+
+        # The feed reverts to the body the scheduled run last saw
+        mock_get.return_value = _response()
+        totals = feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS], force=True)
+
+        assert totals["synced"] == 1
+        assert list(ExternalCalendarEvent.objects.values_list("uid", flat=True)) == [
+            "gig-1@example.com"
+        ]
+
+    @patch("apps.lessons.feed_refresh.requests.get")
+    def test_fresh_feeds_are_skipped(self, mock_get, feed):
+        feed.last_synced_at = timezone.now() - timedelta(minutes=5)
+        feed.save()
+
+        feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS])
+
+        mock_get.assert_not_called()
+
+    @patch("apps.lessons.feed_refresh.requests.get")
+    def test_failures_back_off(self, mock_get, feed):
+        mock_get.return_value = _response(status_code=500)
+
+        feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS])
+        feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS])
+
+        feed.refresh_from_db()
+        assert mock_get.call_count == 1
+        assert feed.failure_count == 1
+        assert "500" in feed.last_error
+
+        feed.last_attempted_at -= feed_refresh.RETRY_BASE
+        feed.save()
+        feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS])
+
+        feed.refresh_from_db()
+        assert feed.failure_count == 2
+        assert feed_refresh.next_attempt(feed_refresh.EXTERNAL_FEEDS, feed) == (
+            feed.last_attempted_at + 2 * feed_refresh.RETRY_BASE
+        )
+
+    @patch("apps.lessons.feed_refresh.requests.get")
+    def test_band_feeds_share_the_scheduler(self, mock_get, studio, student):
+        band = Band.objects.create(
+            studio=studio,
+            primary_contact=student.user,
+            name="The Band",
+            billing_email="band@test.com",
+            ical_feed_url="https://calendar.example.com/band.ics",
+        )
+        mock_get.return_value = _response()
+
+        totals = feed_refresh.refresh_feeds()
+
+        band.refresh_from_db()
+        assert totals["synced"] == 1
+        assert band.last_calendar_sync is not None
+        assert BandExternalEvent.objects.filter(band=band).count() == 1
+
+    @patch("apps.lessons.feed_refresh.requests.get")
+    def test_per_host_concurrency_is_bounded(self, mock_get, admin_user):
+        for i in range(6):
+            ExternalCalendarFeed.objects.create(
+                user=admin_user, name=f"Feed {i}", url=f"https://one.example.com/{i}.ics"
+            )
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def slow_get(url, **kwargs):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            return _response(status_code=304)
+
+        mock_get.side_effect = slow_get
+
+        feed_refresh.refresh_feeds([feed_refresh.EXTERNAL_FEEDS])
+
+        assert mock_get.call_count == 6
+        assert active["peak"] <= feed_refresh.HOST_CONCURRENCY
@@ -0,0 +1,144 @@
+"""
+Tests for the streaming ICS writer, pinned to the icalendar-built feeds.
+"""
+
+from datetime import UTC, datetime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+
+from apps.lessons import calendar_utils, ics
+from apps.lessons.models import Lesson
+
+NOW = datetime(2026, 3, 10, 12, 0, 30, 123456, tzinfo=UTC)
+
+
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch):
+    # Both writers stamp DTSTAMP and pick their window from timezone.now()
+    monkeypatch.setattr(timezone, "now", lambda: NOW)
+
+
+@pytest.fixture
+def lessons(studio, teacher, student):
+    student.user.first_name = "Zoë"
+    student.user.last_name = "O'Brien, Jr.; III"
+    student.user.save()
+    student.instrument = "Piano, Voice"
+    student.save()
+
+    cases = [
+        {"summary": "Scales\nthen arpeggios; \\N slowly, " + "x" * 120},
+        {"lesson_type": "online", "status": "completed"},
+        {"location": "Salle de répétition n° 3 — " + "ü" * 60, "status": "no_show"},
+        {"lesson_type": "makeup", "summary": ""},
+    ]
+    created = []
+    for days, fields in enumerate(cases, start=1):
+        start = NOW.replace(microsecond=0) + timedelta(days=days, minutes=7)
+        created.append(
+            Lesson.objects.create(
+                studio=studio,
+                teacher=teacher,
+                student=student,
+                scheduled_start=start,
+                scheduled_end=start + timedelta(minutes=45),
+                **fields,
+            )
+        )
+    # Outside the window / cancelled: left out of both
+    Lesson.objects.create(
+        studio=studio,
+        teacher=teacher,
+        student=student,
+        scheduled_start=NOW - timedelta(days=45),
+        scheduled_end=NOW - timedelta(days=45) + timedelta(hours=1),
+    )
+    Lesson.objects.create(
+        studio=studio,
+        teacher=teacher,
+        student=student,
+        scheduled_start=NOW + timedelta(days=2),
+        scheduled_end=NOW + timedelta(days=2, hours=1),
+        status="cancelled",
+    )
+    return created
+
+
+@pytest.mark.django_db
+class TestStreamingWriter:
+    """Test apps.lessons.ics against calendar_utils."""
+
+    def test_teacher_feed_matches(self, lessons, teacher):
+        expected = calendar_utils.generate_teacher_calendar(teacher)
+
+        assert b"".join(ics.iter_teacher_calendar(teacher)) == expected
+
+    def test_student_feed_matches(self, lessons, student):
+        expected = calendar_utils.generate_student_calendar(student)
+
+        assert b"".join(ics.iter_student_calendar(student)) == expected
+
+    def test_studio_feed_matches(self, lessons, studio):
+        expected = calendar_utils.generate_studio_calendar(studio)
+
+        assert b"".join(ics.iter_studio_calendar(studio)) == expected
+
+    def test_empty_feed_matches(self, teacher):
+        assert b"".join(ics.iter_teacher_calendar(teacher)) == (
+            calendar_utils.generate_teacher_calendar(teacher)
+        )
+
+    def test_fold_counts_octets(self):
+        line = "DESCRIPTION:" + "é" * 80
+
+        folded = ics.fold(line)
+
+        assert all(len(part.encode()) <= 75 for part in folded.split("\r\n"))
+        assert folded.replace("\r\n ", "") == line
+
+    def test_explicit_now_pins_both_writers(self, lessons, studio):
+        later = NOW + timedelta(days=3)
+
+        body = b"".join(ics.iter_studio_calendar(studio, later))
+
+        assert body == calendar_utils.generate_studio_calendar(studio, later)
+        assert body != calendar_utils.generate_studio_calendar(studio)
+
+    def test_benchmark_command_compares_the_writers(self, lessons, studio):
+        out = StringIO()
+
+        call_command("benchmark_ics_feeds", "--studio", str(studio.id), "--rounds", "1", stdout=out)
+
+        assert "Outputs are byte-identical" in out.getvalue()
+
+    def test_large_feed_is_chunked(self, lessons, teacher, monkeypatch):
+        monkeypatch.setattr(ics, "STREAM_BUFFER_SIZE", 512)
+
+        chunks = list(ics.iter_teacher_calendar(teacher))
+
+        assert len(chunks) > 1
+        assert b"".join(chunks) == calendar_utils.generate_teacher_calendar(teacher)
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestStudioFeedStreaming:
+    """Test /api/lessons/calendar/studio/<id>/lessons.ics."""
+
+    def test_miss_streams_then_caches(self, authenticated_client, studio, lessons):
+        url = reverse("studio-calendar-feed", args=[studio.id])
+
+        first = authenticated_client.get(url)
+        body = b"".join(first.streaming_content)
+        second = authenticated_client.get(url)
+
+        assert first.streaming
+        assert body == calendar_utils.generate_studio_calendar(studio)
+        assert not second.streaming
+        assert second.content == body
+        assert second["ETag"]
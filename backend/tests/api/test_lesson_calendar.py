@@ -0,0 +1,92 @@
+"""
+Tests for the compact lesson calendar range endpoint.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.lessons.models import Lesson
+
+WEEK = {"start": "2026-03-09", "end": "2026-03-16"}
+
+
+@pytest.fixture
+def week_of_lessons(studio, teacher, student):
+    start = datetime(2026, 3, 9, 15, 0, tzinfo=UTC)
+    return [
+        Lesson.objects.create(
+            studio=studio,
+            teacher=teacher,
+            student=student,
+            scheduled_start=start + timedelta(days=day),
+            scheduled_end=start + timedelta(days=day, hours=1),
+        )
+        for day in range(5)
+    ]
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestLessonCalendar:
+    """Test /api/lessons/calendar."""
+
+    def test_names_listed_once(self, authenticated_client, week_of_lessons, teacher, student):
+        response = authenticated_client.get(reverse("lesson-calendar"), WEEK)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["events"]) == 5
+        assert response.data["teachers"] == {str(teacher.id): teacher.user.get_full_name()}
+        assert response.data["students"] == {
+            str(student.id): {"name": student.user.get_full_name(), "instrument": "Piano"}
+        }
+        event = response.data["events"][0]
+        assert event["teacher"] == str(teacher.id)
+        assert event["student"] == str(student.id)
+        assert "teacher_name" not in event
+
+    def test_overlapping_lessons_included(self, authenticated_client, studio, teacher, student):
+        # Starts before the window and ends inside it
+        Lesson.objects.create(
+            studio=studio,
+            teacher=teacher,
+            student=student,
+            scheduled_start=datetime(2026, 3, 8, 23, 30, tzinfo=UTC),
+            scheduled_end=datetime(2026, 3, 9, 0, 30, tzinfo=UTC),
+        )
+
+        response = authenticated_client.get(reverse("lesson-calendar"), WEEK)
+
+        assert len(response.data["events"]) == 1
+
+    def test_single_query(self, authenticated_client, week_of_lessons, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            authenticated_client.get(reverse("lesson-calendar"), WEEK)
+
+    def test_window_is_bounded(self, authenticated_client):
+        url = reverse("lesson-calendar")
+
+        too_wide = authenticated_client.get(url, {"start": "2026-01-01", "end": "2026-06-01"})
+        missing = authenticated_client.get(url, {"start": "2026-01-01"})
+        backwards = authenticated_client.get(url, {"start": "2026-03-02", "end": "2026-03-01"})
+
+        assert too_wide.status_code == status.HTTP_400_BAD_REQUEST
+        assert missing.status_code == status.HTTP_400_BAD_REQUEST
+        assert backwards.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_students_only_see_their_lessons(
+        self, student_authenticated_client, week_of_lessons, studio, teacher
+    ):
+        Lesson.objects.create(
+            studio=studio,
+            teacher=teacher,
+            scheduled_start=datetime(2026, 3, 10, 18, 0, tzinfo=UTC),
+            scheduled_end=datetime(2026, 3, 10, 19, 0, tzinfo=UTC),
+        )
+
+        response = student_authenticated_client.get(reverse("lesson-calendar"), WEEK)
+
+        assert len(response.data["events"]) == 5
@@ -0,0 +1,189 @@
+"""
+Tests for the teacher booking-slot finder.
+"""
+
+from datetime import UTC, datetime, time, timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+
+from apps.core.availability import parse_weekly_availability
+from apps.inventory.models import PracticeRoom, RoomReservation
+from apps.lessons.models import ExternalCalendarEvent, ExternalCalendarFeed, Lesson
+from apps.lessons.slots import find_open_slots, subtract_intervals
+
+
+def _next_monday():
+    today = timezone.localdate()
+    return today + timedelta(days=(7 - today.weekday()) or 7)
+
+
+def _at(day, hour, minute=0):
+    return datetime.combine(day, time(hour, minute), tzinfo=UTC)
+
+
+@pytest.fixture
+def monday():
+    return _next_monday()
+
+
+@pytest.fixture
+def available_teacher(teacher):
+    teacher.availability = {"monday": [{"start": "09:00", "end": "12:00"}]}
+    teacher.booking_buffer_minutes = 15
+    teacher.save()
+    return teacher
+
+
+def _starts(slots):
+    return [(start.hour, start.minute) for start, _ in slots]
+
+
+def test_parse_weekly_availability_merges_and_skips_bad_entries():
+    weekly = parse_weekly_availability(
+        {
+            "Monday": [["09:00", "10:00"], {"start": "09:30", "end": "11:00"}],
+            "2": [{"start": "15:00", "end": "14:00"}, "nonsense"],
+            "funday": [["09:00", "10:00"]],
+        }
+    )
+
+    assert weekly == {0: [(540, 660)]}
+
+
+def test_subtract_intervals_sweep():
+    windows = [(0, 10), (20, 30)]
+    busy = [(2, 4), (3, 5), (8, 22), (25, 26)]
+
+    assert subtract_intervals(windows, busy) == [(0, 2), (5, 8), (22, 25), (26, 30)]
+
+
+@pytest.mark.django_db
+class TestFindOpenSlots:
+    """Test find_open_slots."""
+
+    def test_lessons_are_removed_with_buffer(self, available_teacher, studio, monday):
+        Lesson.objects.create(
+            studio=studio,
+            teacher=available_teacher,
+            scheduled_start=_at(monday, 10),
+            scheduled_end=_at(monday, 11),
+        )
+
+        slots = find_open_slots(
+            available_teacher, _at(monday, 0), _at(monday, 23), timedelta(minutes=30)
+        )
+
+        assert _starts(slots) == [(9, 0), (9, 15), (11, 15), (11, 30)]
+
+    def test_external_events_and_room_reservations_block(
+        self, available_teacher, studio, student, monday
+    ):
+        feed = ExternalCalendarFeed.objects.create(
+            user=available_teacher.user, name="Personal", url="https://example.com/cal.ics"
+        )
+        ExternalCalendarEvent.objects.create(
+            feed=feed, uid="dentist", start_dt=_at(monday, 9), end_dt=_at(monday, 10)
+        )
+        room = PracticeRoom.objects.create(studio=studio, name="Room A")
+        RoomReservation.objects.create(
+            room=room,
+            student=student,
+            start_time=_at(monday, 11),
+            end_time=_at(monday, 12),
+            status="confirmed",
+        )
+
+        slots = find_open_slots(
+            available_teacher, _at(monday, 0), _at(monday, 23), timedelta(hours=1), room=room
+        )
+
+        assert _starts(slots) == [(10, 0)]
+
+    def test_query_count_is_independent_of_calendar_density(
+        self, available_teacher, studio, monday, django_assert_num_queries
+    ):
+        for week in range(20):
+            start = _at(monday + timedelta(weeks=week), 9)
+            Lesson.objects.create(
+                studio=studio,
+                teacher=available_teacher,
+                scheduled_start=start,
+                scheduled_end=start + timedelta(minutes=30),
+            )
+
+        with django_assert_num_queries(2):
+            find_open_slots(
+                available_teacher,
+                _at(monday, 0),
+                _at(monday + timedelta(weeks=20), 0),
+                timedelta(minutes=30),
+            )
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestSlotsAPI:
+    """Test /api/lessons/slots."""
+
+    def test_student_sees_teacher_slots(
+        self, student_authenticated_client, student, available_teacher, monday
+    ):
+        response = student_authenticated_client.get(
+            reverse("lesson-slots"),
+            {
+                "teacher": str(available_teacher.id),
+                "start": monday.isoformat(),
+                "end": (monday + timedelta(days=1)).isoformat(),
+                "duration": 60,
+                "step": 60,
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["slots"]) == 3
+
+    def test_teacher_defaults_to_self(
+        self, teacher_authenticated_client, available_teacher, monday
+    ):
+        response = teacher_authenticated_client.get(
+            reverse("lesson-slots"),
+            {"start": monday.isoformat(), "end": (monday + timedelta(days=7)).isoformat()},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["teacher"] == str(available_teacher.id)
+
+    def test_bad_params_rejected(self, student_authenticated_client, available_teacher, monday):
+        url = reverse("lesson-slots")
+        params = {"teacher": str(available_teacher.id), "start": monday.isoformat()}
+
+        missing_end = student_authenticated_client.get(url, params)
+        bad_duration = student_authenticated_client.get(
+            url,
+            {**params, "end": (monday + timedelta(days=1)).isoformat(), "duration": "soon"},
+        )
+
+        assert missing_end.status_code == status.HTTP_400_BAD_REQUEST
+        assert bad_duration.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_malformed_ids_are_404(
+        self, student_authenticated_client, student, available_teacher, monday
+    ):
+        url = reverse("lesson-slots")
+        params = {
+            "teacher": str(available_teacher.id),
+            "start": monday.isoformat(),
+            "end": (monday + timedelta(days=1)).isoformat(),
+        }
+
+        bad_teacher = student_authenticated_client.get(url, {**params, "teacher": "nobody"})
+        bad_room = student_authenticated_client.get(url, {**params, "room": "room-a"})
+
+        assert bad_teacher.status_code == status.HTTP_404_NOT_FOUND
+        assert bad_teacher.data["detail"] == "Teacher not found"
+        assert bad_room.status_code == status.HTTP_404_NOT_FOUND
+        assert bad_room.data["detail"] == "Room not found"
@@ -0,0 +1,102 @@
+"""
+Tests for paged thread message history.
+"""
+
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.core.models import Studio
+from apps.messaging.models import Message, MessageThread, ThreadReadState
+from apps.messaging.views import MessageThreadViewSet
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so views resolve the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(MessageThreadViewSet, "message_page_size", 5)
+
+
+@pytest.fixture
+def thread(studio, admin_user, teacher_user):
+    thread = MessageThread.objects.create(studio=studio, subject="Band")
+    thread.participants.add(admin_user, teacher_user)
+    for i in range(12):
+        Message.objects.create(thread=thread, sender=teacher_user, body=f"m{i}")
+    return thread
+
+
+def _bodies(response):
+    return [m["body"] for m in response.data["results"]]
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestMessageHistory:
+    """Test MessageThreadViewSet.messages paging."""
+
+    def test_latest_page_marks_the_thread_read(self, api_client, admin_user, thread, small_pages):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get(reverse("thread-messages", args=[thread.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert _bodies(response) == ["m7", "m8", "m9", "m10", "m11"]
+        assert response.data["next"] is None
+        assert "before=" in response.data["previous"]
+        assert response.data["results"][0]["sender_details"]["full_name"]
+        state = ThreadReadState.objects.get(thread=thread, user=admin_user)
+        assert state.last_read_message_id == thread.messages.last().id
+
+    def test_paging_backwards_and_forwards(self, api_client, admin_user, thread, small_pages):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse("thread-messages", args=[thread.id])
+
+        older = api_client.get(api_client.get(url).data["previous"])
+        oldest = api_client.get(older.data["previous"])
+
+        assert _bodies(older) == ["m2", "m3", "m4", "m5", "m6"]
+        assert _bodies(oldest) == ["m0", "m1"]
+        assert oldest.data["previous"] is None
+
+        newer = api_client.get(oldest.data["next"])
+        assert _bodies(newer) == ["m2", "m3", "m4", "m5", "m6"]
+        assert "after=" in newer.data["next"]
+
+    def test_older_pages_leave_the_cursor_alone(self, api_client, admin_user, thread, small_pages):
+        api_client.force_authenticate(user=admin_user)
+        middle = thread.messages.all()[6]
+
+        api_client.get(reverse("thread-messages", args=[thread.id]) + f"?before={middle.id}")
+
+        assert not ThreadReadState.objects.filter(user=admin_user).exists()
+
+    def test_query_count_does_not_grow_with_the_thread(
+        self, api_client, admin_user, teacher_user, thread, django_assert_max_num_queries
+    ):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse("thread-messages", args=[thread.id])
+        api_client.get(url)  # warm the request user's profile lookups
+        for i in range(60):
+            Message.objects.create(thread=thread, sender=teacher_user, body=f"n{i}")
+
+        # profile lookups, thread, page (+ sender), read-cursor upsert
+        with django_assert_max_num_queries(6):
+            response = api_client.get(url)
+
+        assert len(response.data["results"]) == MessageThreadViewSet.message_page_size
+
+    def test_unknown_anchor_is_404(self, api_client, admin_user, thread):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse("thread-messages", args=[thread.id])
+
+        assert api_client.get(url + "?before=nope").status_code == status.HTTP_404_NOT_FOUND
+        other = MessageThread.objects.create(studio=thread.studio)
+        stray = Message.objects.create(thread=other, sender=admin_user, body="x")
+        assert api_client.get(url + f"?after={stray.id}").status_code == 404
@@ -0,0 +1,99 @@
+"""
+Tests for full-text search over messages and thread subjects.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.core.models import Studio
+from apps.messaging.models import Message, MessageThread
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so views resolve the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+def _thread(studio, users, subject, *bodies):
+    thread = MessageThread.objects.create(studio=studio, subject=subject)
+    thread.participants.add(*users)
+    for body in bodies:
+        Message.objects.create(thread=thread, sender=users[0], body=body)
+    return thread
+
+
+def _search(client, query):
+    return client.get(reverse("thread-search"), {"q": query})
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestMessageSearch:
+    """Test the threads/search/ endpoint."""
+
+    def test_bodies_and_subjects_are_ranked(self, api_client, studio, admin_user, teacher_user):
+        users = [admin_user, teacher_user]
+        gig = _thread(studio, users, "Saturday gig", "Bring the drums", "See you there")
+        _thread(
+            studio, users, "Rehearsal", "Drums are loud, drums need tuning", "Gig setlist drums"
+        )
+        api_client.force_authenticate(user=admin_user)
+
+        response = _search(api_client, "drums")
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data["results"]
+        assert len(results) == 3
+        assert results[0]["message"]["body"] == "Drums are loud, drums need tuning"
+        ranks = [r["rank"] for r in results]
+        assert ranks == sorted(ranks, reverse=True)
+
+        subject_hit = _search(api_client, "saturday").data["results"]
+        assert [(r["thread"], r["message"]) for r in subject_hit] == [(str(gig.id), None)]
+
+    def test_only_the_users_threads_are_searched(
+        self, api_client, studio, admin_user, teacher_user, student_user
+    ):
+        _thread(studio, [teacher_user, student_user], "Private", "secret setlist")
+        api_client.force_authenticate(user=admin_user)
+
+        assert _search(api_client, "secret").data["results"] == []
+        assert _search(api_client, "private").data["results"] == []
+
+    def test_edits_and_deletes_are_reindexed(self, api_client, studio, admin_user):
+        thread = _thread(studio, [admin_user], "Notes", "tuba")
+        api_client.force_authenticate(user=admin_user)
+        message = thread.messages.get()
+
+        message.body = "trombone"
+        message.save()
+        assert _search(api_client, "tuba").data["results"] == []
+        assert len(_search(api_client, "trombone").data["results"]) == 1
+
+        message.delete()
+        assert _search(api_client, "trombone").data["results"] == []
+
+    def test_user_input_is_not_query_syntax(self, api_client, studio, admin_user):
+        _thread(studio, [admin_user], "Notes", "don't forget the capo")
+        api_client.force_authenticate(user=admin_user)
+
+        response = _search(api_client, 'capo" OR (NEAR')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert _search(api_client, "").status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_search_uses_the_index(self, api_client, studio, admin_user):
+        _thread(studio, [admin_user], "Notes", "metronome")
+        api_client.force_authenticate(user=admin_user)
+
+        with CaptureQueriesContext(connection) as captured:
+            _search(api_client, "metronome")
+
+        sql = " ".join(q["sql"] for q in captured.captured_queries)
+        assert "LIKE" not in sql.upper()
+        assert ("@@" in sql) if connection.vendor == "postgresql" else ("MATCH" in sql)
@@ -0,0 +1,217 @@
+"""
+Tests for recurring pattern expansion into lessons.
+"""
+
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+
+from apps.core.models import Studio
+from apps.lessons.models import Lesson, RecurringPattern
+from apps.lessons.recurrence import (
+    DEFAULT_HORIZON,
+    expand_pattern,
+    find_conflicts,
+    occurrence_dates,
+    occurrence_slots,
+)
+from apps.lessons.tasks import extend_recurring_lessons
+from apps.notifications import outbox
+from apps.notifications.models import Notification, OutboxEvent
+
+
+def _next_weekday(weekday):
+    today = timezone.localdate()
+    return today + timedelta(days=(weekday - today.weekday()) % 7 or 7)
+
+
+@pytest.fixture
+def pattern(teacher, student):
+    return RecurringPattern.objects.create(
+        teacher=teacher,
+        student=student,
+        frequency="weekly",
+        day_of_week=1,
+        time=time(16, 0),
+        duration_minutes=45,
+        start_date=_next_weekday(1),
+    )
+
+
+class TestOccurrenceDates:
+    """Pure date arithmetic, no database."""
+
+    def _pattern(self, frequency, start, day_of_week=0, end=None):
+        return RecurringPattern(
+            frequency=frequency, day_of_week=day_of_week, start_date=start, end_date=end
+        )
+
+    def test_weekly_starts_on_first_matching_weekday(self):
+        # 2026-03-04 is a Wednesday; first Monday on or after is 03-09
+        pattern = self._pattern("weekly", date(2026, 3, 4))
+
+        dates = occurrence_dates(pattern, date(2026, 3, 1), date(2026, 3, 31))
+
+        assert dates == [date(2026, 3, 9), date(2026, 3, 16), date(2026, 3, 23), date(2026, 3, 30)]
+
+    def test_biweekly_keeps_parity_when_resumed(self):
+        pattern = self._pattern("biweekly", date(2026, 3, 2))
+
+        dates = occurrence_dates(pattern, date(2026, 3, 10), date(2026, 4, 30))
+
+        assert dates == [date(2026, 3, 16), date(2026, 3, 30), date(2026, 4, 13), date(2026, 4, 27)]
+
+    def test_monthly_uses_same_nth_weekday(self):
+        # 2026-01-13 is the 2nd Tuesday of January
+        pattern = self._pattern("monthly", date(2026, 1, 13), day_of_week=1)
+
+        dates = occurrence_dates(pattern, date(2026, 1, 1), date(2026, 4, 30))
+
+        assert dates == [date(2026, 1, 13), date(2026, 2, 10), date(2026, 3, 10), date(2026, 4, 14)]
+
+    def test_end_date_is_respected(self):
+        pattern = self._pattern("weekly", date(2026, 3, 2), end=date(2026, 3, 16))
+
+        dates = occurrence_dates(pattern, date(2026, 3, 1), date(2026, 12, 31))
+
+        assert dates[-1] == date(2026, 3, 16)
+
+
+@pytest.mark.django_db
+class TestExpansion:
+    """Test expand_pattern and the batch conflict check."""
+
+    def test_conflict_check_is_one_query(self, pattern, django_assert_num_queries):
+        slots = occurrence_slots(pattern, pattern.start_date, pattern.start_date + DEFAULT_HORIZON)
+
+        with django_assert_num_queries(1):
+            find_conflicts(pattern, slots)
+
+    def test_clashing_slots_are_skipped(self, pattern, studio, teacher):
+        start, end = occurrence_slots(pattern, pattern.start_date, pattern.start_date)[0]
+        Lesson.objects.create(
+            studio=studio,
+            teacher=teacher,
+            scheduled_start=start + timedelta(minutes=30),
+            scheduled_end=end + timedelta(minutes=30),
+        )
+
+        result = expand_pattern(pattern, notify=False)
+
+        assert result.skipped == [(start, end)]
+        assert start not in [lesson.scheduled_start for lesson in result.created]
+
+    def test_rerun_only_adds_new_dates(self, pattern):
+        first = expand_pattern(pattern, until=pattern.start_date + timedelta(weeks=3), notify=False)
+        again = expand_pattern(pattern, until=pattern.start_date + timedelta(weeks=3), notify=False)
+        later = expand_pattern(pattern, until=pattern.start_date + timedelta(weeks=5), notify=False)
+
+        assert len(first.created) == 4
+        assert again.created == []
+        assert len(later.created) == 2
+        assert Lesson.objects.filter(recurring_pattern=pattern).count() == 6
+
+    def test_batch_queues_one_summary_per_recipient(
+        self, pattern, django_capture_on_commit_callbacks
+    ):
+        with patch("apps.notifications.outbox.async_task") as mock_async:
+            with django_capture_on_commit_callbacks(execute=True):
+                result = expand_pattern(pattern, until=pattern.start_date + timedelta(weeks=9))
+
+            event = OutboxEvent.objects.get(pattern=pattern)
+            assert (event.kind, len(event.lesson_ids)) == ("lessons_scheduled", 10)
+            assert not Notification.objects.filter(notification_type="lesson_scheduled").exists()
+
+            mock_async.reset_mock()
+            outbox.drain()
+
+        assert len(result.created) == 10
+        notifications = Notification.objects.filter(notification_type="lesson_scheduled")
+        assert {n.title for n in notifications} == {"10 Lessons Scheduled"}
+        assert notifications.count() == 2
+        mock_async.assert_called_once()
+        assert len(mock_async.call_args.args[1]) == 2
+
+    def test_task_extends_horizon(self, pattern):
+        extend_recurring_lessons()
+
+        pattern.refresh_from_db()
+        assert pattern.generated_until == timezone.localdate() + DEFAULT_HORIZON
+        assert Lesson.objects.filter(recurring_pattern=pattern).exists()
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestRecurringPatternAPI:
+    """Test /api/lessons/recurring-patterns/."""
+
+    def _payload(self, teacher, student):
+        return {
+            "teacher": str(teacher.id),
+            "student": str(student.id),
+            "frequency": "weekly",
+            "day_of_week": 2,
+            "time": "15:30",
+            "duration_minutes": 30,
+            "start_date": _next_weekday(2).isoformat(),
+            "end_date": (_next_weekday(2) + timedelta(weeks=7)).isoformat(),
+        }
+
+    @patch("apps.notifications.outbox.async_task")
+    def test_create_materialises_term(self, mock_async, authenticated_client, teacher, student):
+        response = authenticated_client.post(
+            reverse("recurring-pattern-list"), self._payload(teacher, student), format="json"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["lessons_created"] == 8
+        assert response.data["conflicts"] == []
+        lessons = Lesson.objects.filter(recurring_pattern_id=response.data["id"])
+        assert lessons.count() == 8
+        assert {lesson.scheduled_start.time() for lesson in lessons} == {time(15, 30)}
+
+    def test_expand_extends_to_until(self, teacher_authenticated_client, pattern):
+        url = reverse("recurring-pattern-expand", args=[pattern.id])
+        until = pattern.start_date + timedelta(weeks=20)
+
+        response = teacher_authenticated_client.post(url, {"until": until.isoformat()})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["lessons_created"] == 21
+        assert response.data["generated_until"] == until.isoformat()
+
+    def test_expand_rejects_bad_until(self, authenticated_client, pattern):
+        url = reverse("recurring-pattern-expand", args=[pattern.id])
+
+        response = authenticated_client.post(url, {"until": "next year"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_admins_cannot_schedule_for_another_studio(
+        self, api_client, django_user_model, teacher, student
+    ):
+        other_admin = django_user_model.objects.create_user(
+            email="other-admin@test.com", password="testpass123", role="admin"
+        )
+        Studio.objects.create(name="Other Studio", owner=other_admin, email="other@test.com")
+        api_client.force_authenticate(user=other_admin)
+
+        response = api_client.post(
+            reverse("recurring-pattern-list"), self._payload(teacher, student), format="json"
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not RecurringPattern.objects.exists()
+
+    def test_students_cannot_create(self, student_authenticated_client, teacher, student):
+        response = student_authenticated_client.post(
+            reverse("recurring-pattern-list"), self._payload(teacher, student), format="json"
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not RecurringPattern.objects.exists()
@@ -0,0 +1,103 @@
+"""
+Tests for background report jobs.
+"""
+
+from unittest.mock import patch
+
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.core.models import ReportJob, Studio
+from apps.core.tasks import generate_report_job
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so reports resolve the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    }
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestReportJobAPI:
+    """Test /api/core/report-jobs/."""
+
+    @patch("apps.core.views.report_jobs.async_task")
+    def test_submit_queues_task(self, mock_async, authenticated_client):
+        response = authenticated_client.post(
+            reverse("report-job-list"), {"type": "students", "format": "ndjson"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["status"] == "pending"
+        assert response.data["download_url"] is None
+        mock_async.assert_called_once_with(
+            "apps.core.tasks.generate_report_job", ReportJob.objects.get().id
+        )
+
+    @patch("apps.core.views.report_jobs.async_task")
+    def test_identical_request_reuses_job(self, mock_async, authenticated_client):
+        url = reverse("report-job-list")
+        first = authenticated_client.post(url, {"type": "financial"}, format="json")
+        second = authenticated_client.post(url, {"type": "financial"}, format="json")
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data["id"] == first.data["id"]
+        assert mock_async.call_count == 1
+
+    def test_invalid_type_rejected(self, authenticated_client):
+        response = authenticated_client.post(
+            reverse("report-job-list"), {"type": "everything"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @patch("apps.core.views.report_jobs.async_task")
+    def test_task_writes_file_and_signed_download_works(
+        self, mock_async, authenticated_client, api_client, student
+    ):
+        submitted = authenticated_client.post(
+            reverse("report-job-list"), {"type": "students"}, format="json"
+        )
+        generate_report_job(submitted.data["id"])
+
+        polled = authenticated_client.get(reverse("report-job-detail", args=[submitted.data["id"]]))
+        assert polled.data["status"] == "completed"
+        assert polled.data["row_count"] == 1
+
+        # The signed link works without credentials
+        api_client.force_authenticate(user=None)
+        download = api_client.get(polled.data["download_url"])
+        assert download.status_code == status.HTTP_200_OK
+        body = b"".join(download.streaming_content).decode()
+        assert student.user.email in body
+
+    @patch("apps.core.views.report_jobs.async_task")
+    def test_download_rejects_bad_token(self, mock_async, authenticated_client, api_client):
+        submitted = authenticated_client.post(
+            reverse("report-job-list"), {"type": "students"}, format="json"
+        )
+        generate_report_job(submitted.data["id"])
+
+        url = reverse("report-job-download", args=[submitted.data["id"]])
+        response = api_client.get(url, {"token": "forged"})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_jobs_are_private(self, authenticated_client, teacher_user):
+        job = ReportJob.objects.create(requested_by=teacher_user, report_type="students")
+
+        response = authenticated_client.get(reverse("report-job-detail", args=[job.id]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
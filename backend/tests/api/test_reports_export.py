@@ -0,0 +1,114 @@
+"""
+Tests for the streaming report export endpoint.
+"""
+
+import gzip
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+
+from apps.billing.models import Invoice
+from apps.core.models import Student, Studio
+
+User = get_user_model()
+
+
+def _content(response):
+    return b"".join(response.streaming_content)
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so reports resolve the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestReportsExport:
+    """Test /api/core/reports/export/."""
+
+    def test_students_csv_streams(self, authenticated_client, student):
+        response = authenticated_client.get(reverse("reports-export"), {"type": "students"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv"
+        lines = _content(response).decode().splitlines()
+        assert lines[0] == "Name,Email,Instrument,Status,Phone,Enrollment Date"
+        assert lines[1].startswith(
+            f"{student.user.get_full_name()},{student.user.email},Piano,Active"
+        )
+
+    def test_financial_ndjson(self, authenticated_client, studio, student):
+        Invoice.objects.create(
+            studio=studio,
+            student=student,
+            status="paid",
+            total_amount=Decimal("75.00"),
+            due_date=timezone.now().date(),
+        )
+
+        response = authenticated_client.get(
+            reverse("reports-export"), {"type": "financial", "format": "ndjson"}
+        )
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in _content(response).decode().splitlines()]
+        assert len(records) == 1
+        assert records[0]["amount"] == "75.00"
+        assert records[0]["category"] == "Tuition"
+        assert records[0]["description"].endswith(student.user.get_full_name())
+
+    def test_json_format_is_a_list_of_records(self, authenticated_client, student):
+        response = authenticated_client.get(
+            reverse("reports-export"), {"type": "attendance", "format": "json"}
+        )
+
+        records = json.loads(_content(response))
+        assert records == [
+            {
+                "student": student.user.get_full_name(),
+                "total": 0,
+                "attended": 0,
+                "cancelled": 0,
+                "percentage": "0.0%",
+            }
+        ]
+
+    def test_gzip_when_accepted(self, authenticated_client, student):
+        response = authenticated_client.get(
+            reverse("reports-export"), {"type": "students"}, HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert student.user.email in gzip.decompress(_content(response)).decode()
+
+    def test_invalid_report_type(self, authenticated_client):
+        response = authenticated_client.get(reverse("reports-export"), {"type": "nope"})
+
+        assert _content(response).decode().strip() == "Error,Invalid report type"
+
+    def test_query_count_independent_of_rows(
+        self, authenticated_client, studio, django_assert_num_queries
+    ):
+        for i in range(25):
+            # The user post_save signal creates the student profile
+            User.objects.create_user(
+                email=f"s{i}@test.com", password="x", first_name="S", last_name=str(i)
+            )
+        assert Student.objects.filter(studio=studio).count() == 25
+
+        # studio lookup + one projected SELECT for all rows
+        with django_assert_num_queries(2):
+            response = authenticated_client.get(reverse("reports-export"), {"type": "students"})
+            lines = _content(response).decode().splitlines()
+
+        assert len(lines) == 26
@@ -0,0 +1,107 @@
+"""
+Query-count tests for the aggregate stats endpoints.
+
+Each endpoint should compute its numbers with one aggregate query per model
+rather than a COUNT per status or a Python loop over rows.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+
+from apps.inventory.models import InventoryItem
+from apps.lessons.models import Lesson
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestStudentStatsQueries:
+    """Test /api/core/students/stats/ and /api/students/stats/."""
+
+    @pytest.mark.parametrize("url", ["/api/core/students/stats/", "/api/students/stats/"])
+    def test_roster_stats_single_query(
+        self, authenticated_client, student, teacher, django_assert_num_queries, url
+    ):
+        student.primary_teacher = None
+        student.save()
+
+        with django_assert_num_queries(1):
+            response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            "total_students": 1,
+            "active_students": 1,
+            "unassigned_students": 1,
+        }
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestInventoryStatsQueries:
+    """Test /api/inventory/items/stats/."""
+
+    def test_inventory_stats_single_query(self, authenticated_client, django_assert_num_queries):
+        InventoryItem.objects.create(
+            name="Cello", category="instrument", location="Room A", value=Decimal("1200.00")
+        )
+        InventoryItem.objects.create(
+            name="Music Stand",
+            category="equipment",
+            location="Storage",
+            value=Decimal("25.50"),
+            quantity=4,
+            available_quantity=2,
+            condition="needs-repair",
+        )
+
+        with django_assert_num_queries(1):
+            response = authenticated_client.get(reverse("inventory-item-stats"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            "total_items": 2,
+            "total_value": "$1,302.00",
+            "low_stock": 2,
+            "needs_repair": 1,
+        }
+
+    def test_inventory_stats_empty(self, authenticated_client):
+        response = authenticated_client.get(reverse("inventory-item-stats"))
+
+        assert response.data["total_items"] == 0
+        assert response.data["total_value"] == "$0.00"
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestTeacherDashboardQueries:
+    """Test the teacher branch of /api/core/dashboard/stats/."""
+
+    def test_hours_taught_summed_in_database(
+        self, teacher_authenticated_client, studio, teacher, student, django_assert_num_queries
+    ):
+        start = timezone.now().replace(day=1, hour=9, minute=0, second=0, microsecond=0)
+        for minutes in (60, 90):
+            Lesson.objects.create(
+                studio=studio,
+                teacher=teacher,
+                student=student,
+                status="completed",
+                scheduled_start=start,
+                scheduled_end=start + timedelta(minutes=minutes),
+            )
+        url = reverse("dashboard-stats")
+        teacher_authenticated_client.get(url)
+
+        # students, lesson aggregate, recent activity
+        with django_assert_num_queries(3):
+            response = teacher_authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["overview"]["hours_taught"]["value"] == 2.5
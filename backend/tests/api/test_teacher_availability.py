@@ -0,0 +1,118 @@
+"""
+Tests for the normalised teacher availability index and its query API.
+"""
+
+from datetime import UTC, date, datetime
+
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.core.availability import available_teachers
+from apps.core.models import Studio, TeacherAvailability, User
+from apps.lessons.models import Lesson
+
+TUESDAY = date(2026, 3, 10)
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so the admin resolves the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+def _teacher(studio, email, instruments, availability):
+    user = User.objects.create_user(
+        email=email, password="x", first_name=email.split("@")[0], last_name="T", role="teacher"
+    )
+    teacher = user.teacher_profile
+    teacher.studio = studio
+    teacher.instruments = instruments
+    teacher.availability = availability
+    teacher.save()
+    return teacher
+
+
+@pytest.fixture
+def roster(studio):
+    return {
+        "evening_piano": _teacher(
+            studio, "ep@test.com", ["Piano"], {"tuesday": [["15:00", "19:00"]]}
+        ),
+        "guitar": _teacher(studio, "g@test.com", ["Guitar"], {"tuesday": [["16:00", "18:00"]]}),
+        "morning_piano": _teacher(
+            studio, "mp@test.com", ["Piano", "Organ"], {"tuesday": [["09:00", "12:00"]]}
+        ),
+    }
+
+
+@pytest.mark.django_db
+class TestAvailabilityIndex:
+    """Test TeacherAvailability maintenance."""
+
+    def test_rows_follow_the_json(self, roster):
+        teacher = roster["evening_piano"]
+
+        assert list(
+            teacher.availability_windows.values_list("weekday", "start_minute", "end_minute")
+        ) == [(1, 900, 1140)]
+
+        teacher.availability = {"monday": [["10:00", "11:00"]], "thursday": [["13:00", "14:00"]]}
+        teacher.save()
+
+        assert list(teacher.availability_windows.values_list("weekday", flat=True)) == [0, 3]
+
+    def test_unchanged_save_keeps_rows(self, roster):
+        teacher = roster["guitar"]
+        before = list(TeacherAvailability.objects.filter(teacher=teacher).values_list("pk"))
+
+        teacher.bio = "Updated"
+        teacher.save()
+
+        assert list(TeacherAvailability.objects.filter(teacher=teacher).values_list("pk")) == before
+
+    def test_search_is_one_query(self, studio, roster, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            list(available_teachers(studio, 1, 16 * 60, 18 * 60, on_date=TUESDAY))
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestAvailableTeachersAPI:
+    """Test /api/core/teachers/available/."""
+
+    def test_filters_by_window_and_instrument(self, authenticated_client, roster):
+        response = authenticated_client.get(
+            reverse("teacher-available"),
+            {"weekday": "tuesday", "start": "16:00", "end": "18:00", "instrument": "piano"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [t["id"] for t in response.data] == [str(roster["evening_piano"].id)]
+
+    def test_date_excludes_booked_teachers(self, authenticated_client, studio, roster):
+        Lesson.objects.create(
+            studio=studio,
+            teacher=roster["guitar"],
+            scheduled_start=datetime(2026, 3, 10, 17, 0, tzinfo=UTC),
+            scheduled_end=datetime(2026, 3, 10, 17, 30, tzinfo=UTC),
+        )
+
+        response = authenticated_client.get(
+            reverse("teacher-available"),
+            {"date": TUESDAY.isoformat(), "start": "16:00", "end": "18:00"},
+        )
+
+        assert {t["id"] for t in response.data} == {str(roster["evening_piano"].id)}
+
+    def test_bad_params_rejected(self, authenticated_client):
+        url = reverse("teacher-available")
+
+        no_day = authenticated_client.get(url, {"start": "16:00", "end": "18:00"})
+        backwards = authenticated_client.get(
+            url, {"weekday": "1", "start": "18:00", "end": "16:00"}
+        )
+
+        assert no_day.status_code == status.HTTP_400_BAD_REQUEST
+        assert backwards.status_code == status.HTTP_400_BAD_REQUEST
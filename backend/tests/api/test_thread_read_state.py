@@ -0,0 +1,142 @@
+"""
+Tests for per-user thread read cursors.
+"""
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.core.models import Studio
+from apps.messaging.models import Message, MessageThread, ThreadReadState
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so views resolve the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+def _thread(studio, users, sender, count, subject="Hello"):
+    thread = MessageThread.objects.create(studio=studio, subject=subject)
+    thread.participants.add(*users)
+    for i in range(count):
+        Message.objects.create(thread=thread, sender=sender, body=f"m{i}")
+    return thread
+
+
+@pytest.mark.django_db
+class TestThreadReadState:
+    """Test ThreadReadState.mark_read and the thread's last message."""
+
+    def test_saving_a_message_moves_the_thread_forward(self, studio, admin_user):
+        thread = _thread(studio, [admin_user], admin_user, 2)
+        newest = Message.objects.create(thread=thread, sender=admin_user, body="newest")
+
+        assert thread.last_message == newest
+        thread.refresh_from_db()
+        assert (thread.last_message_id, thread.updated_at) == (newest.id, newest.created_at)
+
+    def test_mark_read_is_one_upsert(
+        self, studio, admin_user, teacher_user, django_assert_num_queries
+    ):
+        thread = _thread(studio, [admin_user, teacher_user], teacher_user, 50)
+        thread = MessageThread.objects.select_related("last_message").get(pk=thread.pk)
+
+        with django_assert_num_queries(1):
+            ThreadReadState.mark_read(thread, admin_user)
+        with django_assert_num_queries(1):
+            ThreadReadState.mark_read(thread, admin_user)
+
+        state = ThreadReadState.objects.get()
+        assert state.last_read_message_id == thread.last_message_id
+        assert state.last_read_at == thread.last_message.created_at
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestThreadEndpoints:
+    """Test unread counts and read marking through the API."""
+
+    def test_unread_counts_follow_the_cursor(self, api_client, studio, admin_user, teacher_user):
+        thread = _thread(studio, [admin_user, teacher_user], teacher_user, 3)
+        api_client.force_authenticate(user=admin_user)
+        detail = reverse("thread-detail", args=[thread.id])
+
+        assert api_client.get(detail).data["unread_count"] == 3
+
+        response = api_client.post(reverse("thread-mark-read", args=[thread.id]))
+        assert response.status_code == status.HTTP_200_OK
+        assert api_client.get(detail).data["unread_count"] == 0
+
+        Message.objects.create(thread=thread, sender=teacher_user, body="later")
+        Message.objects.create(thread=thread, sender=admin_user, body="own")
+        assert api_client.get(detail).data["unread_count"] == 1
+
+    def test_reply_marks_the_thread_read(self, api_client, studio, admin_user, teacher_user):
+        thread = _thread(studio, [admin_user, teacher_user], teacher_user, 3)
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.post(
+            reverse("thread-reply", args=[thread.id]), {"body": "Thanks"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "read_by" not in response.data
+        data = api_client.get(reverse("thread-detail", args=[thread.id])).data
+        assert data["unread_count"] == 0
+        assert data["last_message"]["body"] == "Thanks"
+
+    def test_inbox_is_flat(self, api_client, studio, admin_user, teacher_user):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse("thread-list")
+
+        def add_threads(start, count, length):
+            for i in range(start, start + count):
+                _thread(studio, [admin_user, teacher_user], teacher_user, length, f"T{i}")
+
+        def get():
+            with CaptureQueriesContext(connection) as captured:
+                response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            return len(captured), response.data["results"]
+
+        add_threads(0, 2, 1)
+        get()  # warm the request user's profile lookups
+        few, _ = get()
+        add_threads(2, 8, 20)
+        many, results = get()
+
+        assert few == many
+        assert sorted(r["unread_count"] for r in results) == [1, 1] + [20] * 8
+        assert all(r["last_message"]["body"] for r in results)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_backfills_cursors_from_read_by(studio, admin_user, teacher_user):
+    executor = MigrationExecutor(connection)
+    executor.migrate([("messaging", "0004_keyset_pagination_indexes")])
+    old = executor.loader.project_state([("messaging", "0004_keyset_pagination_indexes")]).apps
+    old_thread = old.get_model("messaging", "MessageThread")
+    old_message = old.get_model("messaging", "Message")
+
+    thread = old_thread.objects.create(studio_id=studio.pk, subject="Old")
+    messages = [
+        old_message.objects.create(thread=thread, sender_id=teacher_user.pk, body=f"m{i}")
+        for i in range(3)
+    ]
+    for message in messages:
+        message.read_by.add(teacher_user.pk)
+    messages[0].read_by.add(admin_user.pk)
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+    states = {s.user_id: s for s in ThreadReadState.objects.filter(thread_id=thread.pk)}
+    assert states[admin_user.pk].last_read_message_id == messages[0].pk
+    assert states[teacher_user.pk].last_read_message_id == messages[2].pk
+    assert states[teacher_user.pk].last_read_at == messages[2].created_at
+    assert MessageThread.objects.get(pk=thread.pk).last_message_id == messages[2].pk
@@ -13,6 +13,12 @@ from apps.resources.models import Resource
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def eager_loading_strict(settings):
+    """Fail list endpoints that lazy-load relations (see apps/core/eager_loading.py)."""
+    settings.EAGER_LOADING_STRICT = True
+
+
 @pytest.fixture
 def api_client():
     """Return an API client for making requests."""
@@ -0,0 +1,151 @@
+"""
+Tests for the PostgreSQL LISTEN/NOTIFY channel layer.
+"""
+
+import asyncio
+
+from django.db import connection
+
+import pytest
+import pytest_asyncio
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import channel_layers
+from channels.testing import WebsocketCommunicator
+
+from apps.core.channel_layer import PostgresChannelLayer
+from apps.core.models import ChannelGroupMembership, ChannelPayload
+from apps.notifications.consumers import NotificationConsumer
+
+pytestmark = [
+    pytest.mark.asyncio,
+    pytest.mark.django_db(transaction=True),
+    pytest.mark.skipif(connection.vendor != "postgresql", reason="needs PostgreSQL"),
+]
+
+
+@pytest_asyncio.fixture
+async def layers():
+    """Two layers standing in for two processes."""
+    made = [PostgresChannelLayer(expiry=5), PostgresChannelLayer(expiry=5)]
+    yield made
+    for layer in made:
+        await layer.close()
+
+
+async def _receive(layer, channel):
+    return await asyncio.wait_for(layer.receive(channel), timeout=5)
+
+
+async def _rows(layer, model, column):
+    # Through the layer's own connection; the ORM's would outlive the test
+    rows = await layer._run(f"SELECT {column} FROM {model._meta.db_table}", fetch=True)
+    return [row[0] for row in rows]
+
+
+class TestPostgresChannelLayer:
+    """Test delivery between PostgresChannelLayer instances."""
+
+    async def test_send_reaches_another_process(self, layers):
+        sender, receiver = layers
+        channel = await receiver.new_channel()
+
+        await sender.send(channel, {"type": "chat.message", "text": "hello"})
+
+        assert await _receive(receiver, channel) == {"type": "chat.message", "text": "hello"}
+
+    async def test_group_send_reaches_every_member_in_order(self, layers):
+        first, second = layers
+        a = await first.new_channel()
+        b = await second.new_channel()
+        await first.group_add("chat_band", a)
+        await second.group_add("chat_band", b)
+
+        for n in range(3):
+            await first.group_send("chat_band", {"type": "chat.message", "n": n})
+
+        for layer, channel in ((first, a), (second, b)):
+            assert [(await _receive(layer, channel))["n"] for _ in range(3)] == [0, 1, 2]
+
+    async def test_discarded_channels_get_nothing(self, layers):
+        first, second = layers
+        a = await first.new_channel()
+        b = await second.new_channel()
+        await first.group_add("chat_band", a)
+        await second.group_add("chat_band", b)
+        await second.group_discard("chat_band", b)
+
+        await first.group_send("chat_band", {"type": "chat.message"})
+
+        assert await _receive(first, a) == {"type": "chat.message"}
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(second.receive(b), timeout=0.5)
+
+    async def test_large_payloads_go_through_the_table(self, layers):
+        sender, receiver = layers
+        channel = await receiver.new_channel()
+        await receiver.group_add("big", channel)
+        body = "x" * 20000
+
+        await sender.send(channel, {"type": "big", "body": body})
+        await sender.group_send("big", {"type": "big", "body": body})
+
+        for _ in range(2):
+            assert (await _receive(receiver, channel))["body"] == body
+        assert len(await _rows(sender, ChannelPayload, "id")) == 2
+
+    async def test_expired_rows_are_cleaned_up(self, layers):
+        layer = layers[0]
+        layer.group_expiry = -1
+        channel = await layer.new_channel()
+        await layer.group_add("stale", channel)
+        await layer.send(channel, {"type": "big", "body": "x" * 20000})
+        await _receive(layer, channel)
+
+        await layer._run(f"UPDATE {ChannelPayload._meta.db_table} SET expires_at = now()")
+        layer.group_expiry = 60
+        layer._next_cleanup = 0
+        await layer.group_add("fresh", channel)
+
+        assert await _rows(layer, ChannelGroupMembership, "group_name") == ["fresh"]
+        assert await _rows(layer, ChannelPayload, "id") == []
+
+    async def test_sync_callers_can_send(self, layers):
+        sender, receiver = layers
+        channel = await receiver.new_channel()
+        await receiver.group_add("user_notifications_1", channel)
+
+        # What signal handlers and Django-Q tasks do
+        await sync_to_async(async_to_sync(sender.group_send))(
+            "user_notifications_1", {"type": "send_notification"}
+        )
+
+        assert await _receive(receiver, channel) == {"type": "send_notification"}
+
+    async def test_consumer_gets_notifications_sent_elsewhere(self, layers):
+        worker, daphne = layers
+        channel_layers.set("default", daphne)
+
+        class User:
+            id = 7
+            is_anonymous = False
+
+        async def with_user(scope, receive, send):
+            scope["user"] = User()
+            return await NotificationConsumer.as_asgi()(scope, receive, send)
+
+        communicator = WebsocketCommunicator(with_user, "/ws/notifications/")
+        try:
+            connected, _ = await communicator.connect()
+            assert connected
+
+            await worker.group_send(
+                "user_notifications_7", {"type": "send_notification", "notification": {"id": 1}}
+            )
+
+            assert await communicator.receive_json_from(timeout=5) == {
+                "type": "notification",
+                "data": {"id": 1},
+            }
+        finally:
+            await communicator.disconnect()
+            channel_layers.backends.pop("default", None)
@@ -0,0 +1,180 @@
+"""
+Tests for the daily fact table, its incremental load and backfill command,
+and the analytics endpoints that read it.
+"""
+
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.billing.models import Invoice
+from apps.core.facts import load_incremental
+from apps.core.models import FactWatermark, Studio, StudioDailyFact
+from apps.lessons.models import Lesson
+
+LESSON_START = datetime(2026, 3, 10, 15, 0, tzinfo=UTC)
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so analytics resolve the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+@pytest.fixture
+def lesson(studio, teacher, student):
+    return Lesson.objects.create(
+        studio=studio,
+        teacher=teacher,
+        student=student,
+        status="completed",
+        scheduled_start=LESSON_START,
+        scheduled_end=LESSON_START + timedelta(minutes=45),
+    )
+
+
+@pytest.fixture
+def paid_invoice(studio, teacher, student):
+    return Invoice.objects.create(
+        studio=studio,
+        student=student,
+        teacher=teacher,
+        status="paid",
+        total_amount=Decimal("120.00"),
+        amount_paid=Decimal("120.00"),
+        due_date=LESSON_START.date(),
+        paid_date=LESSON_START.date(),
+    )
+
+
+@pytest.mark.django_db
+class TestIncrementalLoad:
+    """Test apps.core.facts.load_incremental."""
+
+    def test_first_load_builds_all_kinds(self, studio, teacher, lesson, paid_invoice):
+        load_incremental()
+
+        lesson_fact = StudioDailyFact.objects.get(studio=studio, kind="lesson")
+        assert lesson_fact.day == LESSON_START.date()
+        assert lesson_fact.teacher == teacher
+        assert lesson_fact.instrument == "Piano"
+        assert lesson_fact.status == "completed"
+        assert lesson_fact.minutes == 45
+
+        revenue_fact = StudioDailyFact.objects.get(studio=studio, kind="revenue")
+        assert revenue_fact.amount == Decimal("120.00")
+
+        enrolment_fact = StudioDailyFact.objects.get(studio=studio, kind="enrolment")
+        assert enrolment_fact.status == "active"
+        assert FactWatermark.objects.count() == 3
+
+    def test_unchanged_sources_are_skipped(self, lesson, paid_invoice):
+        # Place the watermark past the overlap window of the fixture writes
+        load_incremental(now=datetime.now(UTC) + timedelta(hours=1))
+
+        summary = load_incremental()
+
+        assert summary == {"lesson": 0, "revenue": 0, "enrolment": 0}
+
+    def test_changed_lesson_rebuilds_its_day(self, studio, lesson):
+        load_incremental()
+
+        lesson.status = "no_show"
+        lesson.save()
+        summary = load_incremental()
+
+        assert summary["lesson"] == 1
+        fact = StudioDailyFact.objects.get(studio=studio, kind="lesson")
+        assert fact.status == "no_show"
+
+
+@pytest.mark.django_db
+class TestBackfillDailyFactsCommand:
+    """Test the backfill_daily_facts management command."""
+
+    def test_backfill_removes_deleted_lessons(self, studio, lesson):
+        load_incremental()
+        Lesson.objects.filter(pk=lesson.pk).delete()
+
+        out = StringIO()
+        call_command("backfill_daily_facts", "--kind", "lesson", stdout=out)
+
+        assert not StudioDailyFact.objects.filter(studio=studio, kind="lesson").exists()
+        assert "Rebuilt 0 fact row(s) for 1 studio(s)" in out.getvalue()
+
+    def test_invalid_date_rejected(self):
+        from django.core.management.base import CommandError
+
+        with pytest.raises(CommandError):
+            call_command("backfill_daily_facts", "--start", "yesterday")
+
+
+@pytest.mark.django_db
+class TestFactAnalyticsEndpoints:
+    """Test the fact-backed analytics endpoints."""
+
+    params = {"start": "2026-01-01", "end": "2026-12-31"}
+
+    def test_revenue_by_teacher_reads_only_facts(
+        self, authenticated_client, teacher, lesson, paid_invoice
+    ):
+        load_incremental()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(
+                reverse("analytics-revenue-by-teacher"), self.params
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {
+                "teacher_id": teacher.id,
+                "teacher_name": teacher.user.get_full_name(),
+                "revenue": 120.0,
+                "invoices": 1,
+            }
+        ]
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        assert 'FROM "lessons"' not in sql and 'JOIN "lessons"' not in sql
+        assert 'FROM "invoices"' not in sql and 'JOIN "invoices"' not in sql
+
+    def test_lessons_by_instrument(self, authenticated_client, lesson):
+        load_incremental()
+
+        response = authenticated_client.get(reverse("analytics-lessons-by-instrument"), self.params)
+
+        assert response.data["results"] == [
+            {
+                "instrument": "Piano",
+                "lessons": 1,
+                "completed": 1,
+                "cancelled": 0,
+                "no_show": 0,
+                "hours_taught": 0.8,
+            }
+        ]
+
+    def test_retention_cohorts(self, authenticated_client, student):
+        load_incremental()
+
+        response = authenticated_client.get(
+            reverse("analytics-retention-cohorts"),
+            {"start": student.created_at.date().isoformat()},
+        )
+
+        cohort = response.data["results"][0]
+        assert cohort["enrolled"] == 1
+        assert cohort["retention_rate"] == 100.0
+
+    def test_non_admin_forbidden(self, teacher_authenticated_client):
+        response = teacher_authenticated_client.get(reverse("analytics-retention-cohorts"))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
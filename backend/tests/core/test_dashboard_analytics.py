@@ -0,0 +1,129 @@
+"""
+Tests for the dashboard analytics series and its per-studio cache.
+"""
+
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.billing.models import Invoice
+from apps.core.analytics import bucket_count, bucket_periods
+from apps.core.models import Studio
+
+
+def _paid_invoice(studio, student, amount, created_at):
+    invoice = Invoice.objects.create(
+        studio=studio,
+        student=student,
+        status="paid",
+        total_amount=Decimal(amount),
+        amount_paid=Decimal(amount),
+        due_date=created_at.date(),
+    )
+    # created_at is auto_now_add, so backdate it with an update
+    Invoice.objects.filter(pk=invoice.pk).update(created_at=created_at)
+    return invoice
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so the dashboard resolves the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+def test_month_buckets_follow_the_calendar():
+    periods = bucket_periods(date(2025, 12, 31), date(2026, 3, 31), "month")
+
+    assert periods == [date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)]
+
+
+def test_week_buckets_start_on_monday():
+    periods = bucket_periods(date(2026, 3, 4), date(2026, 3, 16), "week")
+
+    assert periods == [date(2026, 3, 2), date(2026, 3, 9), date(2026, 3, 16)]
+
+
+@pytest.mark.parametrize("granularity", ["day", "week", "month"])
+def test_bucket_count_matches_bucket_periods(granularity):
+    start, end = date(2025, 12, 31), date(2026, 3, 16)
+
+    assert bucket_count(start, end, granularity) == len(bucket_periods(start, end, granularity))
+
+
+def test_bucket_count_does_not_walk_the_range():
+    assert bucket_count(date(1, 1, 1), date(9999, 12, 31), "day") == 3652059
+
+
+@pytest.mark.django_db
+class TestDashboardAnalyticsView:
+    """Test /api/core/dashboard/analytics/."""
+
+    def test_monthly_series_fills_empty_months(self, authenticated_client, studio, student):
+        _paid_invoice(studio, student, "50.00", datetime(2026, 1, 15, tzinfo=UTC))
+        _paid_invoice(studio, student, "25.00", datetime(2026, 3, 31, tzinfo=UTC))
+
+        response = authenticated_client.get(
+            reverse("dashboard-analytics"), {"start": "2026-01-01", "end": "2026-03-31"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["revenue_trend"] == [
+            {"month": "Jan", "period": "2026-01-01", "revenue": 50.0},
+            {"month": "Feb", "period": "2026-02-01", "revenue": 0.0},
+            {"month": "Mar", "period": "2026-03-01", "revenue": 25.0},
+        ]
+
+    def test_weekly_granularity(self, authenticated_client, studio, student):
+        _paid_invoice(studio, student, "10.00", datetime(2026, 3, 4, tzinfo=UTC))
+        _paid_invoice(studio, student, "15.00", datetime(2026, 3, 8, tzinfo=UTC))
+
+        response = authenticated_client.get(
+            reverse("dashboard-analytics"),
+            {"granularity": "week", "start": "2026-03-02", "end": "2026-03-15"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["revenue"] for p in response.data["revenue_trend"]] == [25.0, 0.0]
+
+    def test_invalid_params_rejected(self, authenticated_client):
+        url = reverse("dashboard-analytics")
+
+        assert authenticated_client.get(url, {"granularity": "year"}).status_code == 400
+        assert authenticated_client.get(url, {"start": "March"}).status_code == 400
+        assert (
+            authenticated_client.get(url, {"start": "2026-03-02", "end": "2026-03-01"}).status_code
+            == 400
+        )
+        assert (
+            authenticated_client.get(
+                url, {"granularity": "day", "start": "2000-01-01", "end": "2026-01-01"}
+            ).status_code
+            == 400
+        )
+
+    def test_series_cached_until_write(
+        self,
+        authenticated_client,
+        studio,
+        student,
+        django_assert_max_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        url = reverse("dashboard-analytics")
+        params = {"start": "2026-01-01", "end": "2026-03-31"}
+        authenticated_client.get(url, params)
+
+        # studio lookup, version + series cache reads, attendance
+        with django_assert_max_num_queries(4):
+            response = authenticated_client.get(url, params)
+        assert response.data["revenue_trend"][0]["revenue"] == 0.0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            _paid_invoice(studio, student, "80.00", datetime(2026, 1, 10, tzinfo=UTC))
+
+        response = authenticated_client.get(url, params)
+        assert response.data["revenue_trend"][0]["revenue"] == 80.0
@@ -0,0 +1,168 @@
+"""
+Tests for the per-studio dashboard rollup and its rebuild command.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+
+from apps.billing.models import Invoice
+from apps.core import rollups
+from apps.core.models import Studio, StudioDashboardRollup
+from apps.core.tasks import refresh_dashboard_rollup
+from apps.lessons.models import Lesson
+
+
+def _make_lesson(studio, teacher, student, status_value, start):
+    return Lesson.objects.create(
+        studio=studio,
+        teacher=teacher,
+        student=student,
+        status=status_value,
+        scheduled_start=start,
+        scheduled_end=start + timedelta(hours=1),
+    )
+
+
+@pytest.fixture(autouse=True)
+def only_test_studio(studio):
+    """Drop the auto-created "My Studio" so the dashboard resolves the fixture studio."""
+    Studio.objects.exclude(pk=studio.pk).delete()
+
+
+@pytest.mark.django_db
+class TestDashboardRollup:
+    """The admin overview is served from StudioDashboardRollup."""
+
+    def test_first_read_builds_rollup(self, authenticated_client, studio, student):
+        now = timezone.now()
+        _make_lesson(
+            studio, student.primary_teacher, student, "completed", now - timedelta(days=40)
+        )
+        _make_lesson(studio, student.primary_teacher, student, "no_show", now - timedelta(days=40))
+        Invoice.objects.create(
+            studio=studio,
+            student=student,
+            status="partial",
+            total_amount=Decimal("100.00"),
+            amount_paid=Decimal("40.00"),
+            due_date=now.date(),
+        )
+
+        response = authenticated_client.get(reverse("dashboard-stats"))
+
+        assert response.status_code == status.HTTP_200_OK
+        overview = response.data["overview"]
+        assert overview["total_students"]["value"] == 1
+        assert overview["active_teachers"]["value"] == 1
+        assert overview["unpaid_invoices"]["value"] == 60.0
+        assert overview["avg_attendance"]["value"] == "50%"
+        assert StudioDashboardRollup.objects.filter(studio=studio).exists()
+
+    def test_admin_overview_is_a_single_row_read(
+        self, authenticated_client, studio, student, django_assert_max_num_queries
+    ):
+        authenticated_client.get(reverse("dashboard-stats"))
+
+        # auth user + studio lookup + rollup row + recent activity (x2 studio lookup)
+        with django_assert_max_num_queries(5):
+            response = authenticated_client.get(reverse("dashboard-stats"))
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRollupRefresh:
+    """Committed writes queue one off-request refresh per studio."""
+
+    @pytest.fixture(autouse=True)
+    def no_pending_refresh(self, studio, student):
+        """Forget the refresh the fixtures' own writes queued."""
+        cache.delete(rollups._pending_key(studio.id))
+
+    @patch("apps.core.rollups.async_task")
+    def test_write_queues_refresh_on_commit(self, mock_async, studio, student):
+        _make_lesson(studio, student.primary_teacher, student, "completed", timezone.now())
+
+        mock_async.assert_called_once_with("apps.core.tasks.refresh_dashboard_rollup", studio.id)
+        assert not StudioDashboardRollup.objects.filter(studio=studio).exists()
+
+        refresh_dashboard_rollup(studio.id)
+
+        assert StudioDashboardRollup.objects.get(studio=studio).lessons_completed == 1
+
+    @patch("apps.core.rollups.async_task")
+    def test_burst_of_commits_queues_one_refresh(self, mock_async, studio, student):
+        for _ in range(3):
+            _make_lesson(studio, student.primary_teacher, student, "completed", timezone.now())
+        with transaction.atomic():
+            _make_lesson(studio, student.primary_teacher, student, "no_show", timezone.now())
+            _make_lesson(studio, student.primary_teacher, student, "no_show", timezone.now())
+
+        assert mock_async.call_count == 1
+
+        refresh_dashboard_rollup(studio.id)
+        _make_lesson(studio, student.primary_teacher, student, "cancelled", timezone.now())
+
+        assert mock_async.call_count == 2
+        rollup = StudioDashboardRollup.objects.get(studio=studio)
+        assert (rollup.lessons_completed, rollup.lessons_no_show) == (3, 2)
+
+    @patch("apps.core.rollups.async_task")
+    def test_rolled_back_savepoint_does_not_swallow_refresh(self, mock_async, studio, student):
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    _make_lesson(
+                        studio, student.primary_teacher, student, "completed", timezone.now()
+                    )
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            _make_lesson(studio, student.primary_teacher, student, "no_show", timezone.now())
+
+        mock_async.assert_called_once()
+        refresh_dashboard_rollup(studio.id)
+
+        rollup = StudioDashboardRollup.objects.get(studio=studio)
+        assert (rollup.lessons_completed, rollup.lessons_no_show) == (0, 1)
+
+
+@pytest.mark.django_db
+class TestRebuildDashboardRollupsCommand:
+    """Test the rebuild_dashboard_rollups management command."""
+
+    def test_reports_missing_rollup(self, studio):
+        out = StringIO()
+        call_command("rebuild_dashboard_rollups", stdout=out)
+
+        assert "rollup missing" in out.getvalue()
+        assert StudioDashboardRollup.objects.filter(studio=studio).exists()
+
+    def test_reports_and_repairs_drift(self, studio, student):
+        call_command("rebuild_dashboard_rollups", stdout=StringIO())
+        # queryset.update() bypasses signals, so the rollup goes stale
+        StudioDashboardRollup.objects.filter(studio=studio).update(active_students=99)
+
+        out = StringIO()
+        call_command("rebuild_dashboard_rollups", stdout=out)
+
+        assert "active_students 99 -> 1" in out.getvalue()
+        assert StudioDashboardRollup.objects.get(studio=studio).active_students == 1
+
+    def test_dry_run_does_not_write(self, studio, student):
+        call_command("rebuild_dashboard_rollups", stdout=StringIO())
+        StudioDashboardRollup.objects.filter(studio=studio).update(active_students=99)
+
+        call_command("rebuild_dashboard_rollups", "--dry-run", stdout=StringIO())
+
+        assert StudioDashboardRollup.objects.get(studio=studio).active_students == 99
@@ -0,0 +1,223 @@
+"""
+Tests for the incremental iCal reader and its recurrence expansion.
+"""
+
+import hashlib
+from datetime import UTC, datetime
+
+import pytest
+
+from apps.core.ical_stream import MAX_KEY_LENGTH, iter_chunks, iter_lines, read_events
+from apps.core.models import Band
+from apps.gigs.models import BandExternalEvent
+from apps.gigs.tasks import sync_band_events
+from apps.lessons.import_calendar_views import _parse_and_upsert_events
+from apps.lessons.models import ExternalCalendarEvent, ExternalCalendarFeed
+
+WINDOW = (
+    datetime(2026, 1, 1, tzinfo=UTC),
+    datetime(2026, 12, 31, tzinfo=UTC),
+)
+
+OUTLOOK_TZ = """BEGIN:VTIMEZONE
+TZID:Eastern Standard Time
+BEGIN:STANDARD
+DTSTART:16011104T020000
+RRULE:FREQ=YEARLY;BYDAY=1SU;BYMONTH=11
+TZOFFSETFROM:-0400
+TZOFFSETTO:-0500
+END:STANDARD
+BEGIN:DAYLIGHT
+DTSTART:16010311T020000
+RRULE:FREQ=YEARLY;BYDAY=2SU;BYMONTH=3
+TZOFFSETFROM:-0500
+TZOFFSETTO:-0400
+END:DAYLIGHT
+END:VTIMEZONE"""
+
+
+def _calendar(*blocks):
+    body = "\n".join(["BEGIN:VCALENDAR", "VERSION:2.0", *blocks, "END:VCALENDAR"])
+    return body.replace("\n", "\r\n").encode()
+
+
+def _read(ics, chunk_size=7):
+    # Tiny chunks put line and fold boundaries mid-chunk
+    return read_events(iter_chunks(ics, chunk_size), *WINDOW)
+
+
+def _starts(events, prefix):
+    return sorted(
+        f"{e.start.astimezone(UTC):%m-%d %H:%M}"
+        for uid, e in events.items()
+        if uid.startswith(prefix)
+    )
+
+
+class TestReader:
+    """Test line unfolding and property extraction."""
+
+    def test_unfolds_across_chunks(self):
+        lines = list(iter_lines(iter_chunks("SUMMARY:Long\r\n  gig ✓\r\nX:1".encode(), 3)))
+
+        assert lines == ["SUMMARY:Long gig ✓", "X:1"]
+
+    def test_keeps_single_events_and_skips_alarms(self):
+        events = _read(
+            _calendar(
+                "BEGIN:VEVENT",
+                "UID:one",
+                "SUMMARY:Gig\\, Blue Note",
+                "DTSTART:20260310T190000Z",
+                "DURATION:PT3H",
+                "BEGIN:VALARM",
+                "SUMMARY:Reminder",
+                "END:VALARM",
+                "END:VEVENT",
+            )
+        )
+
+        assert list(events) == ["one"]
+        assert events["one"].summary == "Gig, Blue Note"
+        assert events["one"].end == datetime(2026, 3, 10, 22, 0, tzinfo=UTC)
+
+
+class TestRecurrence:
+    """Test RRULE / EXDATE / RECURRENCE-ID expansion."""
+
+    def test_weekly_rule_with_exdate_and_override(self):
+        events = _read(
+            _calendar(
+                "BEGIN:VEVENT",
+                "UID:override@x",
+                "RECURRENCE-ID;TZID=America/New_York:20260323T190000",
+                "SUMMARY:Moved",
+                "DTSTART;TZID=America/New_York:20260324T180000",
+                "DTEND;TZID=America/New_York:20260324T200000",
+                "END:VEVENT",
+                "BEGIN:VEVENT",
+                "UID:override@x",
+                "SUMMARY:Rehearsal",
+                "DTSTART;TZID=America/New_York:20260302T190000",
+                "DTEND;TZID=America/New_York:20260302T210000",
+                "RRULE:FREQ=WEEKLY;UNTIL=20260331T000000Z",
+                "EXDATE;TZID=America/New_York:20260316T190000",
+                "END:VEVENT",
+            )
+        )
+
+        # 19:00 local is 00:00Z before the DST switch on 8 March, 23:00Z after
+        assert _starts(events, "override@x") == [
+            "03-03 00:00",
+            "03-09 23:00",
+            "03-24 22:00",
+            "03-30 23:00",
+        ]
+        assert events["override@x#20260323T230000Z"].summary == "Moved"
+
+    def test_vtimezone_zones_keep_wall_clock_across_dst(self):
+        events = _read(
+            _calendar(
+                OUTLOOK_TZ,
+                "BEGIN:VEVENT",
+                "UID:outlook",
+                "DTSTART;TZID=Eastern Standard Time:20260302T190000",
+                "DTEND;TZID=Eastern Standard Time:20260302T200000",
+                "RRULE:FREQ=WEEKLY;COUNT=2",
+                "END:VEVENT",
+            )
+        )
+
+        assert _starts(events, "outlook") == ["03-03 00:00", "03-09 23:00"]
+
+    def test_expansion_is_bounded_by_the_window(self):
+        events = _read(
+            _calendar(
+                "BEGIN:VEVENT",
+                "UID:daily",
+                "DTSTART;VALUE=DATE:20200101",
+                "RRULE:FREQ=DAILY",
+                "END:VEVENT",
+            )
+        )
+
+        assert len(events) == 365
+        assert min(e.start for e in events.values()) == WINDOW[0]
+
+    def test_cancelled_occurrence_is_dropped(self):
+        events = _read(
+            _calendar(
+                "BEGIN:VEVENT",
+                "UID:weekly",
+                "DTSTART:20260302T190000Z",
+                "RRULE:FREQ=WEEKLY;COUNT=3",
+                "END:VEVENT",
+                "BEGIN:VEVENT",
+                "UID:weekly",
+                "RECURRENCE-ID:20260309T190000Z",
+                "DTSTART:20260309T190000Z",
+                "STATUS:CANCELLED",
+                "END:VEVENT",
+            )
+        )
+
+        assert _starts(events, "weekly") == ["03-02 19:00", "03-16 19:00"]
+
+    def test_long_uids_are_hashed_to_fit_the_key(self):
+        uid = "x" * 250 + "@example.com"
+        events = _read(
+            _calendar(
+                "BEGIN:VEVENT",
+                f"UID:{uid}",
+                "DTSTART:20260302T190000Z",
+                "RRULE:FREQ=WEEKLY;COUNT=3",
+                "END:VEVENT",
+            )
+        )
+
+        prefix = hashlib.sha256(uid.encode()).hexdigest()
+        assert _starts(events, prefix) == ["03-02 19:00", "03-09 19:00", "03-16 19:00"]
+        assert max(len(key) for key in events) <= MAX_KEY_LENGTH
+
+
+@pytest.mark.django_db
+def test_importer_stores_one_row_per_occurrence(admin_user):
+    feed = ExternalCalendarFeed.objects.create(
+        user=admin_user, name="Recurring", url="https://example.com/r.ics"
+    )
+    now = datetime.now(UTC)
+    ics = _calendar(
+        "BEGIN:VEVENT",
+        "UID:lessons",
+        f"DTSTART:{now:%Y%m%dT190000Z}",
+        "DURATION:PT1H",
+        "RRULE:FREQ=WEEKLY;COUNT=4",
+        "END:VEVENT",
+    )
+
+    _parse_and_upsert_events(feed, ics)
+
+    assert ExternalCalendarEvent.objects.filter(feed=feed, uid__startswith="lessons#").count() == 4
+
+
+@pytest.mark.django_db
+def test_band_sync_stores_long_recurring_uids(studio, student):
+    band = Band.objects.create(
+        studio=studio,
+        primary_contact=student.user,
+        name="The Band",
+        billing_email="band@test.com",
+    )
+    now = datetime.now(UTC)
+    ics = _calendar(
+        "BEGIN:VEVENT",
+        f"UID:{'gig-' * 60}@example.com",
+        f"DTSTART:{now:%Y%m%dT190000Z}",
+        "DURATION:PT3H",
+        "RRULE:FREQ=WEEKLY;COUNT=2",
+        "END:VEVENT",
+    )
+
+    sync_band_events(band, ics)
+
+    assert BandExternalEvent.objects.filter(band=band).count() == 2
@@ -0,0 +1,96 @@
+"""
+Tests for the set-based day-before lesson reminder task.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.utils import timezone
+
+import pytest
+
+from apps.core import tasks
+from apps.core.models import Student, User
+from apps.lessons.models import Lesson
+from apps.notifications.models import Notification, ReminderLedger
+
+
+def _lessons(studio, teacher, count, hours=24):
+    start = timezone.now() + timedelta(hours=hours)
+    lessons = []
+    for i in range(count):
+        user = User.objects.create_user(
+            email=f"reminder{i}@test.com",
+            password="testpass123",
+            first_name="Student",
+            last_name=str(i),
+            role="student",
+        )
+        student, _ = Student.objects.update_or_create(
+            user=user, defaults={"studio": studio, "primary_teacher": teacher}
+        )
+        lessons.append(
+            Lesson.objects.create(
+                studio=studio,
+                teacher=teacher,
+                student=student,
+                scheduled_start=start,
+                scheduled_end=start + timedelta(hours=1),
+            )
+        )
+    return lessons
+
+
+@pytest.mark.django_db
+class TestCheckUpcomingLessons:
+    """Test tasks.check_upcoming_lessons."""
+
+    @patch("apps.core.tasks.async_task")
+    def test_query_count_does_not_grow_with_lessons(
+        self, mock_async, studio, teacher, django_assert_max_num_queries
+    ):
+        _lessons(studio, teacher, 120)
+
+        with django_assert_max_num_queries(8):
+            result = tasks.check_upcoming_lessons()
+
+        assert result == "Sent 120 reminders"
+        assert ReminderLedger.objects.filter(kind="day_before").count() == 120
+        assert (
+            Notification.objects.filter(
+                notification_type="lesson_reminder", related_lesson_id__isnull=False
+            ).count()
+            == 120
+        )
+        # One enqueued task per batch of emails
+        assert [len(call.args[1]) for call in mock_async.call_args_list] == [50, 50, 20]
+        assert all(call.args[0] is tasks.send_email_batch for call in mock_async.call_args_list)
+
+    @patch("apps.core.tasks.async_task")
+    def test_second_run_sends_nothing(self, mock_async, studio, teacher):
+        _lessons(studio, teacher, 3)
+        tasks.check_upcoming_lessons()
+        mock_async.reset_mock()
+
+        assert tasks.check_upcoming_lessons() == "Sent 0 reminders"
+        mock_async.assert_not_called()
+        assert Notification.objects.filter(notification_type="lesson_reminder").count() == 3
+
+    @patch("apps.core.tasks.async_task")
+    def test_only_lessons_in_window_are_reminded(self, mock_async, studio, teacher):
+        _lessons(studio, teacher, 1, hours=48)
+
+        assert tasks.check_upcoming_lessons() == "Sent 0 reminders"
+        assert not ReminderLedger.objects.exists()
+
+    @patch("apps.core.tasks.async_task")
+    def test_preferences_are_respected(self, mock_async, studio, teacher):
+        (lesson,) = _lessons(studio, teacher, 1)
+        user = lesson.student.user
+        user.preferences = {"notifications": {"email_enabled": False}}
+        user.save()
+
+        tasks.check_upcoming_lessons()
+
+        mock_async.assert_not_called()
+        assert ReminderLedger.objects.filter(lesson=lesson, user=user).exists()
@@ -0,0 +1,114 @@
+"""
+Tests for the lesson-created notification outbox.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.utils import timezone
+
+import pytest
+
+from apps.core.tasks import send_email_batch
+from apps.lessons.models import Lesson
+from apps.notifications import outbox
+from apps.notifications.models import Notification, OutboxEvent
+from apps.notifications.tasks import purge_outbox
+
+
+def _lesson(studio, teacher, student, days=1):
+    start = timezone.now() + timedelta(days=days)
+    return Lesson.objects.create(
+        studio=studio,
+        teacher=teacher,
+        student=student,
+        scheduled_start=start,
+        scheduled_end=start + timedelta(hours=1),
+    )
+
+
+@pytest.mark.django_db
+class TestLessonOutbox:
+    """Test outbox.record_lesson_created and outbox.drain."""
+
+    @patch("apps.notifications.outbox.async_task")
+    def test_creating_a_lesson_only_writes_the_outbox(
+        self, mock_async, studio, teacher, student, django_capture_on_commit_callbacks
+    ):
+        cache.delete(outbox.DRAIN_KICK_KEY)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            lesson = _lesson(studio, teacher, student)
+            _lesson(studio, teacher, student, days=2)
+
+        assert OutboxEvent.objects.filter(lesson=lesson, processed_at__isnull=True).exists()
+        assert not Notification.objects.filter(notification_type="lesson_scheduled").exists()
+        # Two commits in a burst enqueue a single drain
+        mock_async.assert_called_once_with("apps.notifications.tasks.drain_outbox")
+
+    @patch("apps.notifications.outbox.async_task")
+    def test_drain_batches_notifications_and_emails(
+        self, mock_async, studio, teacher, student, django_assert_max_num_queries
+    ):
+        for day in range(1, 31):
+            _lesson(studio, teacher, student, days=day)
+
+        # select, insert, mark processed, empty select (+ savepoints), however many lessons
+        with django_assert_max_num_queries(8):
+            assert outbox.drain() == 30
+
+        assert Notification.objects.filter(notification_type="lesson_scheduled").count() == 60
+        assert not OutboxEvent.objects.filter(processed_at__isnull=True).exists()
+        # 60 emails (teacher and student per lesson) in batches of 50
+        assert [call.args[0] for call in mock_async.call_args_list] == [send_email_batch] * 2
+        assert [len(call.args[1]) for call in mock_async.call_args_list] == [50, 10]
+
+        mock_async.reset_mock()
+        assert outbox.drain() == 0
+        mock_async.assert_not_called()
+
+    @patch("apps.notifications.outbox.async_task")
+    def test_band_lessons_are_notified(self, mock_async, studio, teacher):
+        lesson = _lesson(studio, teacher, None)
+
+        outbox.drain()
+
+        notification = Notification.objects.get(related_lesson_id=lesson.id)
+        assert notification.user == teacher.user
+        assert notification.message.startswith("Lesson with Group/Band")
+
+    @patch("apps.notifications.outbox.async_task")
+    def test_failed_events_are_retried_on_the_next_drain(
+        self, mock_async, studio, teacher, student
+    ):
+        lesson = _lesson(studio, teacher, student)
+
+        with patch.object(
+            Notification, "lesson_scheduled_notifications", side_effect=ValueError("boom")
+        ):
+            outbox.drain()
+
+        event = OutboxEvent.objects.get(lesson=lesson)
+        assert (event.attempts, event.processed_at, event.last_error) == (1, None, "boom")
+
+        outbox.drain()
+
+        event.refresh_from_db()
+        assert event.processed_at is not None
+        assert Notification.objects.filter(related_lesson_id=lesson.id).count() == 2
+
+    def test_purge_deletes_only_old_processed_events(self, studio, teacher, student):
+        old, recent, pending = (_lesson(studio, teacher, student, days=d) for d in (1, 2, 3))
+        now = timezone.now()
+        OutboxEvent.objects.filter(lesson=old).update(
+            processed_at=now - outbox.PROCESSED_RETENTION - timedelta(hours=1)
+        )
+        OutboxEvent.objects.filter(lesson=recent).update(processed_at=now - timedelta(days=1))
+
+        assert purge_outbox() == "Purged 1 processed outbox events"
+
+        assert set(OutboxEvent.objects.values_list("lesson_id", flat=True)) == {
+            recent.id,
+            pending.id,
+        }
@@ -95,6 +95,7 @@ export default function SchedulePage() {
   const [colorMode, setColorMode] = useState<"status" | "student" | "instrument">("status");
   const [showBookingModal, setShowBookingModal] = useState(false);
   const [showSubscribeModal, setShowSubscribeModal] = useState(false);
+  const [subscriptionUrl, setSubscriptionUrl] = useState("");
   const [use24Hour, setUse24Hour] = useState(false);
   const [bookingLoading, setBookingLoading] = useState(false);
   const [editingLessonId, setEditingLessonId] = useState<string | null>(null);
@@ -145,6 +146,16 @@ export default function SchedulePage() {
   const [addingFeed, setAddingFeed] = useState(false);
   const [refreshingFeedId, setRefreshingFeedId] = useState<string | null>(null);
 
+  const openSubscribeModal = async () => {
+    setShowSubscribeModal(true);
+    try {
+      const resp = await api.get("/lessons/calendar/subscription/");
+      setSubscriptionUrl(resp.data.url);
+    } catch (e) {
+      toast.error("Could not load your calendar feed link");
+    }
+  };
+
   const fetchExternalFeeds = useCallback(async () => {
     try {
       setFeedsLoading(true);
@@ -602,7 +613,7 @@ export default function SchedulePage() {
           </Button>
           <Button
             variant="outline"
-            onClick={() => setShowSubscribeModal(true)}
+            onClick={openSubscribeModal}
             className="gap-2 w-full"
           >
             <Link className="w-4 h-4" />
@@ -1443,6 +1454,7 @@ export default function SchedulePage() {
               <Info className="w-5 h-5 text-blue-600 shrink-0" />
               <p className="text-sm text-blue-800 font-medium">
                 Use this link to subscribe in your calendar app (Google Calendar, iCal, etc).
+                Keep it private: anyone with the link can see your lessons.
               </p>
             </div>
             <div className="space-y-2">
@@ -1452,15 +1464,13 @@ export default function SchedulePage() {
               <div className="flex gap-2">
                 <input
                   readOnly
-                  value={`${typeof window !== 'undefined' ? window.location.origin : ''}/api/calendar/my/lessons.ics`}
+                  value={subscriptionUrl}
                   className="flex-1 px-4 py-3 bg-gray-50 border border-gray-200 rounded-xl text-sm font-mono text-gray-600 outline-none"
                 />
                 <Button
                   variant="outline"
                   onClick={() => {
-                    navigator.clipboard.writeText(
-                      `${window.location.origin}/api/calendar/my/lessons.ics`
-                    );
+                    navigator.clipboard.writeText(subscriptionUrl);
                     toast.success("Copied!");
                   }}
                 >
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import api from '../services/api';
 import { toast } from 'react-hot-toast';
 
@@ -14,7 +14,6 @@ export interface Message {
     sender_details: MessageUser;
     body: string;
     created_at: string;
-    read_by: string[]; // List of user IDs
 }
 
 export interface MessageThread {
@@ -26,12 +25,61 @@ export interface MessageThread {
     updated_at: string;
 }
 
+interface MessagePage {
+    next: string | null;
+    previous: string | null;
+    results: Message[];
+}
+
+// Most pages a poll follows to catch up before waiting for the next one
+const MAX_POLL_PAGES = 10;
+
+const byTime = (a: Message, b: Message) =>
+    a.created_at === b.created_at ? a.id.localeCompare(b.id) : a.created_at.localeCompare(b.created_at);
+
+// Add messages to the history, oldest first, without duplicating any already loaded
+const mergeMessages = (current: Message[], incoming: Message[]) => {
+    const known = new Set(current.map(m => m.id));
+    const added = incoming.filter(m => !known.has(m.id));
+    return added.length ? [...current, ...added].sort(byTime) : current;
+};
+
+// The message id a page link pages from (?before= / ?after=)
+const cursorOf = (link: string | null, param: 'before' | 'after') =>
+    link ? new URL(link).searchParams.get(param) : null;
+
+const getPage = async (threadId: string, params?: Record<string, string>) => {
+    const res = await api.get(`/messaging/threads/${threadId}/messages/`, { params });
+    return res.data as MessagePage;
+};
+
+// Pages forward from the newest loaded message, so nothing between polls is skipped
+const fetchNewer = async (threadId: string, newest: Message) => {
+    let after: string | null = newest.id;
+    const newer: Message[] = [];
+    for (let pages = 0; after && pages < MAX_POLL_PAGES; pages++) {
+        const page: MessagePage = await getPage(threadId, { after });
+        newer.push(...page.results);
+        after = cursorOf(page.next, 'after');
+    }
+    return newer;
+};
+
 export function useMessages() {
     const [threads, setThreads] = useState<MessageThread[]>([]);
     const [activeThread, setActiveThread] = useState<MessageThread | null>(null);
     const [messages, setMessages] = useState<Message[]>([]);
     const [loading, setLoading] = useState(true);
     const [messagesLoading, setMessagesLoading] = useState(false);
+    const [olderCursor, setOlderCursor] = useState<string | null>(null);
+    const [olderLoading, setOlderLoading] = useState(false);
+    // Thread and history the latest responses belong to, read without re-creating callbacks
+    const threadIdRef = useRef<string | null>(null);
+    const messagesRef = useRef<Message[]>([]);
+
+    useEffect(() => {
+        messagesRef.current = messages;
+    }, [messages]);
 
     const fetchThreads = useCallback(async (background = false) => {
         try {
@@ -47,10 +95,32 @@ export function useMessages() {
     }, []);
 
     const fetchMessages = useCallback(async (threadId: string, background = false) => {
+        if (threadIdRef.current !== threadId) {
+            // Another thread's history must not be merged into or paged from
+            threadIdRef.current = threadId;
+            messagesRef.current = [];
+            setMessages([]);
+            setOlderCursor(null);
+        }
+        const loaded = messagesRef.current;
         try {
             if (!background) setMessagesLoading(true);
-            const res = await api.get(`/messaging/threads/${threadId}/messages/`);
-            setMessages(res.data);
+            if (loaded.length) {
+                let newer: Message[];
+                try {
+                    newer = await fetchNewer(threadId, loaded[loaded.length - 1]);
+                } catch {
+                    // The newest loaded message is gone; merge the latest page instead
+                    newer = (await getPage(threadId)).results;
+                }
+                if (threadIdRef.current !== threadId) return;
+                setMessages((prev: Message[]) => mergeMessages(prev, newer));
+            } else {
+                const page = await getPage(threadId); // Latest page of history
+                if (threadIdRef.current !== threadId) return;
+                setMessages(page.results);
+                setOlderCursor(cursorOf(page.previous, 'before'));
+            }
 
             // Mark as read locally
             setThreads((prev: MessageThread[]) => prev.map(t =>
@@ -64,6 +134,23 @@ export function useMessages() {
         }
     }, []);
 
+    const loadOlderMessages = useCallback(async () => {
+        const threadId = threadIdRef.current;
+        if (!threadId || !olderCursor || olderLoading) return;
+        try {
+            setOlderLoading(true);
+            const page = await getPage(threadId, { before: olderCursor });
+            if (threadIdRef.current !== threadId) return;
+            setMessages((prev: Message[]) => mergeMessages(prev, page.results));
+            setOlderCursor(cursorOf(page.previous, 'before'));
+        } catch (error) {
+            console.error(error);
+            toast.error('Failed to load older messages');
+        } finally {
+            setOlderLoading(false);
+        }
+    }, [olderCursor, olderLoading]);
+
     const sendMessage = async (recipientIds: string[], subject: string, body: string) => {
         try {
             const res = await api.post('/messaging/threads/', {
@@ -207,6 +294,9 @@ export function useMessages() {
         loading,
         messagesLoading,
         fetchMessages,
+        hasOlderMessages: olderCursor !== null,
+        olderLoading,
+        loadOlderMessages,
         sendMessage,
         replyToThread,
         refreshThreads: fetchThreads